@@ -0,0 +1,87 @@
+"""
+In-process assembler for embedding without file I/O
+"""
+
+from array import array
+from collections.abc import Iterable, Iterator
+from typing import IO
+
+from hasm_parser import clean_lines
+from symbol_handler import SymbolHandler
+from translator import parse_compact, resolve_compact, word_to_bin
+
+Source = str | bytes | Iterable[str] | Iterable[bytes] | IO
+
+
+def iter_source(source: Source, encoding: str = "UTF-8") -> Iterator[str]:
+    """
+    Iterate the raw lines of a source given in any supported form
+
+    Args:
+        `source` (`Source`): A whole program as str or bytes, an iterable of str or bytes lines,
+            or a text or binary file object
+        `encoding` (str): The encoding of any bytes. Defaults to "UTF-8"
+
+    Yields:
+        str: Each raw line of the source
+    """
+
+    if isinstance(source, str):
+        yield from source.splitlines()
+    elif isinstance(source, (bytes, bytearray, memoryview)):
+        yield from bytes(source).decode(encoding).splitlines()
+    else:
+        for line in source:
+            yield line.decode(encoding) if isinstance(
+                line, (bytes, bytearray)
+            ) else line
+
+
+class Assembler:
+    """
+    Reusable assembler that works entirely in memory
+
+    Attributes:
+        `symbol_handler` (`SymbolHandler`): The symbol handler reused by every call.
+            Any symbols it holds when the `Assembler` is created are kept between calls,
+            everything a program adds is undone by a cheap `SymbolHandler.reset`
+    """
+
+    def __init__(self, symbol_handler: SymbolHandler | None = None) -> None:
+        self.symbol_handler = (
+            symbol_handler if symbol_handler is not None else SymbolHandler()
+        )
+        self.symbol_handler.checkpoint()
+
+    def assemble(self, source: Source) -> array:
+        """
+        Assemble `source` into 16-bit words. The symbol table of the program is left
+            in `symbol_handler` until the next call
+
+        Args:
+            `source` (`Source`): The program to be assembled
+
+        Returns:
+            array[int]: One encoded 16-bit word per ROM address
+        """
+
+        self.symbol_handler.reset()
+
+        instructions = list(clean_lines(iter_source(source)))
+        self.symbol_handler.handle_labels(instructions)
+        program = parse_compact(instructions, self.symbol_handler)
+
+        return resolve_compact(program, self.symbol_handler)
+
+    def assemble_text(self, source: Source) -> list[str]:
+        """
+        Assemble `source` into binary strings, as written to a .hack file
+
+        Args:
+            `source` (`Source`): The program to be assembled
+
+        Returns:
+            list[str]: One 16-character binary string per ROM address
+        """
+
+        return list(map(word_to_bin, self.assemble(source)))
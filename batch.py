@@ -0,0 +1,111 @@
+"""
+Module to assemble many .asm files at once across a pool of worker processes
+"""
+
+from collections.abc import Callable, Iterable
+from concurrent.futures import ProcessPoolExecutor
+import glob
+import os
+import time
+import traceback
+from typing import NamedTuple
+
+from compression import strip_compression
+
+ASM_EXTENSION = ".asm"
+GLOB_CHARS = ("*", "?", "[")
+
+
+class AssemblyResult(NamedTuple):
+    """
+    Outcome of assembling a single file
+
+    Attributes:
+        `file` (str): The .asm file that was assembled
+        `seconds` (float): Wall time spent assembling the file
+        `error` (str | None): A description of the failure, or None on success
+    """
+
+    file: str
+    seconds: float
+    error: str | None = None
+
+
+def expand_sources(paths: Iterable[str]) -> list[str]:
+    """
+    Expand files, directories and glob patterns into a list of .asm files,
+        compressed or not. Directories are searched recursively. Explicit files are kept even if they do not exist
+        so the failure is reported per file
+
+    Args:
+        `paths` (Iterable[str]): The paths given on the command line
+
+    Returns:
+        list[str]: The .asm files in the order given, without duplicates
+    """
+
+    sources: dict[str, None] = {}
+
+    for path in paths:
+        if os.path.isdir(path):
+            matches = glob.glob(
+                os.path.join(path, "**", f"*{ASM_EXTENSION}*"), recursive=True
+            )
+        elif any(char in path for char in GLOB_CHARS):
+            matches = glob.glob(path, recursive=True)
+        else:
+            matches = [path]
+
+        for match in sorted(matches):
+            if strip_compression(match).endswith(ASM_EXTENSION):
+                sources[match] = None
+
+    return list(sources)
+
+
+def _run_task(task: Callable[[str], object], file: str) -> AssemblyResult:
+    """
+    Run `task` on `file`, timing it and capturing any error instead of raising
+
+    Args:
+        `task` (Callable[[str], object]): The function that assembles a single file
+        `file` (str): The .asm file to be assembled
+
+    Returns:
+        `AssemblyResult`: The timing and outcome for `file`
+    """
+
+    start = time.perf_counter()
+
+    try:
+        task(file)
+    except Exception as error:
+        message = "".join(traceback.format_exception_only(error)).strip()
+        return AssemblyResult(file, time.perf_counter() - start, message)
+
+    return AssemblyResult(file, time.perf_counter() - start)
+
+
+def assemble_batch(
+    files: Iterable[str], task: Callable[[str], object], jobs: int = 1
+) -> list[AssemblyResult]:
+    """
+    Assemble every file in `files` with `task`, in parallel when `jobs` > 1.
+        A failing file does not abort the rest of the batch
+
+    Args:
+        `files` (Iterable[str]): The .asm files to be assembled
+        `task` (Callable[[str], object]): A picklable function that assembles a single file
+        `jobs` (int): The number of worker processes. Defaults to 1 (in-process)
+
+    Returns:
+        list[`AssemblyResult`]: One result per file, in the order of `files`
+    """
+
+    files = list(files)
+
+    if jobs <= 1 or len(files) <= 1:
+        return [_run_task(task, file) for file in files]
+
+    with ProcessPoolExecutor(max_workers=min(jobs, len(files))) as executor:
+        return list(executor.map(_run_task, [task] * len(files), files))
@@ -0,0 +1,431 @@
+"""
+Benchmark suite for the assembler.
+
+Generates synthetic Hack programs of configurable size and symbol/label density, times each
+stage of the assembler and reports throughput and peak memory, optionally saving the
+results as JSON so runs can be compared between releases.
+
+Usage:
+    > python3 benchmark.py --lines 1000000 --output results.json
+"""
+
+from argparse import ArgumentParser
+from collections.abc import Callable
+from contextlib import nullcontext
+import json
+import os
+import platform
+import random
+import tempfile
+import time
+import tracemalloc
+from typing import Any
+
+from constants import (
+    ASSEMBLER_VERSION,
+    COMP_TABLE,
+    DEST_TABLE,
+    JUMP_TABLE,
+    LABEL_START,
+    MAX_A_VALUE,
+    VAR_START,
+)
+from hack_assembler import write_hack
+from hasm_parser import parse_file
+from lexer import tokenize_file
+from profiling import instruction_kind
+from symbol_handler import SymbolHandler
+from symbol_store import DiskSymbolTable
+from translator import parse_compact, resolve_compact, word_to_bin
+
+# By default the disk-backed symbol store caches 1/16 of the symbols, so most lookups reach SQLite
+SYMBOL_CACHE_DIVISOR = 16
+
+
+def generate_program(
+    lines: int,
+    symbol_density: float = 0.3,
+    label_density: float = 0.05,
+    symbols: int = 1000,
+    seed: int = 0,
+) -> str:
+    """
+    Generate a synthetic Hack program
+
+    Args:
+        `lines` (int): The number of source lines to generate
+        `symbol_density` (float): Fraction of lines that are symbolic A-Instructions
+        `label_density` (float): Fraction of lines that are (Label) declarations
+        `symbols` (int): The number of distinct variables referenced
+        `seed` (int): The random seed, so programs are reproducible
+
+    Returns:
+        str: The program source, including some comments and blank lines.
+            Labels are only declared at ROM addresses an A-Instruction can load, so labels
+            not reached by then are all declared at the last such address
+    """
+
+    rng = random.Random(seed)
+    comps = list(COMP_TABLE)
+    dests = ["", *(f"{dest}=" for dest in DEST_TABLE)]
+    jumps = ["", *(f";{jump}" for jump in JUMP_TABLE)]
+    labels = max(1, int(lines * label_density))
+
+    source = []
+    next_label = 0
+    address = 0
+    # Index in `source` of the instruction at ROM address MAX_A_VALUE, once generated
+    last_label_index = None
+
+    for _ in range(lines):
+        if address == MAX_A_VALUE and last_label_index is None:
+            last_label_index = len(source)
+
+        roll = rng.random()
+        if roll < label_density and next_label < labels and address <= MAX_A_VALUE:
+            source.append(f"(L{next_label})")
+            next_label += 1
+        elif roll < label_density + symbol_density:
+            if rng.random() < 0.5:
+                source.append(f"@L{rng.randrange(labels)}")
+            else:
+                source.append(f"@var{rng.randrange(symbols)}")
+        elif roll < label_density + symbol_density + 0.2:
+            source.append(f"@{rng.randrange(32768)}")
+        elif rng.random() < 0.05:
+            source.append("// generated comment")
+        else:
+            source.append(
+                f"{rng.choice(dests)}{rng.choice(comps)}{rng.choice(jumps)}   "
+            )
+
+        # Only instructions take up a ROM address
+        if source[-1][0] not in (LABEL_START, "/"):
+            address += 1
+
+    # Declare any labels that were referenced but not reached
+    unreached = [f"(L{label})" for label in range(next_label, labels)]
+    if last_label_index is None:
+        source.extend(unreached)
+    else:
+        source[last_label_index:last_label_index] = unreached
+
+    return "\n".join(source)
+
+
+def time_stage(
+    stage: Callable[[], Any], trace_memory: bool = True
+) -> tuple[Any, float, int]:
+    """
+    Time a single call of `stage`
+
+    Args:
+        `stage` (Callable[[], Any]): The stage to be run
+        `trace_memory` (bool): Whether to record the peak memory allocated. Defaults to True
+
+    Returns:
+        tuple[Any, float, int]: The stage's result, its wall time in seconds
+            and its peak allocated bytes (0 if not traced)
+    """
+
+    if trace_memory:
+        tracemalloc.start()
+
+    start = time.perf_counter()
+    result = stage()
+    seconds = time.perf_counter() - start
+
+    peak = 0
+    if trace_memory:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    return result, seconds, peak
+
+
+def run_benchmark(file: str, trace_memory: bool = True) -> dict[str, dict[str, float]]:
+    """
+    Assemble `file` stage by stage, recording the cost of each stage
+
+    Args:
+        `file` (str): The filepath of the .asm file to be assembled
+        `trace_memory` (bool): Whether to record peak memory per stage. Defaults to True
+
+    Returns:
+        dict[str, dict[str, float]]: Per stage wall time, lines/sec and peak memory
+    """
+
+    with open(file, "r", encoding="UTF-8") as f:
+        source_lines = sum(1 for _ in f)
+
+    symbol_handler = SymbolHandler()
+    stages = {}
+
+    def record(name: str, stage: Callable[[], Any]) -> Any:
+        result, seconds, peak = time_stage(stage, trace_memory)
+        stages[name] = {
+            "seconds": seconds,
+            "lines_per_second": source_lines / seconds if seconds else 0.0,
+            "peak_bytes": peak,
+        }
+        return result
+
+    parsed_file = record("parse_file", lambda: parse_file(file))
+    record("handle_labels", lambda: symbol_handler.handle_labels(parsed_file))
+    program = record(
+        "parse_compact", lambda: parse_compact(parsed_file, symbol_handler)
+    )
+    words = record("resolve_compact", lambda: resolve_compact(program, symbol_handler))
+
+    with tempfile.TemporaryDirectory() as directory:
+        record(
+            "write",
+            lambda: write_hack(
+                map(word_to_bin, words), os.path.join(directory, "out.hack")
+            ),
+        )
+
+    total = sum(stage["seconds"] for stage in stages.values())
+    stages["total"] = {
+        "seconds": total,
+        "lines_per_second": source_lines / total if total else 0.0,
+        "peak_bytes": max(stage["peak_bytes"] for stage in stages.values()),
+    }
+
+    return stages
+
+
+def benchmark_tokenizers(file: str, repeat: int = 3) -> dict[str, dict[str, float]]:
+    """
+    Compare the one-scan lexer against the per-line split/strip of `parse_file`,
+        taking the best of `repeat` runs of each
+
+    Args:
+        `file` (str): The filepath of the .asm file to be scanned
+        `repeat` (int): The number of runs of each tokenizer. Defaults to 3
+
+    Returns:
+        dict[str, dict[str, float]]: Wall time and lines/sec of each tokenizer
+    """
+
+    with open(file, "r", encoding="UTF-8") as f:
+        source_lines = sum(1 for _ in f)
+
+    tokenizers = {
+        "parse_file": lambda: parse_file(file),
+        "parse_file_classified": lambda: [
+            (instruction_kind(line), line) for line in parse_file(file)
+        ],
+        "tokenize": lambda: list(tokenize_file(file)),
+    }
+
+    results = {}
+    for name, tokenizer in tokenizers.items():
+        seconds = min(
+            time_stage(tokenizer, trace_memory=False)[1] for _ in range(repeat)
+        )
+        results[name] = {
+            "seconds": seconds,
+            "lines_per_second": source_lines / seconds if seconds else 0.0,
+        }
+
+    return results
+
+
+def benchmark_symbol_stores(
+    file: str, cache_size: int | None = None
+) -> dict[str, dict[str, float]]:
+    """
+    Compare the symbol lookup throughput of the in-memory symbol table
+        against the disk-backed `DiskSymbolTable`
+
+    Args:
+        `file` (str): The filepath of the .asm file whose symbol references are looked up
+        `cache_size` (int | None): The number of symbols the disk store keeps in memory.
+            Defaults to None, which caches 1/`SYMBOL_CACHE_DIVISOR` of the referenced symbols
+            so most lookups reach the database
+
+    Returns:
+        dict[str, dict[str, float]]: Wall time, lookups/sec and cache hit rate of each store
+    """
+
+    instructions = parse_file(file)
+    references = [
+        line for line in instructions if line[0] == VAR_START and not line[1:].isdigit()
+    ]
+    symbols = [reference[1:] for reference in references]
+    if cache_size is None:
+        cache_size = max(1, len(set(symbols)) // SYMBOL_CACHE_DIVISOR)
+
+    stores = {
+        "memory": nullcontext,
+        "disk": lambda: DiskSymbolTable(cache_size=cache_size),
+    }
+
+    results = {}
+    for name, store in stores.items():
+        with store() as symbol_table:
+            symbol_handler = SymbolHandler(symbol_table)
+            symbol_handler.handle_labels(instructions)
+            for reference in references:
+                symbol_handler.handle_symbol(reference, 0)
+            if symbol_table is not None:
+                symbol_table.hits = symbol_table.misses = 0
+
+            lookup = symbol_handler.lookup_symbol
+            seconds = time_stage(
+                lambda: [lookup(symbol) for symbol in symbols], trace_memory=False
+            )[1]
+
+            if symbol_table is None:
+                cached, hit_rate = len(symbol_handler.symbol_table), 1.0
+            else:
+                cached, hit_rate = cache_size, symbol_table.hit_rate
+
+        results[name] = {
+            "seconds": seconds,
+            "lookups_per_second": len(symbols) / seconds if seconds else 0.0,
+            "cache_size": cached,
+            "hit_rate": hit_rate,
+        }
+
+    return results
+
+
+def benchmark_generated(
+    lines: int,
+    symbol_density: float = 0.3,
+    label_density: float = 0.05,
+    symbols: int = 1000,
+    seed: int = 0,
+    trace_memory: bool = True,
+    symbol_cache_size: int | None = None,
+) -> dict[str, Any]:
+    """
+    Generate a synthetic program and benchmark assembling it
+
+    Args:
+        See `generate_program`, `run_benchmark` and `benchmark_symbol_stores`
+
+    Returns:
+        dict[str, Any]: The benchmark parameters, environment and per stage results
+    """
+
+    with tempfile.TemporaryDirectory() as directory:
+        file = os.path.join(directory, "bench.asm")
+        with open(file, "w", encoding="UTF-8") as f:
+            f.write(
+                generate_program(lines, symbol_density, label_density, symbols, seed)
+            )
+
+        stages = run_benchmark(file, trace_memory)
+        tokenizers = benchmark_tokenizers(file)
+        symbol_stores = benchmark_symbol_stores(file, symbol_cache_size)
+
+    return {
+        "version": ASSEMBLER_VERSION,
+        "python": platform.python_version(),
+        "parameters": {
+            "lines": lines,
+            "symbol_density": symbol_density,
+            "label_density": label_density,
+            "symbols": symbols,
+            "seed": seed,
+            "symbol_cache_size": symbol_cache_size,
+        },
+        "stages": stages,
+        "tokenizers": tokenizers,
+        "symbol_stores": symbol_stores,
+    }
+
+
+def print_report(results: dict[str, Any]) -> None:
+    """
+    Print the per stage, per tokenizer and per symbol store results of a benchmark as tables
+    """
+
+    print(f"{'stage':<24}{'seconds':>12}{'lines/sec':>16}{'peak MiB':>12}")
+    for name, stage in results["stages"].items():
+        print(
+            f"{name:<24}{stage['seconds']:>12.4f}"
+            f"{stage['lines_per_second']:>16,.0f}{stage['peak_bytes'] / 2**20:>12.2f}"
+        )
+
+    print(f"\n{'tokenizer':<24}{'seconds':>12}{'lines/sec':>16}")
+    for name, tokenizer in results["tokenizers"].items():
+        print(
+            f"{name:<24}{tokenizer['seconds']:>12.4f}{tokenizer['lines_per_second']:>16,.0f}"
+        )
+
+    print(
+        f"\n{'symbol store':<24}{'seconds':>12}{'lookups/sec':>16}{'cached':>12}{'hit rate':>12}"
+    )
+    for name, store in results["symbol_stores"].items():
+        print(
+            f"{name:<24}{store['seconds']:>12.4f}{store['lookups_per_second']:>16,.0f}"
+            f"{store['cache_size']:>12}{store['hit_rate']:>12.1%}"
+        )
+
+
+def initialize_argparser() -> ArgumentParser:
+    """
+    Initialize the ArgumentParser for command-line-arguments
+    """
+
+    arg_parser = ArgumentParser(
+        prog="HackAssemblerBenchmark", description="Benchmark the Hack assembler."
+    )
+    arg_parser.add_argument(
+        "--lines", type=int, default=100_000, help="source lines to generate"
+    )
+    arg_parser.add_argument(
+        "--symbol-density",
+        type=float,
+        default=0.3,
+        help="fraction of symbolic A-Instructions",
+    )
+    arg_parser.add_argument(
+        "--label-density",
+        type=float,
+        default=0.05,
+        help="fraction of (Label) declarations",
+    )
+    arg_parser.add_argument(
+        "--symbols", type=int, default=1000, help="distinct variables"
+    )
+    arg_parser.add_argument("--seed", type=int, default=0, help="random seed")
+    arg_parser.add_argument(
+        "--symbol-cache",
+        type=int,
+        help="symbols the disk-backed symbol store keeps in memory "
+        f"(default: 1/{SYMBOL_CACHE_DIVISOR} of the program's symbols)",
+    )
+    arg_parser.add_argument(
+        "--no-memory",
+        action="store_true",
+        help="skip tracemalloc, which slows the stages it measures",
+    )
+    arg_parser.add_argument(
+        "--output", type=str, help="filepath to save the results as JSON"
+    )
+
+    return arg_parser
+
+
+if __name__ == "__main__":
+    args = initialize_argparser().parse_args()
+
+    benchmark_results = benchmark_generated(
+        args.lines,
+        args.symbol_density,
+        args.label_density,
+        args.symbols,
+        args.seed,
+        trace_memory=not args.no_memory,
+        symbol_cache_size=args.symbol_cache,
+    )
+    print_report(benchmark_results)
+
+    if args.output:
+        with open(args.output, "w", encoding="UTF-8") as f:
+            json.dump(benchmark_results, f, indent=2)
@@ -0,0 +1,552 @@
+"""
+Module to cache assembled programs on disk, keyed by the content hash of their source.
+
+Unchanged sources return their stored output without reassembly. When a source has changed,
+the parsed blocks of its previous version are reused for every region that did not change,
+so only edited blocks are re-parsed before symbols are resolved again.
+
+Entries are stored as plain data, never pickled, so a tampered cache directory cannot run code:
+a header, a JSON document of the symbol table and names, then the big-endian word and offset
+arrays. Keys hash the encoding tables and entry format along with the source, so entries
+written by an assembler that encodes or stores programs differently are never reused.
+
+The cache lives in the per-user cache directory by default (see `default_cache_dir`), and its
+total size is tracked as entries are written, so the directory is only listed when the cache
+first grows past its bound.
+"""
+
+from array import array
+from collections.abc import Iterable, Iterator
+import hashlib
+import json
+import os
+import struct
+import tempfile
+from typing import NamedTuple
+import zlib
+
+from compression import open_file
+from constants import (
+    ASSEMBLER_VERSION,
+    COMP_TABLE,
+    DEST_TABLE,
+    JUMP_TABLE,
+    LABEL_END,
+    LABEL_START,
+    PRE_DEFINED_SYMBOLS,
+    VAR_START,
+    WORD_TYPECODE,
+)
+from hasm_parser import clean_lines
+from rom_image import to_big_endian
+from sourcemap import SourceMap
+from symbol_handler import SymbolHandler
+from translator import a_inst_to_int, c_text_to_int
+
+
+def default_cache_dir() -> str:
+    """
+    The per-user cache directory of the assembler: under %LOCALAPPDATA% on Windows,
+        otherwise under $XDG_CACHE_HOME or ~/.cache
+    """
+
+    base = os.environ.get("LOCALAPPDATA") if os.name == "nt" else None
+    base = base or os.environ.get("XDG_CACHE_HOME")
+    base = base or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "hack_assembler")
+
+
+DEFAULT_CACHE_DIR = default_cache_dir()
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+# Fraction of `max_bytes` left after evicting, so the next eviction is many writes away
+EVICT_TO = 0.75
+
+ENTRY_SUFFIX = ".entry"
+INDEX_SUFFIX = ".index"
+
+ENTRY_MAGIC = b"HCCH"
+ENTRY_VERSION = 1
+# Magic, version and the length of the JSON document that follows
+ENTRY_HEADER = struct.Struct(">4sBI")
+OFFSET_TYPECODE = "I"
+
+# Everything that decides the contents of an entry besides its source, hashed into every key
+FORMAT_DIGEST = hashlib.sha256(
+    json.dumps(
+        [
+            ASSEMBLER_VERSION,
+            ENTRY_VERSION,
+            WORD_TYPECODE,
+            PRE_DEFINED_SYMBOLS,
+            COMP_TABLE,
+            DEST_TABLE,
+            JUMP_TABLE,
+        ],
+        sort_keys=True,
+    ).encode()
+).digest()
+
+# Blocks end after a line whose checksum is divisible by BLOCK_DIVISOR, so boundaries
+# depend only on content and an insertion does not shift every later block
+BLOCK_DIVISOR = 64
+MAX_BLOCK_LINES = 4096
+
+
+class Block(NamedTuple):
+    """
+    A parsed run of source lines with its symbols left unresolved
+
+    Attributes:
+        `words` (array[int]): One word per instruction, 0 for symbolic A-Instructions
+        `ref_offsets` (array[int]): Offsets within `words` of the symbolic A-Instructions
+        `ref_names` (list[str]): The symbol referenced at each of `ref_offsets`
+        `label_offsets` (array[int]): ROM offset within the block of each label declaration
+        `label_names` (list[str]): The label declared at each of `label_offsets`
+    """
+
+    words: array
+    ref_offsets: array
+    ref_names: list[str]
+    label_offsets: array
+    label_names: list[str]
+
+
+class CacheEntry(NamedTuple):
+    """
+    A cached assembly of one source
+
+    Attributes:
+        `symbol_table` (dict[str, int]): The resolved symbol table
+        `words` (array[int]): The encoded program
+        `blocks` (dict[str, `Block`]): The parsed blocks of the source keyed by their hash
+    """
+
+    symbol_table: dict[str, int]
+    words: array
+    blocks: dict[str, Block]
+
+
+def split_blocks(lines: Iterable[str]) -> Iterator[list[str]]:
+    """
+    Split cleaned lines into content-defined blocks
+
+    Args:
+        `lines` (Iterable[str]): The cleaned instructions
+
+    Yields:
+        list[str]: Consecutive runs of instructions
+    """
+
+    block = []
+
+    for line in lines:
+        block.append(line)
+        if (
+            len(block) == MAX_BLOCK_LINES
+            or zlib.crc32(line.encode()) % BLOCK_DIVISOR == 0
+        ):
+            yield block
+            block = []
+
+    if block:
+        yield block
+
+
+def block_hash(lines: list[str]) -> str:
+    """
+    Hash the text of a block
+    """
+
+    return hashlib.blake2b("\n".join(lines).encode(), digest_size=16).hexdigest()
+
+
+def parse_block(lines: list[str]) -> Block:
+    """
+    Parse a block of cleaned lines without touching any symbol table
+
+    Args:
+        `lines` (list[str]): The cleaned instructions of the block
+
+    Returns:
+        `Block`: The parsed block
+    """
+
+    block = Block(
+        array(WORD_TYPECODE), array(OFFSET_TYPECODE), [], array(OFFSET_TYPECODE), []
+    )
+    words = block.words
+
+    for line in lines:
+        if line[0] == LABEL_START:
+            block.label_offsets.append(len(words))
+            block.label_names.append(
+                line.removeprefix(LABEL_START).removesuffix(LABEL_END)
+            )
+        elif line[0] != VAR_START:
+            words.append(c_text_to_int(line))
+        elif line[1:].isdigit():
+            words.append(a_inst_to_int(int(line[1:])))
+        else:
+            block.ref_offsets.append(len(words))
+            block.ref_names.append(line[1:])
+            words.append(0)
+
+    return block
+
+
+def link_blocks(blocks: list[Block], symbol_handler: SymbolHandler) -> array:
+    """
+    Resolve the symbols of consecutive blocks into a finished program.
+        Labels are collected first, then variables are allocated in order of first reference
+
+    Args:
+        `blocks` (list[`Block`]): The parsed blocks in program order
+        `symbol_handler` (`SymbolHandler`): A fresh symbol handler for the program
+
+    Returns:
+        array[int]: One encoded 16-bit word per ROM address
+    """
+
+    base = 0
+    for block in blocks:
+        for offset, name in zip(block.label_offsets, block.label_names):
+            symbol_handler.handle_symbol(
+                f"{LABEL_START}{name}{LABEL_END}", base + offset
+            )
+        base += len(block.words)
+
+    words = array(WORD_TYPECODE)
+    for block in blocks:
+        base = len(words)
+        words.extend(block.words)
+        for offset, name in zip(block.ref_offsets, block.ref_names):
+            symbol_handler.handle_symbol(f"{VAR_START}{name}", base + offset)
+            words[base + offset] = a_inst_to_int(symbol_handler.lookup_symbol(name))
+
+    return words
+
+
+def encode_entry(entry: CacheEntry) -> bytes:
+    """
+    Serialize `entry` as a header, a JSON document of its symbols, block hashes and names,
+        then the words of the program and the words and offsets of each block, big-endian
+
+    Args:
+        `entry` (`CacheEntry`): The entry to serialize
+
+    Returns:
+        bytes: The contents of the entry file
+    """
+
+    document = {
+        "symbol_table": entry.symbol_table,
+        "words": len(entry.words),
+        "blocks": [
+            {
+                "hash": digest,
+                "words": len(block.words),
+                "ref_names": block.ref_names,
+                "label_names": block.label_names,
+            }
+            for digest, block in entry.blocks.items()
+        ],
+    }
+    metadata = json.dumps(document, separators=(",", ":")).encode("UTF-8")
+
+    columns = [entry.words]
+    for block in entry.blocks.values():
+        columns.extend((block.words, block.ref_offsets, block.label_offsets))
+
+    return b"".join(
+        [
+            ENTRY_HEADER.pack(ENTRY_MAGIC, ENTRY_VERSION, len(metadata)),
+            metadata,
+            *(
+                to_big_endian(array(column.typecode, column)).tobytes()
+                for column in columns
+            ),
+        ]
+    )
+
+
+def decode_entry(data: bytes) -> CacheEntry:
+    """
+    Load an entry serialized by `encode_entry`
+
+    Args:
+        `data` (bytes): The contents of the entry file
+
+    Returns:
+        `CacheEntry`: The entry
+
+    Raises:
+        ValueError: If `data` is not a complete entry of a supported version
+    """
+
+    try:
+        magic, version, metadata_length = ENTRY_HEADER.unpack_from(data)
+    except struct.error as error:
+        raise ValueError("Cache entry is truncated") from error
+    if magic != ENTRY_MAGIC or version != ENTRY_VERSION:
+        raise ValueError(f"Cache entry is not a version {ENTRY_VERSION} entry")
+
+    offset = ENTRY_HEADER.size + metadata_length
+    document = json.loads(data[ENTRY_HEADER.size : offset].decode("UTF-8"))
+
+    words, offset = _read_column(data, offset, WORD_TYPECODE, document["words"])
+    blocks = {}
+    for block in document["blocks"]:
+        ref_names, label_names = block["ref_names"], block["label_names"]
+        block_words, offset = _read_column(data, offset, WORD_TYPECODE, block["words"])
+        ref_offsets, offset = _read_column(
+            data, offset, OFFSET_TYPECODE, len(ref_names)
+        )
+        label_offsets, offset = _read_column(
+            data, offset, OFFSET_TYPECODE, len(label_names)
+        )
+        blocks[block["hash"]] = Block(
+            block_words, ref_offsets, ref_names, label_offsets, label_names
+        )
+
+    return CacheEntry(document["symbol_table"], words, blocks)
+
+
+def _read_column(
+    data: bytes, offset: int, typecode: str, count: int
+) -> tuple[array, int]:
+    """
+    Read `count` big-endian items of `typecode` from `data` at `offset`
+
+    Returns:
+        tuple[array, int]: The column and the offset just after it
+
+    Raises:
+        ValueError: If `data` ends before the column does
+    """
+
+    column = array(typecode)
+    end = offset + count * column.itemsize
+    if end > len(data):
+        raise ValueError("Cache entry is truncated")
+    column.frombytes(data[offset:end])
+
+    return to_big_endian(column), end
+
+
+class AssemblyCache:
+    """
+    Size bounded on-disk cache of assembled programs
+
+    Attributes:
+        `directory` (str): The directory holding the cache files
+        `max_bytes` (int): The total size of entries kept before the least recently used are evicted
+    """
+
+    def __init__(
+        self, directory: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES
+    ) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+        # Total size of the cache files, listed on first use and then kept up to date by writes
+        self._size: int | None = None
+
+    def key(self, source: bytes) -> str:
+        """
+        Build the cache key for `source` from its content and `FORMAT_DIGEST`
+
+        Args:
+            `source` (bytes): The raw .asm source
+        """
+
+        digest = hashlib.sha256(FORMAT_DIGEST)
+        digest.update(source)
+        return digest.hexdigest()
+
+    def get(self, key: str) -> CacheEntry | None:
+        """
+        Load the entry stored under `key`, marking it as recently used
+
+        Args:
+            `key` (str): The cache key
+
+        Returns:
+            `CacheEntry` | None: The entry, or None if it is missing or unreadable
+        """
+
+        path = self._path(key, ENTRY_SUFFIX)
+
+        try:
+            with open(path, "rb") as f:
+                entry = decode_entry(f.read())
+            os.utime(path)
+        except (OSError, KeyError, TypeError, ValueError):
+            return None
+
+        return entry
+
+    def put(self, key: str, entry: CacheEntry) -> None:
+        """
+        Store `entry` under `key` and evict old entries if the cache is over its size bound
+
+        Args:
+            `key` (str): The cache key
+            `entry` (`CacheEntry`): The entry to be stored
+        """
+
+        self._write(self._path(key, ENTRY_SUFFIX), encode_entry(entry))
+        if self.size() > self.max_bytes:
+            self.evict()
+
+    def size(self) -> int:
+        """
+        The total size of the cache files in bytes. The directory is listed on the first call only;
+            afterwards the size is tracked by this cache's writes, so files written by other
+            processes are counted at the next eviction
+        """
+
+        if self._size is None:
+            self._size = sum(size for _, size, _ in self._scan())
+
+        return self._size
+
+    def assemble(self, file: str, source_map: SourceMap | None = None) -> array:
+        """
+        Assemble `file`, returning the cached output if its content is unchanged
+            and otherwise reusing the unchanged blocks of its previous version
+
+        Args:
+            `file` (str): The filepath of the .asm file to be assembled
+            `source_map` (`SourceMap` | None): If set, record the source of each instruction
+                from the source already read, even if the output is cached. Defaults to None
+
+        Returns:
+            array[int]: One encoded 16-bit word per ROM address
+        """
+
+        with open_file(file, "rb") as f:
+            source = f.read()
+
+        key = self.key(source)
+        entry = self.get(key)
+        if entry is not None and source_map is None:
+            return entry.words
+
+        lines = source.decode("UTF-8").splitlines()
+        if source_map is None:
+            instructions = clean_lines(lines)
+        else:
+            instructions = source_map.record_lines(lines)
+
+        if entry is not None:
+            # An unchanged source only needs its instructions scanned into the source map
+            for _ in instructions:
+                pass
+            return entry.words
+
+        path_digest = hashlib.sha256(os.path.abspath(file).encode()).hexdigest()
+        index_path = self._path(path_digest, INDEX_SUFFIX)
+        previous = None
+        try:
+            with open(index_path, "r", encoding="UTF-8") as f:
+                previous = self.get(f.read())
+        except OSError:
+            pass
+
+        previous_blocks = previous.blocks if previous is not None else {}
+        blocks = {}
+        program = []
+
+        for lines in split_blocks(instructions):
+            digest = block_hash(lines)
+            if (block := blocks.get(digest) or previous_blocks.get(digest)) is None:
+                block = parse_block(lines)
+            blocks[digest] = block
+            program.append(block)
+
+        symbol_handler = SymbolHandler()
+        words = link_blocks(program, symbol_handler)
+
+        # The index is written first so evicting within the size bound accounts for it
+        self._write(index_path, key.encode())
+        self.put(key, CacheEntry(symbol_handler.symbol_table, words, blocks))
+
+        return words
+
+    def evict(self) -> None:
+        """
+        If the cache is over `max_bytes`, delete the least recently used entries and indexes
+            until it fits in `EVICT_TO` of `max_bytes`
+        """
+
+        entries = self._scan()
+        total = sum(size for _, size, _ in entries)
+
+        if total > self.max_bytes:
+            target = int(self.max_bytes * EVICT_TO)
+            for _, size, name in sorted(entries):
+                if total <= target:
+                    break
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except FileNotFoundError:
+                    pass
+                total -= size
+
+        self._size = total
+
+    def _scan(self) -> list[tuple[float, int, str]]:
+        """
+        List the modification time, size and name of every entry and index in the cache
+        """
+
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith((ENTRY_SUFFIX, INDEX_SUFFIX)):
+                try:
+                    stat = os.stat(os.path.join(self.directory, name))
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, name))
+
+        return entries
+
+    def _path(self, name: str, suffix: str) -> str:
+        return os.path.join(self.directory, f"{name}{suffix}")
+
+    def _write(self, path: str, data: bytes) -> None:
+        """
+        Atomically write `data` to `path` so concurrent readers never see a partial file
+        """
+
+        os.makedirs(self.directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=self.directory)
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+
+        try:
+            replaced = os.stat(path).st_size
+        except FileNotFoundError:
+            replaced = 0
+        os.replace(temp_path, path)
+
+        if self._size is not None:
+            self._size += len(data) - replaced
+
+
+# The cache of each directory opened by this process
+_open_caches: dict[str, AssemblyCache] = {}
+
+
+def open_cache(directory: str) -> AssemblyCache:
+    """
+    Get the cache of `directory` shared by every assembly in this process,
+        so its size is only listed once rather than once per file
+
+    Args:
+        `directory` (str): The directory holding the cache files
+    """
+
+    if (assembly_cache := _open_caches.get(directory)) is None:
+        assembly_cache = _open_caches[directory] = AssemblyCache(directory)
+
+    return assembly_cache
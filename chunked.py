@@ -0,0 +1,171 @@
+"""
+Module to encode a single large program in parallel.
+
+One sequential pass collects the labels and parses the program into a `CompactProgram`,
+allocating variables and encoding every word except symbol references. The symbol table is
+then frozen and its values shipped once to each worker process. The program is split into
+chunks of its compact IR, so workers receive integer arrays instead of instruction strings,
+resolve the symbol references of their chunk and format it. The results are stitched back
+together in order.
+"""
+
+from array import array
+from bisect import bisect_left
+from collections import deque
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+
+from constants import WORD_TYPECODE
+from symbol_handler import SymbolHandler
+from translator import CompactProgram, a_inst_to_int, parse_compact, word_to_bin
+
+DEFAULT_CHUNK_SIZE = 1 << 16
+
+# The frozen value of each interned symbol of the program being encoded, set once per worker
+_symbol_values: array = array("i")
+
+
+def freeze_program(
+    instructions: list[str], symbol_handler: SymbolHandler
+) -> CompactProgram:
+    """
+    Parse `instructions` into a `CompactProgram`, resolving every label and variable
+        so the symbol table can no longer change.
+        Variables are allocated in order of first appearance, as in `parse_instructions`
+
+    Args:
+        `instructions` (list[str]): The cleaned instructions
+        `symbol_handler` (`SymbolHandler`): The symbol handler to be filled. Its
+            `symbol_values` hold the value of every ID referenced by the program
+
+    Returns:
+        `CompactProgram`: The program with every word encoded except symbol references
+
+    Raises:
+        ValueError: If a numeric A-Instruction does not fit in 15 bits
+    """
+
+    symbol_handler.handle_labels(instructions)
+    return parse_compact(instructions, symbol_handler)
+
+
+def _initialize_worker(symbol_values: array) -> None:
+    """
+    Install the frozen symbol values in a worker process
+
+    Args:
+        `symbol_values` (array[int]): The value of each interned symbol ID
+    """
+
+    global _symbol_values
+    _symbol_values = symbol_values
+
+
+def split_program(program: CompactProgram, chunk_size: int) -> Iterator[CompactProgram]:
+    """
+    Split `program` into consecutive programs of at most `chunk_size` words,
+        with the symbol references of each chunk relative to its first word
+
+    Args:
+        `program` (`CompactProgram`): The parsed program
+        `chunk_size` (int): The number of words per chunk
+
+    Yields:
+        `CompactProgram`: Each chunk of the program
+    """
+
+    addresses = program.symbol_addresses
+    first = 0
+
+    for base in range(0, len(program.words), chunk_size):
+        last = bisect_left(addresses, base + chunk_size, lo=first)
+
+        chunk = CompactProgram()
+        chunk.words = program.words[base : base + chunk_size]
+        chunk.symbol_addresses = array(
+            "I", (address - base for address in addresses[first:last])
+        )
+        chunk.symbol_ids = program.symbol_ids[first:last]
+        first = last
+
+        yield chunk
+
+
+def encode_chunk(chunk: CompactProgram, symbol_values: array | None = None) -> array:
+    """
+    Resolve the symbol references of a chunk against frozen symbol values
+
+    Args:
+        `chunk` (`CompactProgram`): The chunk of the program
+        `symbol_values` (array[int] | None): The value of each interned symbol ID.
+            Defaults to the values installed in this worker
+
+    Returns:
+        array[int]: One 16-bit word per instruction
+
+    Raises:
+        ValueError: If a symbol resolves to a value that does not fit in 15 bits
+    """
+
+    if symbol_values is None:
+        symbol_values = _symbol_values
+
+    words = array(WORD_TYPECODE, chunk.words)
+
+    for address, symbol_id in zip(chunk.symbol_addresses, chunk.symbol_ids):
+        words[address] = a_inst_to_int(symbol_values[symbol_id])
+
+    return words
+
+
+def _translate_chunk(chunk: CompactProgram) -> str:
+    """
+    Encode a chunk and format it as newline separated binary text
+
+    Args:
+        `chunk` (`CompactProgram`): The chunk of the program
+    """
+
+    return "\n".join(map(word_to_bin, encode_chunk(chunk)))
+
+
+def encode_parallel(
+    instructions: list[str],
+    symbol_handler: SymbolHandler,
+    jobs: int,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    as_text: bool = False,
+) -> Iterator[array] | Iterator[str]:
+    """
+    Encode `instructions` in chunks across `jobs` worker processes, yielding results in order
+
+    Args:
+        `instructions` (list[str]): The cleaned instructions
+        `symbol_handler` (`SymbolHandler`): A fresh symbol handler for the program
+        `jobs` (int): The number of worker processes
+        `chunk_size` (int): The number of words per chunk. Defaults to `DEFAULT_CHUNK_SIZE`
+        `as_text` (bool): Whether workers format their chunk as binary text. Defaults to False
+
+    Yields:
+        array[int] | str: The words of each chunk, or its non-empty text if `as_text`
+    """
+
+    program = freeze_program(instructions, symbol_handler)
+    work = _translate_chunk if as_text else encode_chunk
+
+    # Bound the chunks in flight so finished output is written while later chunks encode
+    pending = deque()
+
+    with ProcessPoolExecutor(
+        max_workers=jobs,
+        initializer=_initialize_worker,
+        initargs=(symbol_handler.symbol_values,),
+    ) as executor:
+        for chunk in split_program(program, chunk_size):
+            pending.append(executor.submit(work, chunk))
+            if len(pending) > 2 * jobs and (result := pending.popleft().result()):
+                yield result
+
+        while pending:
+            if result := pending.popleft().result():
+                yield result
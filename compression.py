@@ -0,0 +1,94 @@
+"""
+Transparent gzip, bz2 and xz support for .asm sources and .hack outputs.
+
+The codec of a file is detected from its extension, e.g. `prog.asm.gz` or `prog.hack.xz`.
+Compressed files are opened as streams from the stdlib codecs, which compress and decompress
+a buffer at a time, so neither side is ever held whole in memory.
+"""
+
+import bz2
+import gzip
+import lzma
+from typing import IO
+
+# Compression: codec module
+CODECS = {"gzip": gzip, "bz2": bz2, "xz": lzma}
+# Compression: file extension
+SUFFIXES = {"gzip": ".gz", "bz2": ".bz2", "xz": ".xz"}
+COMPRESSIONS = tuple(CODECS)
+
+
+def detect_compression(file: str) -> str | None:
+    """
+    Detect the compression of `file` from its extension
+
+    Args:
+        `file` (str): The filepath
+
+    Returns:
+        str | None: "gzip", "bz2" or "xz", or None if the file is not compressed
+    """
+
+    for compression, suffix in SUFFIXES.items():
+        if file.endswith(suffix):
+            return compression
+
+    return None
+
+
+def strip_compression(file: str) -> str:
+    """
+    Remove a compression extension from `file`, e.g. `prog.asm.gz` becomes `prog.asm`
+
+    Args:
+        `file` (str): The filepath
+    """
+
+    if (compression := detect_compression(file)) is not None:
+        return file.removesuffix(SUFFIXES[compression])
+
+    return file
+
+
+def output_path(file: str, extension: str, compression: str | None = None) -> str:
+    """
+    Derive the path of an output of the source `file`,
+        e.g. `prog.asm.gz` becomes `prog.hack.gz` when compressed with gzip
+
+    Args:
+        `file` (str): The filepath of the source, with a 4 character extension like .asm
+        `extension` (str): The extension of the output, e.g. ".hack"
+        `compression` (str | None): The compression of the output. Defaults to None
+
+    Returns:
+        str: The filepath of the output
+    """
+
+    suffix = SUFFIXES[compression] if compression else ""
+    return f"{strip_compression(file)[:-4]}{extension}{suffix}"
+
+
+def open_file(file: str, mode: str = "r", compression: str | None = None) -> IO:
+    """
+    Open `file`, decompressing or compressing it as a stream if it is compressed
+
+    Args:
+        `file` (str): The filepath
+        `mode` (str): "r", "w", "rb" or "wb". Text modes use UTF-8. Defaults to "r"
+        `compression` (str | None): The compression to use.
+            Defaults to None, which detects it from the extension
+
+    Returns:
+        IO: The open file object
+    """
+
+    compression = compression or detect_compression(file)
+    encoding = None if "b" in mode else "UTF-8"
+
+    if compression is None:
+        return open(file, mode, encoding=encoding)
+
+    if encoding is not None:
+        mode += "t"
+
+    return CODECS[compression].open(file, mode, encoding=encoding)
@@ -7,6 +7,8 @@ d: dest bits
 j: jump bits
 """
 
+ASSEMBLER_VERSION = "0.1.0"
+
 # Symbol: Memory Address
 PRE_DEFINED_SYMBOLS = {
     "R0":       0,
@@ -93,6 +95,25 @@ NO_DEST = "000"
 
 BIN_START = "111"
 
+# Integer forms of the tables above, pre-shifted into their bit positions
+# so a C-Instruction word is just C_INST_START | comp | dest | jump
+COMP_CODES = {comp: int(bits, 2) << 6 for comp, bits in COMP_TABLE.items()}
+DEST_CODES = {dest: int(bits, 2) << 3 for dest, bits in DEST_TABLE.items()}
+JUMP_CODES = {jump: int(bits, 2) for jump, bits in JUMP_TABLE.items()}
+
+NO_JUMP_CODE = 0
+NO_DEST_CODE = 0
+
+C_INST_START = int(BIN_START, 2) << 13
+
+WORD_FORMAT = "016b"
+
+# Typecode of in-memory arrays of encoded words
+WORD_TYPECODE = "H"
+
+# Largest value an A-Instruction can load, since its top bit marks it as an A-Instruction
+MAX_A_VALUE = (1 << 15) - 1
+
 LABEL_START = '('
 LABEL_END = ')'
 VAR_START = '@'
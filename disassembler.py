@@ -0,0 +1,219 @@
+"""
+Disassembler that decodes .hack text or binary ROM images back into assembly.
+
+Decoding is a single index into a precomputed 65536-entry table built from the reversed
+`COMP_TABLE`/`DEST_TABLE`/`JUMP_TABLE`. A-Instructions decode to "@value" since symbol names
+are not kept in machine code.
+
+Usage:
+    > python3 disassembler.py {file_name}.hack [-o {file_name}.asm] [--verify]
+"""
+
+from argparse import ArgumentParser
+from array import array
+from collections.abc import Iterable
+import sys
+
+from compression import open_file
+from constants import (
+    C_INST_START,
+    COMP_CODES,
+    DEST_CODES,
+    JUMP_CODES,
+    VAR_START,
+    WORD_TYPECODE,
+)
+from one_pass import assemble_one_pass
+from rom_image import BYTEORDERS, load_binary
+from symbol_handler import SymbolHandler
+
+WORD_COUNT = 1 << 16
+# A-Instructions have a 0 in their top bit
+A_INST_COUNT = 1 << 15
+
+# Code: Symbol
+COMP_NAMES = {code >> 6: comp for comp, code in COMP_CODES.items()}
+DEST_NAMES = {code >> 3: dest for dest, code in DEST_CODES.items()}
+JUMP_NAMES = {code: jump for jump, code in JUMP_CODES.items()}
+
+_decode_table: list[str | None] | None = None
+
+
+def build_decode_table() -> list[str | None]:
+    """
+    Build the assembly text of every 16-bit word
+
+    Returns:
+        list[str | None]: The canonical instruction for each word, or None if the word is not
+            a valid instruction
+    """
+
+    table: list[str | None] = [f"{VAR_START}{word}" for word in range(A_INST_COUNT)]
+    table.extend([None] * (C_INST_START - len(table)))
+
+    for word in range(C_INST_START, WORD_COUNT):
+        if (comp := COMP_NAMES.get((word >> 6) & 0x7F)) is None:
+            table.append(None)
+            continue
+
+        dest = DEST_NAMES.get((word >> 3) & 0x7)
+        jump = JUMP_NAMES.get(word & 0x7)
+        table.append(f"{dest + '=' if dest else ''}{comp}{';' + jump if jump else ''}")
+
+    return table
+
+
+def get_decode_table() -> list[str | None]:
+    """
+    Get the decode table, building it on first use
+    """
+
+    global _decode_table
+    if _decode_table is None:
+        _decode_table = build_decode_table()
+
+    return _decode_table
+
+
+def disassemble(words: Iterable[int]) -> list[str]:
+    """
+    Decode encoded words into assembly instructions
+
+    Args:
+        `words` (Iterable[int]): The encoded 16-bit words
+
+    Returns:
+        list[str]: One canonical instruction per word
+
+    Raises:
+        ValueError: if a word is not a valid Hack instruction
+    """
+
+    table = get_decode_table()
+    instructions = []
+
+    for address, word in enumerate(words):
+        if not 0 <= word < WORD_COUNT or (instruction := table[word]) is None:
+            raise ValueError(
+                f"Word {word:016b} at ROM address {address} is not a valid instruction"
+            )
+        instructions.append(instruction)
+
+    return instructions
+
+
+def load_hack_text(file: str) -> array:
+    """
+    Load a .hack text file of "0"/"1" lines, which may be compressed
+
+    Args:
+        `file` (str): The filepath of the .hack file
+
+    Returns:
+        array[int]: The encoded words
+    """
+
+    with open_file(file) as f:
+        return array(WORD_TYPECODE, (int(line, 2) for line in f if line.strip()))
+
+
+def load_rom(file: str, byteorder: str = "big") -> array:
+    """
+    Load a .hack file written as text or as a binary ROM image, either of which may be compressed
+
+    Args:
+        `file` (str): The filepath of the .hack file
+        `byteorder` (str): The byte order of a headerless binary image. Defaults to "big"
+
+    Returns:
+        array[int]: The encoded words
+    """
+
+    with open_file(file, "rb") as f:
+        sample = f.read(4096)
+
+    if sample and not sample.strip(b"01\r\n"):
+        return load_hack_text(file)
+
+    return load_binary(file, byteorder)
+
+
+def verify_round_trip(words: Iterable[int]) -> int | None:
+    """
+    Disassemble `words`, reassemble the result and compare it with the original
+
+    Args:
+        `words` (Iterable[int]): The encoded words
+
+    Returns:
+        int | None: The first ROM address that did not survive the round trip, or None
+    """
+
+    words = list(words)
+    reassembled = assemble_one_pass(disassemble(words), SymbolHandler())
+
+    for address, (word, rebuilt) in enumerate(zip(words, reassembled)):
+        if word != rebuilt:
+            return address
+
+    if len(words) != len(reassembled):
+        return min(len(words), len(reassembled))
+
+    return None
+
+
+def initialize_argparser() -> ArgumentParser:
+    """
+    Initialize the ArgumentParser for command-line-arguments
+    """
+
+    arg_parser = ArgumentParser(
+        prog="HackDisassembler",
+        description="Disassemble Hack machine code into assembly.",
+    )
+    arg_parser.add_argument(
+        "file", metavar="file.hack", type=str, help="the .hack text or binary ROM image"
+    )
+    arg_parser.add_argument(
+        "-o",
+        "--output",
+        type=str,
+        help="filepath of the .asm file to write (default: stdout)",
+    )
+    arg_parser.add_argument(
+        "--byteorder",
+        choices=BYTEORDERS,
+        default="big",
+        help="byte order of a headerless binary ROM image",
+    )
+    arg_parser.add_argument(
+        "--verify",
+        action="store_true",
+        help="reassemble the disassembly and check it reproduces the input exactly",
+    )
+
+    return arg_parser
+
+
+if __name__ == "__main__":
+    args = initialize_argparser().parse_args()
+    rom = load_rom(args.file, args.byteorder)
+
+    try:
+        if args.verify:
+            if (mismatch := verify_round_trip(rom)) is not None:
+                print(f"Round trip differs at ROM address {mismatch}", file=sys.stderr)
+                sys.exit(1)
+            print(f"Round trip verified for {len(rom)} words", file=sys.stderr)
+            sys.exit()
+
+        disassembly = "\n".join(disassemble(rom))
+    except ValueError as error:
+        print(error, file=sys.stderr)
+        sys.exit(1)
+
+    if args.output:
+        with open(args.output, "w", encoding="UTF-8") as f:
+            f.write(disassembly)
+    else:
+        print(disassembly)
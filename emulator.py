@@ -0,0 +1,319 @@
+"""
+Hack CPU emulator that runs encoded words straight from the assembler's output.
+
+Every distinct C-Instruction word in the ROM is decoded once, through the reversed
+`COMP_TABLE`/`DEST_TABLE`/`JUMP_TABLE`, into a small compiled Python function, so executing an
+instruction is one table lookup and one call with no per-cycle decoding. A-Instructions are
+handled inline. RAM is a flat `array('h')` of 16-bit words with the screen and keyboard mapped
+at `SCREEN` and `KBD`.
+
+A program halts when it jumps past the end of the ROM or reaches the usual `(END) @END 0;JMP`
+idle loop; otherwise `run` stops once its cycle budget is spent and can be called again.
+
+Usage:
+    > python3 emulator.py {file_name}.hack [--cycles N] [--profile]
+"""
+
+from argparse import ArgumentParser
+from array import array
+from collections.abc import Callable, Iterable
+import sys
+import time
+
+from constants import C_INST_START, PRE_DEFINED_SYMBOLS
+from disassembler import COMP_NAMES, DEST_NAMES, JUMP_NAMES, get_decode_table, load_rom
+from rom_image import BYTEORDERS
+
+RAM_WORDS = 1 << 15
+SCREEN = PRE_DEFINED_SYMBOLS["SCREEN"]
+KBD = PRE_DEFINED_SYMBOLS["KBD"]
+# Mask of the 15 address bits of A used for addressing M and jumping
+ADDRESS_MASK = RAM_WORDS - 1
+# A word in the gap between A-Instructions and C-Instructions, never a valid instruction, that
+# replaces the jump of an idle loop so reaching it stops `run`
+HALT = 1 << 15
+UNCONDITIONAL_JUMP = 0b111
+
+# Jump: condition on the computed value `v`
+JUMP_CONDITIONS = {
+    "JGT": "v > 0",
+    "JEQ": "v == 0",
+    "JGE": "v >= 0",
+    "JLT": "v < 0",
+    "JNE": "v != 0",
+    "JLE": "v <= 0",
+}
+
+DEFAULT_CYCLES = 10_000_000
+
+
+class Halted(Exception):
+    """
+    Raised by the operation that replaces the jump of an idle loop
+    """
+
+
+def compile_instruction(
+    word: int, ram: array
+) -> Callable[[int, int, int], tuple[int, int, int]]:
+    """
+    Compile a C-Instruction word into a function of the registers
+
+    Args:
+        `word` (int): The encoded C-Instruction
+        `ram` (array[int]): The RAM the instruction reads and writes as M
+
+    Returns:
+        Callable[[int, int, int], tuple[int, int, int]]: Maps (A, D, pc) to the new (A, D, pc)
+
+    Raises:
+        ValueError: If `word` is not a valid C-Instruction
+    """
+
+    if (
+        not C_INST_START <= word <= 0xFFFF
+        or (comp := COMP_NAMES.get((word >> 6) & 0x7F)) is None
+    ):
+        raise ValueError(f"Word {word:016b} is not a valid C-Instruction")
+    dest = DEST_NAMES.get((word >> 3) & 0x7, "")
+    jump = JUMP_NAMES.get(word & 0x7)
+
+    memory = f"ram[A & {ADDRESS_MASK}]"
+    lines = [f"    v = {comp.replace('!', '~').replace('M', memory)}"]
+    if "+" in comp or "-" in comp:
+        # Wrap to a signed 16-bit value like the ALU; bitwise results already fit
+        lines.append("    v = ((v + 32768) & 65535) - 32768")
+    if "M" in dest:
+        lines.append(f"    {memory} = v")
+    if jump:
+        # The jump goes to the value A held before this instruction wrote to it
+        lines.append(f"    target = A & {ADDRESS_MASK}")
+    if "A" in dest:
+        lines.append("    A = v")
+    if "D" in dest:
+        lines.append("    D = v")
+
+    if jump is None:
+        lines.append("    return A, D, pc + 1")
+    elif jump == "JMP":
+        lines.append("    return A, D, target")
+    else:
+        lines.append(f"    return A, D, target if {JUMP_CONDITIONS[jump]} else pc + 1")
+
+    namespace = {"ram": ram}
+    exec("\n".join(["def instruction(A, D, pc):", *lines]), namespace)
+
+    return namespace["instruction"]
+
+
+def _halt(A: int, D: int, pc: int) -> tuple[int, int, int]:
+    raise Halted
+
+
+class Emulator:
+    """
+    A Hack computer loaded with a program
+
+    Attributes:
+        `rom` (array[int]): The program, one word per ROM address
+        `ram` (array[int]): The 32K words of RAM, including the screen and keyboard maps
+        `a`, `d`, `pc` (int): The registers
+        `cycles` (int): The instructions executed since the last `reset`
+        `halted` (bool): Whether the program ran off the ROM or reached an idle loop
+        `profile` (array[int] | None): Instructions executed at each ROM address,
+            if profiling was requested
+    """
+
+    def __init__(self, words: Iterable[int], profile: bool = False) -> None:
+        self.rom = array("I", words)
+        self.ram = array("h", bytes(2 * RAM_WORDS))
+        self.profile = array("Q", bytes(8 * len(self.rom))) if profile else None
+        self._code = array("I", self.rom)
+        self._instructions: dict[int, Callable] = {HALT: _halt}
+
+        for address, word in enumerate(self.rom):
+            if word < HALT:
+                continue
+            if word not in self._instructions:
+                self._instructions[word] = compile_instruction(word, self.ram)
+            if self._is_idle_loop(address):
+                self._code[address] = HALT
+
+        self.reset()
+
+    def reset(self) -> None:
+        """
+        Clear the registers, RAM and profile so the program runs again from address 0
+        """
+
+        self.a = self.d = self.pc = self.cycles = 0
+        self.halted = False
+        self.ram[:] = array("h", bytes(2 * RAM_WORDS))
+        if self.profile is not None:
+            self.profile[:] = array("Q", bytes(8 * len(self.rom)))
+
+    def run(self, max_cycles: int = DEFAULT_CYCLES) -> int:
+        """
+        Execute up to `max_cycles` instructions, stopping early if the program halts
+
+        Args:
+            `max_cycles` (int): The cycle budget
+
+        Returns:
+            int: The number of instructions executed
+        """
+
+        if self.halted:
+            return 0
+
+        code, instructions, profile = self._code, self._instructions, self.profile
+        a, d, pc = self.a, self.d, self.pc
+        cycles = 0
+
+        try:
+            if profile is None:
+                while cycles < max_cycles:
+                    word = code[pc]
+                    if word < HALT:
+                        a = word
+                        pc += 1
+                    else:
+                        a, d, pc = instructions[word](a, d, pc)
+                    cycles += 1
+            else:
+                while cycles < max_cycles:
+                    word = code[pc]
+                    if word < HALT:
+                        profile[pc] += 1
+                        a = word
+                        pc += 1
+                    else:
+                        address = pc
+                        a, d, pc = instructions[word](a, d, pc)
+                        profile[address] += 1
+                    cycles += 1
+        except (Halted, IndexError):
+            self.halted = True
+
+        self.a, self.d, self.pc = a, d, pc
+        self.cycles += cycles
+
+        return cycles
+
+    @property
+    def screen(self) -> memoryview:
+        """
+        The screen memory map, 32 words of 16 pixels for each of 256 rows
+        """
+
+        return memoryview(self.ram)[SCREEN:KBD]
+
+    @property
+    def keyboard(self) -> int:
+        """
+        The code of the key currently pressed, or 0
+        """
+
+        return self.ram[KBD]
+
+    @keyboard.setter
+    def keyboard(self, key: int) -> None:
+        self.ram[KBD] = key
+
+    def hot_spots(self, count: int = 10) -> list[tuple[int, int]]:
+        """
+        The most executed ROM addresses
+
+        Args:
+            `count` (int): The number of addresses to return. Defaults to 10
+
+        Returns:
+            list[tuple[int, int]]: (address, executions), most executed first
+
+        Raises:
+            ValueError: If the emulator was not created with `profile=True`
+        """
+
+        if self.profile is None:
+            raise ValueError("Profiling was not enabled for this emulator")
+
+        ranked = sorted(
+            range(len(self.profile)), key=self.profile.__getitem__, reverse=True
+        )
+        return [(address, self.profile[address]) for address in ranked[:count]]
+
+    def _is_idle_loop(self, address: int) -> bool:
+        """
+        Check whether the C-Instruction at `address` is the jump of an `(END) @END 0;JMP` loop
+
+        Args:
+            `address` (int): The ROM address of a C-Instruction
+        """
+
+        word = self.rom[address]
+        return (
+            address > 0
+            and self.rom[address - 1] == address - 1
+            and word & 0x7 == UNCONDITIONAL_JUMP
+            and (word >> 3) & 0x7 == 0
+        )
+
+
+def initialize_argparser() -> ArgumentParser:
+    """
+    Initialize the ArgumentParser for command-line-arguments
+    """
+
+    arg_parser = ArgumentParser(
+        prog="HackEmulator", description="Run Hack machine code."
+    )
+    arg_parser.add_argument(
+        "file", metavar="file.hack", type=str, help="the .hack text or binary ROM image"
+    )
+    arg_parser.add_argument(
+        "--cycles",
+        type=int,
+        default=DEFAULT_CYCLES,
+        help=f"maximum number of instructions to execute (default: {DEFAULT_CYCLES})",
+    )
+    arg_parser.add_argument(
+        "--byteorder",
+        choices=BYTEORDERS,
+        default="big",
+        help="byte order of a headerless binary ROM image",
+    )
+    arg_parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="count the instructions executed at each ROM address and print the hottest",
+    )
+
+    return arg_parser
+
+
+if __name__ == "__main__":
+    args = initialize_argparser().parse_args()
+
+    try:
+        emulator = Emulator(load_rom(args.file, args.byteorder), args.profile)
+    except ValueError as error:
+        print(error, file=sys.stderr)
+        sys.exit(1)
+
+    start = time.perf_counter()
+    cycles = emulator.run(args.cycles)
+    seconds = time.perf_counter() - start
+
+    status = "halted" if emulator.halted else "cycle budget reached"
+    print(
+        f"{cycles} cycles in {seconds * 1000:.1f} ms "
+        f"({cycles / seconds / 1e6:.2f} M cycles/s), {status} at pc {emulator.pc}",
+        file=sys.stderr,
+    )
+
+    if args.profile:
+        decode_table = get_decode_table()
+        for address, executions in emulator.hot_spots():
+            print(
+                f"{address:>6} {executions:>12} {decode_table[emulator.rom[address]]}"
+            )
@@ -1,9 +1,38 @@
 from argparse import ArgumentParser, Namespace
+from array import array
+from collections.abc import Iterable
+from contextlib import nullcontext
+from functools import partial
 import sys
+from typing import Any
 
-from hasm_parser import parse_file, parse_instructions
+from batch import AssemblyResult, assemble_batch, expand_sources
+from cache import DEFAULT_CACHE_DIR, AssemblyCache, open_cache
+from chunked import encode_parallel
+from compression import COMPRESSIONS, detect_compression, open_file, output_path
+from constants import WORD_TYPECODE
+from hasm_parser import (
+    clean_lines,
+    clean_lines_mmap,
+    iter_instructions,
+    read_lines,
+    read_lines_mmap,
+)
+from numpy_backend import HAS_NUMPY, render_text, resolve_words, to_word_array
+from one_pass import assemble_one_pass
+from peephole import kept_addresses, optimize_with_origins
+from profiling import Profiler, iterate, set_profiler, stage, track_kinds
+from rom_image import BYTEORDERS, write_binary, write_binary_stream
+from sourcemap import MAP_FORMATS, SourceMap, write_source_map
 from symbol_handler import SymbolHandler
-from translator import translate_instructions
+from symbol_store import DiskSymbolTable
+from translator import iter_encode, parse_compact, resolve_compact, word_to_bin
+from watch import DEFAULT_INTERVAL, Watcher
+
+OUTPUT_FORMATS = ("text", "binary")
+BACKENDS = ("python", "numpy")
+# "auto" compresses the output like its source, "none" never compresses it
+COMPRESS_CHOICES = ("auto", "none", *COMPRESSIONS)
 
 
 def initialize_argparser() -> ArgumentParser:
@@ -12,13 +41,123 @@ def initialize_argparser() -> ArgumentParser:
     """
 
     arg_parser = ArgumentParser(
-        prog="HackAssembler", description="Assemble Hack .asm file into machine code."
+        prog="HackAssembler", description="Assemble Hack .asm files into machine code."
     )
     arg_parser.add_argument(
-        "file",
+        "files",
         metavar="file.asm",
         type=str,
-        help="absolute filepath of the .asm file to be assembled",
+        nargs="+",
+        help="filepaths of .asm files, directories or glob patterns to be assembled",
+    )
+    arg_parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="number of worker processes used to assemble multiple files",
+    )
+    arg_parser.add_argument(
+        "--chunked",
+        action="store_true",
+        help="split each file into chunks encoded across the -j worker processes",
+    )
+    arg_parser.add_argument(
+        "-O",
+        "--optimize",
+        action="store_true",
+        help="apply peephole rewrites that remove dead loads, jumps to the next instruction "
+        "and unreachable code (assumes every jump target is a label)",
+    )
+    arg_parser.add_argument(
+        "--source-map",
+        choices=MAP_FORMATS,
+        help="also write a map from ROM address to source line next to each .hack file, "
+        "recorded while the file is assembled",
+    )
+    arg_parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="stay resident and reassemble the files whenever they change",
+    )
+    arg_parser.add_argument(
+        "--watch-interval",
+        type=float,
+        default=DEFAULT_INTERVAL,
+        help=f"seconds between polls in --watch mode (default: {DEFAULT_INTERVAL})",
+    )
+    arg_parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="always reassemble instead of reusing results cached in --cache-dir",
+    )
+    arg_parser.add_argument(
+        "--cache-dir",
+        type=str,
+        default=DEFAULT_CACHE_DIR,
+        help=f"directory of the assembly cache (default: {DEFAULT_CACHE_DIR})",
+    )
+    arg_parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="record time, calls and allocations per stage and print them to stderr",
+    )
+    arg_parser.add_argument(
+        "--profile-output",
+        type=str,
+        metavar="PREFIX",
+        help="with --profile, also write PREFIX.pstats and PREFIX.collapsed (flamegraph stacks)",
+    )
+    arg_parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="stream the file through the assembler line by line to bound memory use",
+    )
+    arg_parser.add_argument(
+        "--symbol-store",
+        metavar="DIR",
+        type=str,
+        help="with --stream, keep the symbol table in a temporary database in DIR "
+        "behind an in-memory cache, for programs with millions of symbols",
+    )
+    arg_parser.add_argument(
+        "--mmap",
+        action="store_true",
+        help="with --stream or --one-pass, memory-map the source instead of reading it",
+    )
+    arg_parser.add_argument(
+        "--one-pass",
+        action="store_true",
+        help="encode while reading and backpatch forward label references at the end",
+    )
+    arg_parser.add_argument(
+        "--format",
+        choices=OUTPUT_FORMATS,
+        default="text",
+        help="write '0'/'1' text (default) or a raw binary ROM image of 16-bit words",
+    )
+    arg_parser.add_argument(
+        "--compress",
+        choices=COMPRESS_CHOICES,
+        default="auto",
+        help="compress the .hack output (default: auto, the same as a .gz, .bz2 or .xz source)",
+    )
+    arg_parser.add_argument(
+        "--backend",
+        choices=BACKENDS,
+        default="python",
+        help="resolve and format whole programs with NumPy array operations if installed",
+    )
+    arg_parser.add_argument(
+        "--byteorder",
+        choices=BYTEORDERS,
+        default="big",
+        help="byte order of the words in a binary ROM image",
+    )
+    arg_parser.add_argument(
+        "--header",
+        action="store_true",
+        help="prefix a binary ROM image with a header holding the instruction count",
     )
 
     return arg_parser
@@ -30,28 +169,475 @@ def initialize_arguments(arg_parser: ArgumentParser) -> Namespace:
     """
 
     arg_namespace = arg_parser.parse_args()
+    # Keep the paths as given so --watch picks up files added to directories later
+    arg_namespace.sources = arg_namespace.files
+    arg_namespace.files = expand_sources(arg_namespace.files)
 
-    if arg_namespace.file[-4:] != ".asm":
+    if not arg_namespace.files:
         arg_parser.print_usage()
         sys.exit()
 
+    # Only the default in-memory pipeline applies -O and the NumPy backend
+    pipelines = {
+        "--stream": arg_namespace.stream,
+        "--one-pass": arg_namespace.one_pass,
+        "--chunked": arg_namespace.chunked,
+    }
+    if arg_namespace.optimize:
+        reject_combinations(arg_parser, "-O", pipelines)
+    if arg_namespace.backend == "numpy":
+        reject_combinations(arg_parser, "--backend numpy", pipelines)
+    if arg_namespace.chunked:
+        reject_combinations(
+            arg_parser,
+            "--chunked",
+            {"--stream": arg_namespace.stream, "--one-pass": arg_namespace.one_pass},
+        )
+
+    if arg_namespace.symbol_store and not arg_namespace.stream:
+        arg_parser.error("--symbol-store requires --stream")
+    if arg_namespace.mmap and not (arg_namespace.stream or arg_namespace.one_pass):
+        arg_parser.error("--mmap requires --stream or --one-pass")
+
     return arg_namespace
 
 
+def reject_combinations(
+    arg_parser: ArgumentParser, flag: str, others: dict[str, Any]
+) -> None:
+    """
+    Exit with a usage error if any of the options in `others` was given together with `flag`
+
+    Args:
+        `arg_parser` (ArgumentParser): The parser reporting the error
+        `flag` (str): The option that was given
+        `others` (dict[str, Any]): Each conflicting option and its parsed value
+    """
+
+    if conflicts := [other for other, value in others.items() if value]:
+        arg_parser.error(f"{flag} cannot be combined with {', '.join(conflicts)}")
+
+
+def source_lines(
+    file: str, use_mmap: bool = False, source_map: SourceMap | None = None
+) -> Iterable[str]:
+    """
+    Lazily read the cleaned instructions of `file`
+
+    Args:
+        `file` (str): The filepath of the .asm file
+        `use_mmap` (bool): Whether to memory-map the file, unless it is compressed.
+            Defaults to False
+        `source_map` (`SourceMap` | None): If set, record the source of each instruction
+            into it as it is read. Defaults to None
+    """
+
+    use_mmap = use_mmap and detect_compression(file) is None
+
+    if source_map is not None:
+        lines = iterate("read", (read_lines_mmap if use_mmap else read_lines)(file))
+        return iterate("strip", source_map.record_lines(lines))
+    if use_mmap:
+        return iterate("strip", clean_lines_mmap(file))
+
+    return iterate("strip", clean_lines(iterate("read", read_lines(file))))
+
+
+def write_hack(binary_instructions: Iterable[str], file: str) -> None:
+    """
+    Write binary instructions to `file` one line at a time, separated by newlines.
+        A .gz, .bz2 or .xz `file` is compressed a buffer at a time as it is written
+
+    Args:
+        `binary_instructions` (Iterable[str]): The instructions in binary (as strings)
+        `file` (str): The filepath of the .hack file to be written
+    """
+
+    with open_file(file, "w") as f:
+        separator = ""
+        for binary_instruction in binary_instructions:
+            f.write(separator)
+            f.write(binary_instruction)
+            separator = "\n"
+
+
+def assemble_file(
+    file: str,
+    out_file: str,
+    output_format: str = "text",
+    byteorder: str = "big",
+    header: bool = False,
+    cache: AssemblyCache | None = None,
+    backend: str = "python",
+    optimize: bool = False,
+    source_map: SourceMap | None = None,
+) -> None:
+    """
+    Assemble `file` into `out_file`, holding the whole program in memory as a `CompactProgram`
+
+    Args:
+        `file` (str): The filepath of the .asm file to be assembled
+        `out_file` (str): The filepath of the .hack file to be written
+        `output_format` (str): "text" or "binary". Defaults to "text"
+        `byteorder` (str): Byte order of a binary ROM image. Defaults to "big"
+        `header` (bool): Whether to prefix a binary ROM image with a header. Defaults to False
+        `cache` (`AssemblyCache` | None): A cache of previous assemblies to reuse. Defaults to None
+        `backend` (str): "python" or "numpy" (requires NumPy). Defaults to "python"
+        `optimize` (bool): Whether to apply the peephole optimizer. Defaults to False
+        `source_map` (`SourceMap` | None): If set, record the source of each ROM address
+            into it. Defaults to None
+    """
+
+    use_numpy = backend == "numpy"
+
+    if cache is not None:
+        with stage("cache"):
+            words = cache.assemble(file, source_map)
+    else:
+        symbol_handler = SymbolHandler()
+
+        with stage("parse_file"):
+            parsed_file = list(source_lines(file, source_map=source_map))
+        if optimize:
+            with stage("optimize"):
+                optimized, origins, report = optimize_with_origins(parsed_file)
+                if source_map is not None:
+                    source_map.keep(kept_addresses(parsed_file, origins))
+                parsed_file = optimized
+            print(
+                f"{file}: -O saved {report.words_saved} words, "
+                f"~{report.cycles_saved} cycles per pass",
+                file=sys.stderr,
+            )
+        with stage("handle_labels"):
+            symbol_handler.handle_labels(parsed_file)
+        with stage("parse_compact"):
+            program = parse_compact(track_kinds(parsed_file), symbol_handler)
+        with stage("resolve_symbols"):
+            if use_numpy:
+                words = resolve_words(program, symbol_handler)
+            else:
+                words = resolve_compact(program, symbol_handler)
+
+    if source_map is not None:
+        source_map.resolve_values(words)
+
+    with stage("write"):
+        if output_format == "binary":
+            if use_numpy:
+                words = to_word_array(words)
+            write_binary(words, out_file, byteorder, header)
+        elif use_numpy:
+            with open_file(out_file, "wb") as f:
+                f.write(render_text(words))
+        else:
+            write_hack(map(word_to_bin, words), out_file)
+
+
+def assemble_file_streaming(
+    file: str,
+    out_file: str,
+    output_format: str = "text",
+    byteorder: str = "big",
+    header: bool = False,
+    use_mmap: bool = False,
+    symbol_store: str | None = None,
+    source_map: SourceMap | None = None,
+) -> None:
+    """
+    Assemble `file` into `out_file` as a chain of generators.
+        The first pass only collects labels, so the second pass holds
+        nothing but the symbol table in memory
+
+    Args:
+        `file` (str): The filepath of the .asm file to be assembled
+        `out_file` (str): The filepath of the .hack file to be written
+        `output_format` (str): "text" or "binary". Defaults to "text"
+        `byteorder` (str): Byte order of a binary ROM image. Defaults to "big"
+        `header` (bool): Whether to prefix a binary ROM image with a header. Defaults to False
+        `use_mmap` (bool): Whether to memory-map the source. Defaults to False
+        `symbol_store` (str | None): If set, spill the symbol table to a temporary database
+            in this directory instead of holding it in memory. Defaults to None
+        `source_map` (`SourceMap` | None): If set, record the source of each ROM address
+            into it during the second pass. Defaults to None
+    """
+
+    store = DiskSymbolTable(symbol_store) if symbol_store is not None else nullcontext()
+
+    with store as symbol_table:
+        symbol_handler = SymbolHandler(symbol_table)
+        with stage("handle_labels"):
+            symbol_handler.handle_labels(source_lines(file, use_mmap))
+
+        with stage("stream"):
+            lines = source_lines(file, use_mmap, source_map)
+            instructions = iter_instructions(track_kinds(lines), symbol_handler)
+            words = iterate("encode", iter_encode(instructions, symbol_handler))
+            if source_map is not None:
+                words = source_map.record_values(words)
+
+            if output_format == "binary":
+                write_binary_stream(words, out_file, byteorder, header)
+            else:
+                write_hack(map(word_to_bin, words), out_file)
+
+
+def assemble_file_one_pass(
+    file: str,
+    out_file: str,
+    output_format: str = "text",
+    byteorder: str = "big",
+    header: bool = False,
+    use_mmap: bool = False,
+    source_map: SourceMap | None = None,
+) -> None:
+    """
+    Assemble `file` into `out_file` reading the source only once,
+        backpatching references to labels declared later in the file
+
+    Args:
+        `file` (str): The filepath of the .asm file to be assembled
+        `out_file` (str): The filepath of the .hack file to be written
+        `output_format` (str): "text" or "binary". Defaults to "text"
+        `byteorder` (str): Byte order of a binary ROM image. Defaults to "big"
+        `header` (bool): Whether to prefix a binary ROM image with a header. Defaults to False
+        `use_mmap` (bool): Whether to memory-map the source. Defaults to False
+        `source_map` (`SourceMap` | None): If set, record the source of each ROM address
+            into it as it is encoded. Defaults to None
+    """
+
+    with stage("one_pass"):
+        lines = source_lines(file, use_mmap, source_map)
+        words = assemble_one_pass(track_kinds(lines), SymbolHandler())
+    if source_map is not None:
+        source_map.resolve_values(words)
+
+    with stage("write"):
+        if output_format == "binary":
+            write_binary(words, out_file, byteorder, header)
+        else:
+            write_hack(map(word_to_bin, words), out_file)
+
+
+def assemble_file_chunked(
+    file: str,
+    out_file: str,
+    output_format: str = "text",
+    byteorder: str = "big",
+    header: bool = False,
+    jobs: int = 1,
+    source_map: SourceMap | None = None,
+) -> None:
+    """
+    Assemble `file` into `out_file`, encoding chunks of the program across `jobs` processes
+        once its symbol table has been frozen
+
+    Args:
+        `file` (str): The filepath of the .asm file to be assembled
+        `out_file` (str): The filepath of the .hack file to be written
+        `output_format` (str): "text" or "binary". Defaults to "text"
+        `byteorder` (str): Byte order of a binary ROM image. Defaults to "big"
+        `header` (bool): Whether to prefix a binary ROM image with a header. Defaults to False
+        `jobs` (int): The number of worker processes. Defaults to 1
+        `source_map` (`SourceMap` | None): If set, record the source of each ROM address
+            into it. Defaults to None
+    """
+
+    parsed_file = list(source_lines(file, source_map=source_map))
+    # The source map needs the words, so workers only format text when there is none
+    as_text = output_format != "binary" and source_map is None
+    chunks = encode_parallel(parsed_file, SymbolHandler(), jobs, as_text=as_text)
+
+    if as_text:
+        write_hack(chunks, out_file)
+        return
+
+    words = array(WORD_TYPECODE)
+    for chunk in chunks:
+        words.extend(chunk)
+    if source_map is not None:
+        source_map.resolve_values(words)
+
+    if output_format == "binary":
+        write_binary(words, out_file, byteorder, header)
+    else:
+        write_hack(map(word_to_bin, words), out_file)
+
+
+def assemble(
+    file: str,
+    stream: bool = False,
+    output_format: str = "text",
+    byteorder: str = "big",
+    header: bool = False,
+    chunked_jobs: int = 0,
+    cache_dir: str | None = None,
+    one_pass: bool = False,
+    use_mmap: bool = False,
+    backend: str = "python",
+    source_map: str | None = None,
+    optimize: bool = False,
+    compress: str = "auto",
+    symbol_store: str | None = None,
+) -> None:
+    """
+    Assemble `file` into a .hack file next to it
+
+    Args:
+        `file` (str): The filepath of the .asm file to be assembled
+        `stream` (bool): Whether to use the streaming pipeline. Defaults to False
+        `output_format` (str): "text" or "binary". Defaults to "text"
+        `byteorder` (str): Byte order of a binary ROM image. Defaults to "big"
+        `header` (bool): Whether to prefix a binary ROM image with a header. Defaults to False
+        `chunked_jobs` (int): If set, encode chunks of the file across this many processes
+        `cache_dir` (str | None): If set, reuse and update the assembly cache in this directory.
+            Only used by the default in-memory pipeline
+        `one_pass` (bool): Whether to use the single-pass backpatching engine. Defaults to False
+        `use_mmap` (bool): Whether the streaming and single-pass engines memory-map the source.
+            Defaults to False
+        `backend` (str): "python" or "numpy", used by the default in-memory pipeline.
+            Defaults to "python"
+        `source_map` (str | None): If set, also write a source map in this format ("jsonl"
+            or "binary"), recorded by whichever pipeline assembles the file
+        `optimize` (bool): Whether to apply the peephole optimizer, which bypasses the cache
+            and is only used by the default in-memory pipeline. Defaults to False
+        `compress` (str): "auto" to compress the output like `file`, "none", "gzip", "bz2"
+            or "xz". Defaults to "auto"
+        `symbol_store` (str | None): If set, the streaming pipeline spills its symbol table
+            to a temporary database in this directory. Defaults to None
+    """
+
+    if compress == "auto":
+        compression = detect_compression(file)
+    else:
+        compression = None if compress == "none" else compress
+    out_file = output_path(file, ".hack", compression)
+
+    recorded_map = SourceMap(file) if source_map else None
+
+    if chunked_jobs:
+        assemble_file_chunked(
+            file, out_file, output_format, byteorder, header, chunked_jobs, recorded_map
+        )
+    elif one_pass:
+        assemble_file_one_pass(
+            file, out_file, output_format, byteorder, header, use_mmap, recorded_map
+        )
+    elif stream:
+        assemble_file_streaming(
+            file,
+            out_file,
+            output_format,
+            byteorder,
+            header,
+            use_mmap,
+            symbol_store,
+            recorded_map,
+        )
+    else:
+        cache = open_cache(cache_dir) if cache_dir and not optimize else None
+        assemble_file(
+            file,
+            out_file,
+            output_format,
+            byteorder,
+            header,
+            cache,
+            backend,
+            optimize,
+            recorded_map,
+        )
+
+    if recorded_map is not None:
+        with stage("write_source_map"):
+            map_file = output_path(
+                file, ".map.jsonl" if source_map == "jsonl" else ".map"
+            )
+            write_source_map(recorded_map, map_file, source_map)
+
+
+def report_results(results: list[AssemblyResult]) -> None:
+    """
+    Print the timing and outcome of each assembled file to stderr
+
+    Args:
+        `results` (list[`AssemblyResult`]): The results of a batch
+    """
+
+    for result in results:
+        status = f"error: {result.error}" if result.error else "ok"
+        print(
+            f"{result.file}: {result.seconds * 1000:.1f} ms {status}", file=sys.stderr
+        )
+
+
+def report_rebuild(results: list[AssemblyResult], seconds: float) -> None:
+    """
+    Print the results of a --watch rebuild and its total latency to stderr
+
+    Args:
+        `results` (list[`AssemblyResult`]): The results of the rebuilt files
+        `seconds` (float): The time from detecting the changes to finishing the rebuild
+    """
+
+    report_results(results)
+    print(f"rebuilt {len(results)} file(s) in {seconds * 1000:.1f} ms", file=sys.stderr)
+
+
 if __name__ == "__main__":
-    args = initialize_argparser()
-    file = initialize_arguments(args).file
-    symbol_handler = SymbolHandler()
+    args = initialize_arguments(initialize_argparser())
+
+    if args.backend == "numpy" and not HAS_NUMPY:
+        print(
+            "NumPy is not installed, falling back to the python backend",
+            file=sys.stderr,
+        )
+        args.backend = "python"
+    task = partial(
+        assemble,
+        stream=args.stream,
+        output_format=args.format,
+        byteorder=args.byteorder,
+        header=args.header,
+        chunked_jobs=args.jobs if args.chunked else 0,
+        cache_dir=None if args.no_cache else args.cache_dir,
+        one_pass=args.one_pass,
+        use_mmap=args.mmap,
+        backend=args.backend,
+        source_map=args.source_map,
+        optimize=args.optimize,
+        compress=args.compress,
+        symbol_store=args.symbol_store,
+    )
+
+    if args.watch:
+        try:
+            Watcher(args.sources, task, args.watch_interval).run(report_rebuild)
+        except KeyboardInterrupt:
+            pass
+        sys.exit()
 
-    parsed_file = parse_file(file)
-    parsed_instructions = parse_instructions(parsed_file, symbol_handler)
+    profiler = None
+    if args.profile:
+        profiler = Profiler(
+            trace_allocations=True, use_cprofile=args.profile_output is not None
+        )
+        set_profiler(profiler)
+        profiler.start()
 
-    # Test the printout of the instructions dict
-    # print(*zip(parsed_instructions.keys(), map(str, parsed_instructions.values())))
+    # Chunked files already spread across the workers and profiles are only recorded
+    # in this process, so assemble them one at a time
+    jobs = 1 if args.chunked or args.profile else args.jobs
+    results = assemble_batch(args.files, task, jobs)
 
-    binary_instructions = translate_instructions(parsed_instructions, symbol_handler)
+    if profiler is not None:
+        profiler.stop()
+        print(profiler.report(), file=sys.stderr)
+        if args.profile_output:
+            profiler.dump_pstats(f"{args.profile_output}.pstats")
+            profiler.dump_collapsed(f"{args.profile_output}.collapsed")
 
-    # print(binary_instructions)
+    report_results(results)
 
-    with open(f"{file[:-4]}.hack", 'w', encoding="UTF-8") as f:
-        f.write('\n'.join(binary_instructions))
+    if any(result.error for result in results):
+        sys.exit(1)
@@ -3,7 +3,13 @@ Parser module to parse .asm file into a dictionary of lines
 and their corresponding instructions
 """
 
+from collections.abc import Iterable, Iterator
+import mmap
+import os
+
+from compression import open_file
 from constants import COMMENT, VAR_START, LABEL_START
+from profiling import iterate
 from symbol_handler import SymbolHandler
 
 
@@ -18,6 +24,8 @@ class CInstruction:
         `jump`: string jump part of the instruction. None if no jump being made
     """
 
+    __slots__ = ("instruction", "comp", "dest", "jump")
+
     def __init__(self, instruction: str) -> None:
         self.instruction = instruction
         self.comp = self.parse_comp(instruction)
@@ -85,6 +93,106 @@ class CInstruction:
         )
 
 
+_c_instruction_cache: dict[str, CInstruction] = {}
+
+
+def get_c_instruction(instruction: str) -> CInstruction:
+    """
+    Get the parsed `CInstruction` for `instruction`, parsing each distinct text only once.
+        The returned object is shared and should be treated as read-only
+
+    Args:
+        `instruction` (str): The C-Instruction text
+
+    Returns:
+        `CInstruction`: The parsed C-Instruction
+    """
+
+    if (c_instruction := _c_instruction_cache.get(instruction)) is None:
+        c_instruction = _c_instruction_cache[instruction] = CInstruction(instruction)
+
+    return c_instruction
+
+
+def read_lines(file: str) -> Iterator[str]:
+    """
+    Lazily read a file line by line without loading it into memory,
+        decompressing it as it is read if it is a .gz, .bz2 or .xz file
+
+    Args:
+        `file` (str): The filepath to the file to be read
+
+    Yields:
+        str: Each raw line of the file
+    """
+
+    with open_file(file) as f:
+        yield from f
+
+
+def clean_lines(lines: Iterable[str]) -> Iterator[str]:
+    """
+    Strip comments and whitespace from `lines`, skipping any line left empty
+
+    Args:
+        `lines` (Iterable[str]): The raw lines of a .asm file
+
+    Yields:
+        str: Each instruction without whitespace or comments
+    """
+
+    for line in lines:
+        if line := line.split(COMMENT)[0].strip():
+            yield line
+
+
+def clean_lines_mmap(file: str) -> Iterator[str]:
+    """
+    Memory-map `file` and lazily yield its instructions without whitespace or comments.
+        Lines are stripped as bytes and only non-empty instructions are decoded, so memory
+        stays bounded however large the file is
+
+    Args:
+        `file` (str): The filepath to the file to be read
+
+    Yields:
+        str: Each instruction without whitespace or comments
+    """
+
+    comment = COMMENT.encode()
+
+    with open(file, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as source:
+            for line in iter(source.readline, b""):
+                if comment[:1] in line:
+                    line = line.split(comment, 1)[0]
+                if line := line.strip():
+                    yield line.decode("UTF-8")
+
+
+def read_lines_mmap(file: str) -> Iterator[str]:
+    """
+    Memory-map `file` and lazily yield its raw lines, decoding one line at a time
+
+    Args:
+        `file` (str): The filepath to the file to be read
+
+    Yields:
+        str: Each raw line of the file
+    """
+
+    with open(file, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as source:
+            for line in iter(source.readline, b""):
+                yield line.decode("UTF-8")
+
+
 def parse_file(file: str) -> list[str]:
     """
     Read in a file and parse it into
@@ -99,61 +207,69 @@ def parse_file(file: str) -> list[str]:
 
     """
 
-    with open(file, "r", encoding="UTF-8") as f:
-        lines = f.read().split("\n")
-        lines = [
-            line.split(COMMENT)[0].strip()
-            for line in lines
-            if line != "" and line[:2] != COMMENT
-        ]
-
-        return lines
+    return list(iterate("strip", clean_lines(iterate("read", read_lines(file)))))
 
 
-def parse_instructions(
-    instructions: list[str], symbol_handler: SymbolHandler
-) -> dict[int, str | CInstruction]:
+def iter_instructions(
+    instructions: Iterable[str], symbol_handler: SymbolHandler
+) -> Iterator[str | CInstruction]:
     """
-    Parse `instructions` into a dictionary with keys representing line-numbers
-        and values representing the instruction (without any leading instruction chars like '@')
+    Lazily classify `instructions`, yielding one value per ROM address.
+        Labels must already have been collected with `SymbolHandler.handle_labels`
 
     Args:
-        `instructions` (list[str]): the list of instructions
-        `symbol_handler` (`SymbolHandler`): A symbol handler for adding any @vars and
-            (Labels) to the symbol table.
+        `instructions` (Iterable[str]): the cleaned instructions
+        `symbol_handler` (`SymbolHandler`): A symbol handler for adding any @vars to the symbol table
 
-    Returns:
-        dict[int, str | CInstruction]: `instructions` parsed into a dictionary of line-numbers and
-            their corresponding instruction values as strings or CInstruction objects
+    Yields:
+        str | CInstruction: The instruction value as a string (without '@')
+            or a CInstruction object. (Label) declarations yield nothing
     """
 
-    parsed_instructions = {}
-    # Separate from the actual iteration of the instructions list so we can skip an increment if
+    # Separate from the actual iteration of the instructions so we can skip an increment if
     # symbol is a (Label)
     line_num = 0
 
-    # Handle all labels first so as not to accidentally add them as vars
-    # if a reference appears before the label is declared
-    symbol_handler.handle_labels(instructions)
-
     for instruction in instructions:
         if instruction[0] not in (VAR_START, LABEL_START):
-            parsed_instructions[line_num] = CInstruction(instruction)
+            yield get_c_instruction(instruction)
             line_num += 1
         elif instruction.startswith(VAR_START) and instruction[1:].isdigit():
-            parsed_instructions[line_num] = instruction.removeprefix(VAR_START)
+            yield instruction.removeprefix(VAR_START)
             line_num += 1
         else:
             # We pass the @var or (Label) into the symbol handler to be
             # added to the symbol table where necessary as well as to be cleaned
-            # and return back to the dictionary of instructions.
+            # and return back to the caller.
             # If it's a label declaration, we return None and skip that line
             if (
                 parsed_instruction := symbol_handler.handle_symbol(
                     instruction, line_num
                 )
             ) is not None:
-                parsed_instructions[line_num] = parsed_instruction
+                yield parsed_instruction
                 line_num += 1
 
-    return parsed_instructions
+
+def parse_instructions(
+    instructions: list[str], symbol_handler: SymbolHandler
+) -> dict[int, str | CInstruction]:
+    """
+    Parse `instructions` into a dictionary with keys representing line-numbers
+        and values representing the instruction (without any leading instruction chars like '@')
+
+    Args:
+        `instructions` (list[str]): the list of instructions
+        `symbol_handler` (`SymbolHandler`): A symbol handler for adding any @vars and
+            (Labels) to the symbol table.
+
+    Returns:
+        dict[int, str | CInstruction]: `instructions` parsed into a dictionary of line-numbers and
+            their corresponding instruction values as strings or CInstruction objects
+    """
+
+    # Handle all labels first so as not to accidentally add them as vars
+    # if a reference appears before the label is declared
+    symbol_handler.handle_labels(instructions)
+
+    return dict(enumerate(iter_instructions(instructions, symbol_handler)))
@@ -0,0 +1,71 @@
+"""
+Lexer that classifies .asm source lines in one scan.
+
+Each non-empty line yields a `Token` carrying its kind, its value (without any '@' or
+parentheses) and its 1-based source line number, so later stages never re-inspect the text.
+Lines are read lazily, so only the current line of a file is held in memory.
+"""
+
+from collections.abc import Iterable, Iterator
+from io import StringIO
+
+from compression import open_file
+from constants import COMMENT, LABEL_END, LABEL_START, VAR_START
+
+A_NUMERIC = "a_numeric"
+A_SYMBOL = "a_symbol"
+LABEL = "label"
+C = "c"
+
+
+# (kind, value, line): kind is one of `A_NUMERIC`, `A_SYMBOL`, `LABEL` or `C`, value is the
+# number, symbol, label name or C-Instruction text and line is the 1-based source line number.
+# A plain tuple rather than a NamedTuple, which costs several times more to build per line
+Token = tuple[str, str, int]
+
+
+def tokenize(source: str | Iterable[str]) -> Iterator[Token]:
+    """
+    Scan a .asm source into tokens
+
+    Args:
+        `source` (str | Iterable[str]): The full source, or its lines such as an open file
+
+    Yields:
+        Token: One token per instruction or label declaration, in source order
+    """
+
+    # Only lines containing a '/' can hold a comment, so most lines skip the split
+    comment_start = COMMENT[0]
+    if isinstance(source, str):
+        source = StringIO(source)
+
+    for line_num, line in enumerate(source, 1):
+        if comment_start in line:
+            line = line.split(COMMENT)[0]
+        if not (line := line.strip()):
+            continue
+
+        first = line[0]
+        if first == VAR_START:
+            value = line[1:]
+            yield (A_NUMERIC if value.isdigit() else A_SYMBOL, value, line_num)
+        elif first == LABEL_START:
+            yield (LABEL, line[1:].removesuffix(LABEL_END), line_num)
+        else:
+            yield (C, line, line_num)
+
+
+def tokenize_file(file: str) -> Iterator[Token]:
+    """
+    Read `file` one line at a time and scan it into tokens
+
+    Args:
+        `file` (str): The filepath to the .asm file
+
+    Yields:
+        Token: One token per instruction or label declaration, in source order
+    """
+
+    with open_file(file) as f:
+        yield from tokenize(f)
@@ -0,0 +1,318 @@
+"""
+Separate compilation of .asm modules into relocatable objects, and a linker that joins them.
+
+Each module is compiled on its own into an `ObjectFile`: its encoded words, the labels it
+exports, the addresses holding references to its own labels (relocations) and the addresses
+referencing symbols it does not define (other modules' labels or variables). Linking lays the
+objects out one after another, adds each object's base address to its relocations, then
+resolves the remaining references against every exported label, allocating anything left as a
+variable from 16 upward in order of first reference. The result is identical to assembling the
+concatenated sources, so a change to one module only needs that module recompiled.
+"""
+
+from argparse import ArgumentParser
+from array import array
+from collections.abc import Iterable
+import os
+import struct
+import sys
+
+from compression import output_path
+from constants import (
+    LABEL_END,
+    LABEL_START,
+    PRE_DEFINED_SYMBOLS,
+    VAR_START,
+    WORD_TYPECODE,
+)
+from hasm_parser import parse_file
+from rom_image import BYTEORDERS, to_big_endian, write_binary
+from translator import a_inst_to_int, c_text_to_int, word_to_bin
+
+OBJECT_SUFFIX = ".hobj"
+MAGIC = b"HOBJ"
+VERSION = 1
+# Magic, version, then the number of words, relocations, exports, referenced symbols
+# and referencing addresses
+HEADER = struct.Struct(">4sBIIIII")
+BLOB_LENGTH = struct.Struct(">I")
+
+
+class ObjectFile:
+    """
+    A compiled, relocatable module
+
+    Attributes:
+        `words` (array[int]): The encoded module, addressed from 0. Words referencing the
+            module's own labels hold the label's offset; unresolved references hold 0
+        `relocations` (array[int]): Addresses of the words that need the module's base added
+        `exports` (dict[str, int]): The offset of every label the module declares
+        `references` (dict[str, array[int]]): The addresses referencing each symbol the
+            module does not define, in order of first reference
+    """
+
+    __slots__ = ("words", "relocations", "exports", "references")
+
+    def __init__(self) -> None:
+        self.words = array(WORD_TYPECODE)
+        self.relocations = array("I")
+        self.exports: dict[str, int] = {}
+        self.references: dict[str, array] = {}
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+
+def compile_object(instructions: list[str]) -> ObjectFile:
+    """
+    Compile the cleaned `instructions` of one module without any global symbol table
+
+    Args:
+        `instructions` (list[str]): The cleaned instructions of the module
+
+    Returns:
+        `ObjectFile`: The relocatable module
+    """
+
+    obj = ObjectFile()
+    exports = obj.exports
+
+    offset = 0
+    for instruction in instructions:
+        if instruction[0] == LABEL_START:
+            label = instruction.removeprefix(LABEL_START).removesuffix(LABEL_END)
+            exports.setdefault(label, offset)
+        else:
+            offset += 1
+
+    words, relocations, references = obj.words, obj.relocations, obj.references
+
+    for instruction in instructions:
+        if instruction[0] == LABEL_START:
+            continue
+        if instruction[0] != VAR_START:
+            words.append(c_text_to_int(instruction))
+        elif (symbol := instruction[1:]).isdigit():
+            words.append(a_inst_to_int(int(symbol)))
+        elif (value := PRE_DEFINED_SYMBOLS.get(symbol)) is not None:
+            words.append(value)
+        elif (value := exports.get(symbol)) is not None:
+            relocations.append(len(words))
+            words.append(a_inst_to_int(value))
+        else:
+            references.setdefault(symbol, array("I")).append(len(words))
+            words.append(0)
+
+    return obj
+
+
+def link(objects: Iterable[ObjectFile]) -> array:
+    """
+    Link `objects` in order into one program
+
+    Args:
+        `objects` (Iterable[`ObjectFile`]): The modules in program order
+
+    Returns:
+        array[int]: One encoded word per ROM address
+
+    Raises:
+        ValueError: If more than one object exports the same label,
+            or a resolved address does not fit in an A-Instruction
+    """
+
+    objects = list(objects)
+    words = array(WORD_TYPECODE)
+    bases = []
+    symbols: dict[str, int] = {}
+
+    for obj in objects:
+        base = len(words)
+        bases.append(base)
+        words.extend(obj.words)
+
+        for address in obj.relocations:
+            words[base + address] = a_inst_to_int(words[base + address] + base)
+        for label, offset in obj.exports.items():
+            if label in symbols:
+                raise ValueError(f"Label {label} is exported by more than one object")
+            symbols[label] = base + offset
+
+    next_address = 16
+    for obj, base in zip(objects, bases):
+        for symbol, addresses in obj.references.items():
+            if (value := symbols.get(symbol)) is None:
+                value = symbols[symbol] = next_address
+                next_address += 1
+            value = a_inst_to_int(value)
+            for address in addresses:
+                words[base + address] = value
+
+    return words
+
+
+def write_object(obj: ObjectFile, file: str) -> None:
+    """
+    Write `obj` as a header, its big-endian arrays and a newline-separated blob of
+        its exported then referenced symbol names
+
+    Args:
+        `obj` (`ObjectFile`): The object to write
+        `file` (str): The filepath to write it to
+    """
+
+    ref_counts = array("I", map(len, obj.references.values()))
+    ref_addresses = array("I")
+    for addresses in obj.references.values():
+        ref_addresses.extend(addresses)
+    names = "\n".join([*obj.exports, *obj.references]).encode("UTF-8")
+
+    columns = (
+        array("I", obj.words),
+        array("I", obj.relocations),
+        array("I", obj.exports.values()),
+        ref_counts,
+        ref_addresses,
+    )
+
+    with open(file, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, *map(len, columns)))
+        for column in columns:
+            f.write(to_big_endian(column).tobytes())
+        f.write(BLOB_LENGTH.pack(len(names)))
+        f.write(names)
+
+
+def load_object(file: str) -> ObjectFile:
+    """
+    Load an object written by `write_object`
+
+    Args:
+        `file` (str): The filepath of the object
+
+    Returns:
+        `ObjectFile`: The loaded object
+
+    Raises:
+        ValueError: If `file` is not an object file of a supported version
+    """
+
+    with open(file, "rb") as f:
+        data = f.read()
+
+    magic, version, *counts = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{file} is not a version {VERSION} object file")
+    offset = HEADER.size
+
+    columns = []
+    for count in counts:
+        column = array("I")
+        size = count * column.itemsize
+        column.frombytes(data[offset : offset + size])
+        columns.append(to_big_endian(column))
+        offset += size
+    words, relocations, export_offsets, ref_counts, ref_addresses = columns
+
+    (names_length,) = BLOB_LENGTH.unpack_from(data, offset)
+    offset += BLOB_LENGTH.size
+    names = data[offset : offset + names_length].decode("UTF-8").split("\n")
+
+    obj = ObjectFile()
+    obj.words = array(WORD_TYPECODE, words)
+    obj.relocations = relocations
+    obj.exports = dict(zip(names, export_offsets))
+
+    start = 0
+    # An empty blob still splits into one name, but then there are no exports or references
+    for symbol, count in zip(names[len(export_offsets) :], ref_counts):
+        obj.references[symbol] = ref_addresses[start : start + count]
+        start += count
+
+    return obj
+
+
+def build_object(file: str) -> ObjectFile:
+    """
+    Load the object of the module `file`, recompiling it first if it is missing or older
+        than the source
+
+    Args:
+        `file` (str): The filepath of the .asm module
+
+    Returns:
+        `ObjectFile`: The up-to-date object
+    """
+
+    object_file = output_path(file, OBJECT_SUFFIX)
+
+    try:
+        if os.stat(object_file).st_mtime_ns >= os.stat(file).st_mtime_ns:
+            return load_object(object_file)
+    except (FileNotFoundError, ValueError):
+        pass
+
+    obj = compile_object(parse_file(file))
+    write_object(obj, object_file)
+
+    return obj
+
+
+def initialize_argparser() -> ArgumentParser:
+    """
+    Initialize the ArgumentParser for command-line-arguments
+    """
+
+    arg_parser = ArgumentParser(
+        prog="HackLinker",
+        description="Compile .asm modules into relocatable objects and link them into one program.",
+    )
+    arg_parser.add_argument(
+        "files",
+        metavar="file.asm",
+        type=str,
+        nargs="+",
+        help="the modules in program order; only those changed since their object are recompiled",
+    )
+    arg_parser.add_argument(
+        "-o",
+        "--output",
+        type=str,
+        required=True,
+        help="filepath of the .hack file to write",
+    )
+    arg_parser.add_argument(
+        "--format",
+        choices=("text", "binary"),
+        default="text",
+        help="write '0'/'1' text lines or a raw binary ROM image (default: text)",
+    )
+    arg_parser.add_argument(
+        "--byteorder",
+        choices=BYTEORDERS,
+        default="big",
+        help="byte order of a binary ROM image (default: big)",
+    )
+    arg_parser.add_argument(
+        "--header",
+        action="store_true",
+        help="prefix a binary ROM image with a header recording its byte order and length",
+    )
+
+    return arg_parser
+
+
+if __name__ == "__main__":
+    args = initialize_argparser().parse_args()
+
+    try:
+        words = link(map(build_object, args.files))
+    except (KeyError, ValueError) as error:
+        print(error, file=sys.stderr)
+        sys.exit(1)
+
+    if args.format == "binary":
+        write_binary(words, args.output, args.byteorder, args.header)
+    else:
+        with open(args.output, "w", encoding="UTF-8") as f:
+            f.write("\n".join(map(word_to_bin, words)))
@@ -0,0 +1,112 @@
+"""
+Optional NumPy backend that resolves and formats a whole program with array operations
+instead of per-instruction Python calls.
+
+C-Instructions are already encoded by `parse_compact` with one table lookup each, so the
+backend starts from its `CompactProgram`: symbol references are filled in with one gather and
+the words are turned into text with one bit-unpacking step.
+
+NumPy is not a required dependency: `HAS_NUMPY` is False when it cannot be imported,
+and the command line falls back to the pure Python backend.
+"""
+
+from array import array
+
+from constants import MAX_A_VALUE
+from symbol_handler import SymbolHandler
+from translator import CompactProgram, a_inst_to_int
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+HAS_NUMPY = np is not None
+
+NEWLINE = ord("\n")
+ZERO = ord("0")
+
+
+def _require_numpy() -> None:
+    if not HAS_NUMPY:
+        raise ImportError("The numpy backend requires NumPy to be installed")
+
+
+def _view(values: array) -> "np.ndarray":
+    """
+    View an `array.array` as a NumPy array without copying
+    """
+
+    return np.frombuffer(values, dtype=values.typecode)
+
+
+def resolve_words(
+    program: CompactProgram, symbol_handler: SymbolHandler
+) -> "np.ndarray":
+    """
+    Resolve every symbol reference of `program` with one gather from `symbol_values`
+
+    Args:
+        `program` (`CompactProgram`): The parsed program
+        `symbol_handler` (`SymbolHandler`): The symbol handler the program was parsed with
+
+    Returns:
+        np.ndarray: One encoded word per ROM address
+
+    Raises:
+        ValueError: If a symbol resolves to a value that does not fit in an A-Instruction
+    """
+
+    _require_numpy()
+
+    words = _view(program.words).copy()
+    if not len(program.symbol_ids):
+        return words
+
+    resolved = _view(symbol_handler.symbol_values)[_view(program.symbol_ids)]
+
+    if (unresolved := np.flatnonzero(resolved < 0)).size:
+        # Raises the same KeyError as the Python backend
+        symbol_handler.resolve_id(program.symbol_ids[unresolved[0]])
+    if (too_wide := np.flatnonzero(resolved > MAX_A_VALUE)).size:
+        a_inst_to_int(int(resolved[too_wide[0]]))
+
+    words[_view(program.symbol_addresses)] = resolved
+
+    return words
+
+
+def to_word_array(words) -> array:
+    """
+    Convert encoded words to an `array.array` of 16-bit words for the ROM image writers
+    """
+
+    _require_numpy()
+
+    return array("H", np.asarray(words, dtype=np.uint16).tobytes())
+
+
+def render_text(words) -> bytes:
+    """
+    Format encoded words as newline separated binary text with one bit-unpacking step
+
+    Args:
+        `words`: The encoded words
+
+    Returns:
+        bytes: The contents of a .hack file
+    """
+
+    _require_numpy()
+
+    words = np.asarray(words)
+    if not words.size:
+        return b""
+
+    bits = np.unpackbits(words.astype(">u2").view(np.uint8)).reshape(-1, 16)
+
+    lines = np.empty((len(words), 17), dtype=np.uint8)
+    lines[:, :16] = bits + ZERO
+    lines[:, 16] = NEWLINE
+
+    return lines.tobytes()[:-1]
@@ -0,0 +1,62 @@
+"""
+Single-pass assembly with label backpatching.
+
+Instructions are encoded as they are read. A reference to a symbol that is not yet known is
+recorded in a fixup table and patched once the input is exhausted: if the symbol was declared
+as a label later in the program it gets the label's address, otherwise it is allocated as a
+variable. Variables are allocated in order of first reference, so the output is identical to
+the two-pass `parse_instructions` path, including the rule that a label referenced before its
+declaration is never allocated as a variable.
+"""
+
+from array import array
+from collections.abc import Iterable
+
+from constants import LABEL_START, VAR_START, WORD_TYPECODE
+from symbol_handler import SymbolHandler
+from translator import a_inst_to_int, c_text_to_int
+
+
+def assemble_one_pass(
+    instructions: Iterable[str], symbol_handler: SymbolHandler
+) -> array:
+    """
+    Encode cleaned `instructions` in a single pass, backpatching forward references
+
+    Args:
+        `instructions` (Iterable[str]): The cleaned instructions, e.g. a generator over a file
+        `symbol_handler` (`SymbolHandler`): A fresh symbol handler for the program
+
+    Returns:
+        array[int]: One encoded 16-bit word per ROM address
+
+    Raises:
+        ValueError: If an A-Instruction value does not fit in 15 bits
+    """
+
+    words = array(WORD_TYPECODE)
+    symbol_table = symbol_handler.symbol_table
+    # Symbol: ROM addresses waiting for it, in order of first reference
+    fixups: dict[str, array] = {}
+
+    for instruction in instructions:
+        if instruction[0] == LABEL_START:
+            symbol_handler.handle_symbol(instruction, len(words))
+        elif instruction[0] != VAR_START:
+            words.append(c_text_to_int(instruction))
+        elif (symbol := instruction[1:]).isdigit():
+            words.append(a_inst_to_int(int(symbol)))
+        elif (value := symbol_table.get(symbol)) is not None:
+            words.append(a_inst_to_int(value))
+        else:
+            fixups.setdefault(symbol, array("I")).append(len(words))
+            words.append(0)
+
+    for symbol, addresses in fixups.items():
+        # Anything still unknown was never declared as a label, so it is a variable
+        symbol_handler.handle_symbol(f"{VAR_START}{symbol}", 0)
+        value = a_inst_to_int(symbol_handler.lookup_symbol(symbol))
+        for address in addresses:
+            words[address] = value
+
+    return words
@@ -0,0 +1,247 @@
+"""
+Peephole optimizer over the cleaned instructions of a program.
+
+Runs before labels are resolved, so removing instructions only shifts the labels that follow
+and resolving them afterwards gives the new addresses. The rewrites assume every jump target is
+a (Label), as generated code does: a numeric jump target would point at a shifted address.
+
+Rewrites, repeated until none applies:
+    - `@X` immediately followed by another A-Instruction is dead, since the second overwrites A
+    - `@L` and a jump with no dest immediately followed by `(L)` are removed when the
+        instruction after the label is an A-Instruction, so the value left in A is never read
+    - Code after an unconditional jump is unreachable until the next label
+
+A load is never removed if it is the first reference to a variable, since variables are
+allocated in order of first reference and removing it would move them in RAM.
+"""
+
+from typing import NamedTuple
+
+from constants import LABEL_END, LABEL_START, PRE_DEFINED_SYMBOLS, VAR_START
+from hasm_parser import get_c_instruction
+
+UNCONDITIONAL_JUMP = "JMP"
+
+
+class OptimizationReport(NamedTuple):
+    """
+    What the optimizer removed
+
+    Attributes:
+        `dead_loads` (int): A-Instructions removed because the next one overwrote A
+        `jumps_to_next` (int): `@L` and jump pairs removed because `(L)` followed them
+        `unreachable` (int): Instructions removed after an unconditional jump
+    """
+
+    dead_loads: int = 0
+    jumps_to_next: int = 0
+    unreachable: int = 0
+
+    @property
+    def words_saved(self) -> int:
+        """
+        ROM words removed
+        """
+
+        return self.dead_loads + 2 * self.jumps_to_next + self.unreachable
+
+    @property
+    def cycles_saved(self) -> int:
+        """
+        Estimated cycles saved each time the rewritten code runs once. Every Hack
+            instruction takes one cycle and unreachable code never ran
+        """
+
+        return self.dead_loads + 2 * self.jumps_to_next
+
+
+def optimize_instructions(
+    instructions: list[str],
+) -> tuple[list[str], OptimizationReport]:
+    """
+    Apply the peephole rewrites to `instructions` until none applies
+
+    Args:
+        `instructions` (list[str]): The cleaned instructions, labels included
+
+    Returns:
+        tuple[list[str], `OptimizationReport`]: The rewritten instructions and what was removed
+    """
+
+    optimized, _, report = optimize_with_origins(instructions)
+    return optimized, report
+
+
+def optimize_with_origins(
+    instructions: list[str],
+) -> tuple[list[str], list[int], OptimizationReport]:
+    """
+    Apply the peephole rewrites to `instructions` until none applies, tracking where each
+        kept instruction came from. Rewrites only remove instructions, so the kept ones are
+        in their original order
+
+    Args:
+        `instructions` (list[str]): The cleaned instructions, labels included
+
+    Returns:
+        tuple[list[str], list[int], `OptimizationReport`]: The rewritten instructions,
+            the index in `instructions` of each of them and what was removed
+    """
+
+    report = OptimizationReport()
+    origins = list(range(len(instructions)))
+
+    while True:
+        optimized, kept, counts = _optimize_pass(instructions)
+        if len(optimized) == len(instructions):
+            return optimized, origins, report
+
+        report = OptimizationReport(*map(sum, zip(report, counts)))
+        instructions = optimized
+        origins = [origins[index] for index in kept]
+
+
+def kept_addresses(instructions: list[str], origins: list[int]) -> list[int]:
+    """
+    Find the ROM address each instruction kept by `optimize_with_origins` had before optimizing
+
+    Args:
+        `instructions` (list[str]): The cleaned instructions before optimizing, labels included
+        `origins` (list[int]): The index in `instructions` of each kept instruction
+
+    Returns:
+        list[int]: The original ROM address of each kept instruction that is not a label
+    """
+
+    addresses = []
+    address = 0
+    for instruction in instructions:
+        addresses.append(address)
+        if instruction[0] != LABEL_START:
+            address += 1
+
+    return [
+        addresses[index] for index in origins if instructions[index][0] != LABEL_START
+    ]
+
+
+def _optimize_pass(
+    instructions: list[str],
+) -> tuple[list[str], list[int], OptimizationReport]:
+    """
+    Apply each rewrite once in a single scan of `instructions`
+
+    Args:
+        `instructions` (list[str]): The cleaned instructions, labels included
+
+    Returns:
+        tuple[list[str], list[int], `OptimizationReport`]: The rewritten instructions,
+            the index in `instructions` of each of them and what was removed
+    """
+
+    optimized = []
+    kept = []
+    dead_loads = jumps_to_next = unreachable = 0
+    count = len(instructions)
+    i = 0
+
+    labels = {
+        instruction.removeprefix(LABEL_START).removesuffix(LABEL_END)
+        for instruction in instructions
+        if instruction[0] == LABEL_START
+    }
+    # Symbols loaded by the instructions kept so far, which removing a later load cannot move
+    referenced: set[str] = set()
+
+    while i < count:
+        instruction = instructions[i]
+        following = instructions[i + 1] if i + 1 < count else ""
+
+        if instruction[0] == VAR_START:
+            if following[:1] == VAR_START and _is_removable(
+                instruction, labels, referenced
+            ):
+                dead_loads += 1
+                i += 1
+                continue
+            if following[:1] not in ("", LABEL_START) and _jumps_to_label(
+                instructions, i + 2, instruction[1:], following
+            ):
+                jumps_to_next += 1
+                i += 2
+                continue
+        elif instruction[0] != LABEL_START:
+            if get_c_instruction(instruction).jump == UNCONDITIONAL_JUMP:
+                optimized.append(instruction)
+                kept.append(i)
+                i += 1
+                while i < count and (skipped := instructions[i])[0] != LABEL_START:
+                    if skipped[0] == VAR_START and not _is_removable(
+                        skipped, labels, referenced
+                    ):
+                        # Never runs, but still allocates its variable
+                        referenced.add(skipped[1:])
+                        optimized.append(skipped)
+                        kept.append(i)
+                    else:
+                        unreachable += 1
+                    i += 1
+                continue
+
+        if instruction[0] == VAR_START:
+            referenced.add(instruction[1:])
+        optimized.append(instruction)
+        kept.append(i)
+        i += 1
+
+    return (
+        optimized,
+        kept,
+        OptimizationReport(dead_loads, jumps_to_next, unreachable),
+    )
+
+
+def _is_removable(load: str, labels: set[str], referenced: set[str]) -> bool:
+    """
+    Check whether removing the A-Instruction `load` leaves every variable at its address,
+        i.e. it does not load a variable for the first time
+
+    Args:
+        `load` (str): The A-Instruction
+        `labels` (set[str]): The labels declared in the program
+        `referenced` (set[str]): The symbols loaded by the instructions kept before `load`
+    """
+
+    symbol = load[1:]
+    return (
+        symbol.isdigit()
+        or symbol in PRE_DEFINED_SYMBOLS
+        or symbol in labels
+        or symbol in referenced
+    )
+
+
+def _jumps_to_label(
+    instructions: list[str], start: int, target: str, jump: str
+) -> bool:
+    """
+    Check whether `jump`, loaded with `@target`, only jumps to one of the labels declared
+        at `start`, which are followed by an A-Instruction
+
+    Args:
+        `instructions` (list[str]): The cleaned instructions
+        `start` (int): The index just after `jump`
+        `target` (str): The symbol loaded into A before `jump`
+        `jump` (str): The C-Instruction after `@target`
+    """
+
+    c_instruction = get_c_instruction(jump)
+    if c_instruction.jump is None or c_instruction.dest is not None:
+        return False
+
+    found = False
+    while start < len(instructions) and instructions[start][0] == LABEL_START:
+        found = found or instructions[start] == f"{LABEL_START}{target}{LABEL_END}"
+        start += 1
+
+    return found and start < len(instructions) and instructions[start][0] == VAR_START
@@ -0,0 +1,326 @@
+"""
+Opt-in instrumentation for the assembler's stages.
+
+Install a `Profiler` with `set_profiler` (or pass `--profile` on the command line) and the
+pipeline records wall time, call counts and allocations per stage and per instruction kind.
+The results can be dumped as a cProfile/pstats file or as collapsed stacks for flamegraphs.
+With no profiler installed every hook is a no-op.
+"""
+
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager, nullcontext
+import cProfile
+import time
+import tracemalloc
+from typing import ContextManager
+
+from constants import LABEL_START, VAR_START
+
+KINDS = ("label", "a_numeric", "a_symbol", "c")
+
+
+class StageStats:
+    """
+    Accumulated cost of one stage
+
+    Attributes:
+        `seconds` (float): Total wall time including child stages
+        `calls` (int): Number of times the stage ran (or produced an item)
+        `allocated_bytes` (int): Net memory allocated during the stage, if traced
+        `children` (dict[str, StageStats]): Stages that ran inside this one
+    """
+
+    __slots__ = ("seconds", "calls", "allocated_bytes", "children")
+
+    def __init__(self) -> None:
+        self.seconds = 0.0
+        self.calls = 0
+        self.allocated_bytes = 0
+        self.children: dict[str, StageStats] = {}
+
+    def child(self, name: str) -> "StageStats":
+        """
+        Get the child stage `name`, creating it on first use
+        """
+
+        if (stats := self.children.get(name)) is None:
+            stats = self.children[name] = StageStats()
+
+        return stats
+
+    @property
+    def self_seconds(self) -> float:
+        """
+        Wall time spent in this stage outside of its children
+        """
+
+        return max(
+            0.0, self.seconds - sum(child.seconds for child in self.children.values())
+        )
+
+
+def instruction_kind(instruction: str) -> str:
+    """
+    Classify a cleaned instruction as one of `KINDS`
+
+    Args:
+        `instruction` (str): The cleaned instruction
+    """
+
+    if instruction[0] == LABEL_START:
+        return "label"
+    if instruction[0] != VAR_START:
+        return "c"
+    if instruction[1:].isdigit():
+        return "a_numeric"
+    return "a_symbol"
+
+
+class Profiler:
+    """
+    Records the cost of the assembler's stages
+
+    Attributes:
+        `root` (`StageStats`): The top of the stage tree
+        `kinds` (dict[str, `StageStats`]): Time spent and memory allocated processing each kind
+            of instruction
+        `trace_allocations` (bool): Whether allocations are measured with tracemalloc
+        `cprofile` (cProfile.Profile | None): The function level profile, if enabled
+    """
+
+    def __init__(
+        self, trace_allocations: bool = False, use_cprofile: bool = False
+    ) -> None:
+        self.root = StageStats()
+        self.kinds = {kind: StageStats() for kind in KINDS}
+        self.trace_allocations = trace_allocations
+        self.cprofile = cProfile.Profile() if use_cprofile else None
+        self._stack = [self.root]
+
+    def start(self) -> None:
+        """
+        Start function level profiling and allocation tracing, if enabled
+        """
+
+        if self.trace_allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        if self.cprofile is not None:
+            self.cprofile.enable()
+
+    def stop(self) -> None:
+        """
+        Stop function level profiling and allocation tracing, if enabled
+        """
+
+        if self.cprofile is not None:
+            self.cprofile.disable()
+        if self.trace_allocations and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[StageStats]:
+        """
+        Record the block run inside this context as stage `name` of the current stage
+
+        Args:
+            `name` (str): The stage name
+        """
+
+        stats = self._stack[-1].child(name)
+        self._stack.append(stats)
+        tracing = tracemalloc.is_tracing()
+        memory_before = tracemalloc.get_traced_memory()[0] if tracing else 0
+        start = time.perf_counter()
+
+        try:
+            yield stats
+        finally:
+            stats.seconds += time.perf_counter() - start
+            stats.calls += 1
+            if tracing:
+                stats.allocated_bytes += (
+                    tracemalloc.get_traced_memory()[0] - memory_before
+                )
+            self._stack.pop()
+
+    def iterate(self, name: str, iterable: Iterable) -> Iterator:
+        """
+        Record the time spent and memory allocated producing each item of `iterable` as stage
+            `name`. Useful for lazy stages whose work is interleaved with their consumers
+
+        Args:
+            `name` (str): The stage name
+            `iterable` (Iterable): The lazy stage
+        """
+
+        iterator = iter(iterable)
+        tracing = tracemalloc.is_tracing()
+        memory_before = 0
+
+        while True:
+            stats = self._stack[-1].child(name)
+            self._stack.append(stats)
+            if tracing:
+                memory_before = tracemalloc.get_traced_memory()[0]
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                stats.seconds += time.perf_counter() - start
+                if tracing:
+                    stats.allocated_bytes += (
+                        tracemalloc.get_traced_memory()[0] - memory_before
+                    )
+                self._stack.pop()
+
+            stats.calls += 1
+            yield item
+
+    def track_kinds(self, instructions: Iterable[str]) -> Iterator[str]:
+        """
+        Attribute the time spent and memory allocated downstream of each instruction to its kind
+
+        Args:
+            `instructions` (Iterable[str]): The cleaned instructions
+        """
+
+        tracing = tracemalloc.is_tracing()
+        memory_before = 0
+
+        for instruction in instructions:
+            stats = self.kinds[instruction_kind(instruction)]
+            if tracing:
+                memory_before = tracemalloc.get_traced_memory()[0]
+            start = time.perf_counter()
+            yield instruction
+            stats.seconds += time.perf_counter() - start
+            if tracing:
+                stats.allocated_bytes += (
+                    tracemalloc.get_traced_memory()[0] - memory_before
+                )
+            stats.calls += 1
+
+    def collapsed_stacks(self) -> list[str]:
+        """
+        Render the stage tree as collapsed stacks ("a;b;c microseconds"), one line per stage
+
+        Returns:
+            list[str]: Lines in the format read by flamegraph.pl and speedscope
+        """
+
+        lines = []
+
+        def walk(path: str, stats: StageStats) -> None:
+            for name, child in stats.children.items():
+                child_path = f"{path};{name}" if path else name
+                lines.append(f"{child_path} {round(child.self_seconds * 1e6)}")
+                walk(child_path, child)
+
+        walk("", self.root)
+
+        return lines
+
+    def report(self) -> str:
+        """
+        Format the recorded stages and instruction kinds as a table
+        """
+
+        lines = [f"{'stage':<36}{'seconds':>12}{'calls':>12}{'alloc KiB':>12}"]
+
+        def walk(depth: int, stats: StageStats) -> None:
+            for name, child in stats.children.items():
+                lines.append(
+                    f"{'  ' * depth + name:<36}{child.seconds:>12.4f}"
+                    f"{child.calls:>12}{child.allocated_bytes / 1024:>12.1f}"
+                )
+                walk(depth + 1, child)
+
+        walk(0, self.root)
+
+        lines.append(
+            f"{'instruction kind':<36}{'seconds':>12}{'count':>12}{'alloc KiB':>12}"
+        )
+        for kind, stats in self.kinds.items():
+            lines.append(
+                f"{kind:<36}{stats.seconds:>12.4f}"
+                f"{stats.calls:>12}{stats.allocated_bytes / 1024:>12.1f}"
+            )
+
+        return "\n".join(lines)
+
+    def dump_collapsed(self, file: str) -> None:
+        """
+        Write `collapsed_stacks` to `file`
+        """
+
+        with open(file, "w", encoding="UTF-8") as f:
+            f.write("\n".join(self.collapsed_stacks()))
+
+    def dump_pstats(self, file: str) -> None:
+        """
+        Write the cProfile statistics to `file` for use with pstats or snakeviz
+
+        Raises:
+            ValueError: if the profiler was created without `use_cprofile`
+        """
+
+        if self.cprofile is None:
+            raise ValueError("Profiler was created without use_cprofile=True")
+
+        self.cprofile.dump_stats(file)
+
+
+_profiler: Profiler | None = None
+
+
+def set_profiler(profiler: Profiler | None) -> None:
+    """
+    Install `profiler` for the assembler's hooks to record into, or None to disable profiling
+    """
+
+    global _profiler
+    _profiler = profiler
+
+
+def get_profiler() -> Profiler | None:
+    """
+    Get the installed profiler, if any
+    """
+
+    return _profiler
+
+
+def stage(name: str) -> ContextManager:
+    """
+    Record a block as stage `name` in the installed profiler. A no-op if none is installed
+    """
+
+    if _profiler is None:
+        return nullcontext()
+
+    return _profiler.stage(name)
+
+
+def iterate(name: str, iterable: Iterable) -> Iterable:
+    """
+    Record a lazy stage as `name` in the installed profiler. Returns `iterable` unchanged if none
+    """
+
+    if _profiler is None:
+        return iterable
+
+    return _profiler.iterate(name, iterable)
+
+
+def track_kinds(instructions: Iterable[str]) -> Iterable[str]:
+    """
+    Record time and allocations per instruction kind in the installed profiler.
+        Returns `instructions` unchanged if none
+    """
+
+    if _profiler is None:
+        return instructions
+
+    return _profiler.track_kinds(instructions)
@@ -0,0 +1,241 @@
+"""
+Module to write and load binary ROM images of assembled Hack programs.
+
+A ROM image is the raw 16-bit words of a program in big or little-endian order,
+optionally preceded by a small header recording the byte order and instruction count.
+"""
+
+from array import array
+from collections.abc import Iterable
+import mmap
+import struct
+import sys
+
+from compression import detect_compression, open_file
+
+# Magic, version, flags, instruction count. The header itself is always big-endian
+HEADER = struct.Struct(">4sBBI")
+HEADER_MAGIC = b"HACK"
+HEADER_VERSION = 1
+LITTLE_ENDIAN_FLAG = 0x01
+
+BYTEORDERS = ("big", "little")
+
+# Number of words buffered at a time when streaming an image to disk
+CHUNK_WORDS = 1 << 16
+
+
+def _to_bytes(words: array, byteorder: str) -> bytes:
+    """
+    Convert an array of 16-bit words to bytes in `byteorder`
+
+    Args:
+        `words` (array[int]): The words to convert
+        `byteorder` (str): "big" or "little"
+
+    Returns:
+        bytes: The raw words
+    """
+
+    if byteorder not in BYTEORDERS:
+        raise ValueError(f"Unknown byteorder {byteorder}, expected one of {BYTEORDERS}")
+
+    if byteorder != sys.byteorder:
+        words = array("H", words)
+        words.byteswap()
+
+    return words.tobytes()
+
+
+def to_big_endian(column: array) -> array:
+    """
+    Swap `column` in place between native and big-endian byte order (a no-op on big-endian hosts)
+
+    Args:
+        `column` (array): The array to convert
+
+    Returns:
+        array: `column`
+    """
+
+    if sys.byteorder == "little":
+        column.byteswap()
+
+    return column
+
+
+def _to_words(words: Iterable[int]) -> array:
+    """
+    Convert `words` to an array of 16-bit words
+
+    Raises:
+        ValueError: if a word does not fit in 16 bits
+    """
+
+    if isinstance(words, array) and words.typecode == "H":
+        return words
+
+    try:
+        return array("H", words)
+    except OverflowError as error:
+        raise ValueError(
+            "Program has a word that does not fit in a 16-bit ROM image"
+        ) from error
+
+
+def pack_header(count: int, byteorder: str) -> bytes:
+    """
+    Build the ROM image header
+
+    Args:
+        `count` (int): The number of instructions in the image
+        `byteorder` (str): The byte order of the words that follow
+
+    Returns:
+        bytes: The packed header
+    """
+
+    flags = LITTLE_ENDIAN_FLAG if byteorder == "little" else 0
+    return HEADER.pack(HEADER_MAGIC, HEADER_VERSION, flags, count)
+
+
+def write_binary(
+    words: Iterable[int], file: str, byteorder: str = "big", header: bool = False
+) -> None:
+    """
+    Write `words` as a ROM image through a preallocated memory map,
+        or in compressed chunks if `file` ends in .gz, .bz2 or .xz
+
+    Args:
+        `words` (Iterable[int]): The encoded 16-bit words
+        `file` (str): The filepath of the image to be written
+        `byteorder` (str): "big" or "little". Defaults to "big"
+        `header` (bool): Whether to prefix the image with a header. Defaults to False
+    """
+
+    words = _to_words(words)
+
+    if detect_compression(file) is not None:
+        with open_file(file, "wb") as f:
+            if header:
+                f.write(pack_header(len(words), byteorder))
+            for start in range(0, len(words), CHUNK_WORDS):
+                f.write(_to_bytes(words[start : start + CHUNK_WORDS], byteorder))
+        return
+
+    data = _to_bytes(words, byteorder)
+    prefix = pack_header(len(words), byteorder) if header else b""
+    size = len(prefix) + len(data)
+
+    with open(file, "w+b") as f:
+        if size == 0:
+            return
+
+        f.truncate(size)
+        with mmap.mmap(f.fileno(), size) as image:
+            image[: len(prefix)] = prefix
+            image[len(prefix) :] = data
+
+
+def write_binary_stream(
+    words: Iterable[int], file: str, byteorder: str = "big", header: bool = False
+) -> None:
+    """
+    Write `words` as a ROM image in fixed size chunks without holding the whole program.
+        The header's instruction count is filled in once the stream is exhausted.
+        A .gz, .bz2 or .xz `file` is compressed chunk by chunk
+
+    Args:
+        `words` (Iterable[int]): The encoded 16-bit words
+        `file` (str): The filepath of the image to be written
+        `byteorder` (str): "big" or "little". Defaults to "big"
+        `header` (bool): Whether to prefix the image with a header. Defaults to False
+
+    Raises:
+        ValueError: If a header is requested for a compressed `file`, since the header
+            cannot be rewritten once compressed
+    """
+
+    if header and detect_compression(file) is not None:
+        raise ValueError("A streamed compressed ROM image cannot have a header")
+
+    count = 0
+    chunk = array("H")
+
+    with open_file(file, "wb") as f:
+        if header:
+            f.write(pack_header(0, byteorder))
+
+        for word in words:
+            try:
+                chunk.append(word)
+            except OverflowError as error:
+                raise ValueError(
+                    "Program has a word that does not fit in a 16-bit ROM image"
+                ) from error
+            if len(chunk) == CHUNK_WORDS:
+                f.write(_to_bytes(chunk, byteorder))
+                count += len(chunk)
+                chunk = array("H")
+
+        f.write(_to_bytes(chunk, byteorder))
+        count += len(chunk)
+
+        if header:
+            f.seek(0)
+            f.write(pack_header(count, byteorder))
+
+
+def load_binary(file: str, byteorder: str = "big", header: bool | None = None) -> array:
+    """
+    Load a ROM image written by `write_binary`, decompressing it if it is compressed
+
+    Args:
+        `file` (str): The filepath of the image
+        `byteorder` (str): The byte order of a headerless image. Defaults to "big"
+        `header` (bool | None): Whether the image has a header.
+            If None, a header is detected by its magic and instruction count
+
+    Returns:
+        array[int]: The 16-bit words of the image
+    """
+
+    with open_file(file, "rb") as f:
+        data = f.read()
+
+    if header is None:
+        header = _has_header(data)
+
+    if header:
+        magic, _, flags, count = HEADER.unpack_from(data)
+        if magic != HEADER_MAGIC:
+            raise ValueError(f"{file} does not start with a ROM image header")
+
+        byteorder = "little" if flags & LITTLE_ENDIAN_FLAG else "big"
+        data = data[HEADER.size : HEADER.size + 2 * count]
+
+    if byteorder not in BYTEORDERS:
+        raise ValueError(f"Unknown byteorder {byteorder}, expected one of {BYTEORDERS}")
+
+    if len(data) % 2:
+        raise ValueError(f"{file} does not contain a whole number of 16-bit words")
+
+    words = array("H", data)
+    if byteorder != sys.byteorder:
+        words.byteswap()
+
+    return words
+
+
+def _has_header(data: bytes) -> bool:
+    """
+    Check whether `data` starts with a header whose instruction count matches its length
+
+    Args:
+        `data` (bytes): The raw image
+    """
+
+    if len(data) < HEADER.size or data[:4] != HEADER_MAGIC:
+        return False
+
+    return HEADER.unpack_from(data)[3] * 2 == len(data) - HEADER.size
@@ -0,0 +1,342 @@
+"""
+Long-running assembler daemon and client over a Unix domain socket.
+
+Every message is a 4-byte big-endian length followed by that many bytes.
+A request is one format byte (`FORMAT_TEXT` or `FORMAT_BINARY`) followed by the .asm source.
+A response is one status byte (`STATUS_OK` or `STATUS_ERROR`) followed by the .hack text,
+the big-endian 16-bit words, or a UTF-8 error message. A connection may send any number
+of requests and receives the responses in order. Messages longer than `MAX_MESSAGE_BYTES` are
+refused before their body is read.
+
+Requests are assembled in a pool of worker processes that each keep a warm assembler, so one
+large program does not hold up the other clients.
+
+Usage:
+    > python3 server.py --socket /tmp/hack.sock serve
+    > python3 server.py --socket /tmp/hack.sock assemble {file_name}.asm ...
+"""
+
+from argparse import ArgumentParser
+from array import array
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor
+import os
+import socket
+import stat
+import struct
+import sys
+
+from assembler import Assembler
+from compression import detect_compression, open_file, output_path
+from translator import word_to_bin
+
+DEFAULT_SOCKET = "/tmp/hack_assembler.sock"
+
+LENGTH = struct.Struct(">I")
+# Far above the source of any program that fits in the 32K ROM, including its comments
+MAX_MESSAGE_BYTES = 16 * 1024 * 1024
+
+FORMAT_TEXT = 0
+FORMAT_BINARY = 1
+
+STATUS_OK = 0
+STATUS_ERROR = 1
+
+# The warm assembler of a worker process, created once per worker
+_assembler: Assembler | None = None
+
+
+def handle_request(assembler: Assembler, request: bytes) -> bytes:
+    """
+    Assemble one request payload into its response payload
+
+    Args:
+        `assembler` (`Assembler`): The warm assembler
+        `request` (bytes): The format byte followed by the .asm source
+
+    Returns:
+        bytes: The status byte followed by the output or an error message
+    """
+
+    try:
+        if not request or request[0] not in (FORMAT_TEXT, FORMAT_BINARY):
+            raise ValueError("Request must start with a valid format byte")
+
+        words = assembler.assemble(request[1:])
+        if request[0] == FORMAT_BINARY:
+            words = array("H", words)
+    except Exception as error:
+        return bytes([STATUS_ERROR]) + f"{type(error).__name__}: {error}".encode()
+
+    if request[0] == FORMAT_BINARY:
+        if sys.byteorder != "big":
+            words.byteswap()
+        return bytes([STATUS_OK]) + words.tobytes()
+
+    return bytes([STATUS_OK]) + "\n".join(map(word_to_bin, words)).encode()
+
+
+def _initialize_worker() -> None:
+    """
+    Create the warm assembler of a worker process
+    """
+
+    global _assembler
+    _assembler = Assembler()
+
+
+def _handle_in_worker(request: bytes) -> bytes:
+    """
+    Assemble one request payload with the warm assembler of this worker
+    """
+
+    return handle_request(_assembler, request)
+
+
+def _error_response(message: str) -> bytes:
+    return bytes([STATUS_ERROR]) + message.encode()
+
+
+async def _handle_client(
+    executor: Executor, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+) -> None:
+    """
+    Serve requests from one client until it disconnects or sends an oversized request
+    """
+
+    loop = asyncio.get_running_loop()
+
+    try:
+        while True:
+            try:
+                (length,) = LENGTH.unpack(await reader.readexactly(LENGTH.size))
+                if length > MAX_MESSAGE_BYTES:
+                    response = _error_response(
+                        f"ValueError: Request of {length} bytes exceeds "
+                        f"the limit of {MAX_MESSAGE_BYTES} bytes"
+                    )
+                    writer.write(LENGTH.pack(len(response)) + response)
+                    await writer.drain()
+                    break
+                request = await reader.readexactly(length)
+            except asyncio.IncompleteReadError:
+                break
+
+            response = await loop.run_in_executor(executor, _handle_in_worker, request)
+            writer.write(LENGTH.pack(len(response)) + response)
+            await writer.drain()
+    finally:
+        writer.close()
+
+
+def remove_socket(socket_path: str) -> None:
+    """
+    Remove the Unix domain socket at `socket_path`, leaving anything that is not a socket alone
+
+    Args:
+        `socket_path` (str): The filepath of the Unix domain socket
+    """
+
+    try:
+        if stat.S_ISSOCK(os.lstat(socket_path).st_mode):
+            os.remove(socket_path)
+    except FileNotFoundError:
+        pass
+
+
+async def serve(socket_path: str = DEFAULT_SOCKET, jobs: int | None = None) -> None:
+    """
+    Serve assemble requests on `socket_path` until cancelled, keeping one warm assembler
+        resident in each worker process
+
+    Args:
+        `socket_path` (str): The filepath of the Unix domain socket. A socket left there by
+            a previous daemon is replaced
+        `jobs` (int | None): The number of worker processes. Defaults to the number of CPUs
+
+    Raises:
+        FileExistsError: If something other than a socket exists at `socket_path`
+    """
+
+    if os.path.lexists(socket_path) and not stat.S_ISSOCK(
+        os.lstat(socket_path).st_mode
+    ):
+        raise FileExistsError(f"{socket_path} exists and is not a socket")
+    remove_socket(socket_path)
+
+    with ProcessPoolExecutor(
+        max_workers=jobs, initializer=_initialize_worker
+    ) as executor:
+        server = await asyncio.start_unix_server(
+            lambda reader, writer: _handle_client(executor, reader, writer),
+            path=socket_path,
+        )
+
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            remove_socket(socket_path)
+
+
+class AssemblerClient:
+    """
+    Blocking client for a running assembler daemon
+
+    Attributes:
+        `socket_path` (str): The filepath of the daemon's Unix domain socket
+    """
+
+    def __init__(self, socket_path: str = DEFAULT_SOCKET) -> None:
+        self.socket_path = socket_path
+        self._socket: socket.socket | None = None
+
+    def __enter__(self) -> "AssemblerClient":
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Close the connection to the daemon, if open
+        """
+
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+
+    def request(self, source: bytes, output_format: int = FORMAT_TEXT) -> bytes:
+        """
+        Send one request over a persistent connection and return its output
+
+        Args:
+            `source` (bytes): The .asm source
+            `output_format` (int): `FORMAT_TEXT` or `FORMAT_BINARY`. Defaults to `FORMAT_TEXT`
+
+        Returns:
+            bytes: The .hack text or big-endian words
+
+        Raises:
+            ValueError: if the source is too long or the daemon reports an assembly error
+        """
+
+        if self._socket is None:
+            self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._socket.connect(self.socket_path)
+
+        payload = bytes([output_format]) + source
+        if len(payload) > MAX_MESSAGE_BYTES:
+            raise ValueError(f"Source exceeds the limit of {MAX_MESSAGE_BYTES} bytes")
+        self._socket.sendall(LENGTH.pack(len(payload)) + payload)
+
+        (length,) = LENGTH.unpack(self._receive(LENGTH.size))
+        if length > MAX_MESSAGE_BYTES:
+            raise ConnectionError(f"Response of {length} bytes exceeds the limit")
+        response = self._receive(length)
+
+        if response[0] != STATUS_OK:
+            raise ValueError(response[1:].decode())
+
+        return response[1:]
+
+    def assemble(self, source: str | bytes) -> array:
+        """
+        Assemble `source` on the daemon into 16-bit words
+
+        Args:
+            `source` (str | bytes): The .asm source
+
+        Returns:
+            array[int]: One encoded 16-bit word per ROM address
+        """
+
+        if isinstance(source, str):
+            source = source.encode()
+
+        words = array("H", self.request(source, FORMAT_BINARY))
+        if sys.byteorder != "big":
+            words.byteswap()
+
+        return words
+
+    def _receive(self, size: int) -> bytes:
+        data = bytearray()
+
+        while len(data) < size:
+            if not (chunk := self._socket.recv(size - len(data))):
+                raise ConnectionError("Assembler daemon closed the connection")
+            data += chunk
+
+        return bytes(data)
+
+
+def initialize_argparser() -> ArgumentParser:
+    """
+    Initialize the ArgumentParser for command-line-arguments
+    """
+
+    arg_parser = ArgumentParser(
+        prog="HackAssemblerServer",
+        description="Run or query a resident Hack assembler.",
+    )
+    arg_parser.add_argument(
+        "--socket",
+        type=str,
+        default=DEFAULT_SOCKET,
+        help=f"filepath of the Unix domain socket (default: {DEFAULT_SOCKET})",
+    )
+    commands = arg_parser.add_subparsers(dest="command", required=True)
+    serve_parser = commands.add_parser(
+        "serve", help="keep warm assemblers resident on the socket"
+    )
+    serve_parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        help="number of worker processes assembling requests (default: number of CPUs)",
+    )
+    assemble_parser = commands.add_parser(
+        "assemble", help="assemble files on the daemon"
+    )
+    assemble_parser.add_argument(
+        "files",
+        metavar="file.asm",
+        type=str,
+        nargs="+",
+        help="the .asm files to be assembled",
+    )
+
+    return arg_parser
+
+
+if __name__ == "__main__":
+    args = initialize_argparser().parse_args()
+
+    if args.command == "serve":
+        try:
+            asyncio.run(serve(args.socket, args.jobs))
+        except KeyboardInterrupt:
+            pass
+        except FileExistsError as error:
+            sys.exit(f"error: {error}")
+        sys.exit()
+
+    failed = False
+    with AssemblerClient(args.socket) as client:
+        for file in args.files:
+            with open_file(file, "rb") as f:
+                source = f.read()
+            try:
+                output = client.request(source)
+            except ValueError as error:
+                print(f"{file}: error: {error}", file=sys.stderr)
+                failed = True
+                continue
+
+            with open_file(
+                output_path(file, ".hack", detect_compression(file)), "wb"
+            ) as f:
+                f.write(output)
+
+    sys.exit(1 if failed else 0)
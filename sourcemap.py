@@ -0,0 +1,273 @@
+"""
+Source maps from ROM addresses back to the .asm source.
+
+A `SourceMap` is recorded by the pipeline that assembles the file, in the same read:
+`SourceMap.record_lines` cleans the raw lines in place of `hasm_parser.clean_lines`, recording the
+line, text and referenced symbol of every instruction that takes up a ROM address as it passes
+through. The resolved value of each symbol is filled in from the encoded words once they exist,
+since the word of an A-Instruction is the value it loads, either from the finished program
+(`resolve_values`) or as the words stream past (`record_values`).
+Maps are written either as JSON lines (one object per ROM address) or as a compact binary file
+of columnar arrays that loads without parsing any JSON.
+"""
+
+from array import array
+from collections.abc import Iterable, Iterator, Sequence
+import json
+import struct
+from typing import NamedTuple
+
+from constants import COMMENT, LABEL_START, VAR_START
+from rom_image import to_big_endian
+
+MAP_FORMATS = ("jsonl", "binary")
+MAGIC = b"HMAP"
+VERSION = 1
+# Magic, version, entry count
+HEADER = struct.Struct(">4sBI")
+NAME_LENGTH = struct.Struct(">H")
+BLOB_LENGTH = struct.Struct(">I")
+# Value in `SourceMap.values` of an instruction that references no symbol
+NO_SYMBOL = -1
+
+
+class SourceEntry(NamedTuple):
+    """
+    Where the instruction at one ROM address came from
+    """
+
+    address: int
+    file: str
+    line: int
+    text: str
+    symbol: str | None
+    value: int | None
+
+
+class SourceMap:
+    """
+    Columnar map from ROM address to source location
+
+    Attributes:
+        `file` (str): The .asm file the program was assembled from
+        `lines` (array[int]): The 1-based source line of each ROM address
+        `texts` (list[str]): The source line of each ROM address as written, comments included
+        `symbols` (list[str]): The symbol referenced at each ROM address, or "" if none
+        `values` (array[int]): The resolved value of each symbol, or `NO_SYMBOL`
+    """
+
+    __slots__ = ("file", "lines", "texts", "symbols", "values")
+
+    def __init__(self, file: str) -> None:
+        self.file = file
+        self.lines = array("I")
+        self.texts: list[str] = []
+        self.symbols: list[str] = []
+        self.values = array("i")
+
+    def __len__(self) -> int:
+        return len(self.lines)
+
+    def __getitem__(self, address: int) -> SourceEntry:
+        symbol = self.symbols[address]
+        return SourceEntry(
+            address,
+            self.file,
+            self.lines[address],
+            self.texts[address],
+            symbol or None,
+            self.values[address] if symbol else None,
+        )
+
+    def __iter__(self):
+        return map(self.__getitem__, range(len(self)))
+
+    def record_lines(self, lines: Iterable[str]) -> Iterator[str]:
+        """
+        Strip comments and whitespace from `lines` like `hasm_parser.clean_lines`,
+            recording the source of each instruction that takes up a ROM address
+
+        Args:
+            `lines` (Iterable[str]): The raw lines of the .asm file, from its first line
+
+        Yields:
+            str: Each instruction without whitespace or comments
+        """
+
+        for line_num, line in enumerate(lines, 1):
+            if not (instruction := line.split(COMMENT)[0].strip()):
+                continue
+
+            if instruction[0] != LABEL_START:
+                symbol = instruction[1:] if instruction[0] == VAR_START else ""
+                self.lines.append(line_num)
+                self.texts.append(line.rstrip("\r\n"))
+                self.symbols.append("" if symbol.isdigit() else symbol)
+                self.values.append(NO_SYMBOL)
+
+            yield instruction
+
+    def keep(self, addresses: Iterable[int]) -> None:
+        """
+        Keep only the entries at `addresses`, e.g. the instructions an optimizer did not remove,
+            which become the new ROM addresses in order
+
+        Args:
+            `addresses` (Iterable[int]): The addresses to keep, in ascending order
+        """
+
+        addresses = list(addresses)
+        self.lines = array("I", (self.lines[address] for address in addresses))
+        self.texts = [self.texts[address] for address in addresses]
+        self.symbols = [self.symbols[address] for address in addresses]
+        self.values = array("i", (self.values[address] for address in addresses))
+
+    def resolve_values(self, words: Sequence[int]) -> None:
+        """
+        Fill in the value of each symbol from the encoded program
+
+        Args:
+            `words` (Sequence[int]): One encoded word per ROM address
+        """
+
+        values = self.values
+        for address, symbol in enumerate(self.symbols):
+            if symbol:
+                values[address] = int(words[address])
+
+    def record_values(self, words: Iterable[int]) -> Iterator[int]:
+        """
+        Fill in the value of each symbol as the encoded words stream past
+
+        Args:
+            `words` (Iterable[int]): One encoded word per ROM address, in order
+
+        Yields:
+            int: Each of `words`
+        """
+
+        symbols, values = self.symbols, self.values
+        for address, word in enumerate(words):
+            if symbols[address]:
+                values[address] = word
+            yield word
+
+
+def write_source_map(
+    source_map: SourceMap, file: str, map_format: str = "jsonl"
+) -> None:
+    """
+    Write `source_map` to `file`
+
+    Args:
+        `source_map` (`SourceMap`): The map to write
+        `file` (str): The filepath to write it to
+        `map_format` (str): "jsonl" or "binary". Defaults to "jsonl"
+    """
+
+    if map_format == "binary":
+        _write_binary(source_map, file)
+        return
+
+    with open(file, "w", encoding="UTF-8") as f:
+        for entry in source_map:
+            f.write(json.dumps(entry._asdict(), separators=(",", ":")))
+            f.write("\n")
+
+
+def _write_binary(source_map: SourceMap, file: str) -> None:
+    """
+    Write `source_map` as a header, the file name, the line and value arrays (big-endian)
+        and newline-separated blobs of the instruction texts and symbols
+
+    Args:
+        `source_map` (`SourceMap`): The map to write
+        `file` (str): The filepath to write it to
+    """
+
+    name = source_map.file.encode("UTF-8")
+    texts = "\n".join(source_map.texts).encode("UTF-8")
+    symbols = "\n".join(source_map.symbols).encode("UTF-8")
+
+    with open(file, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(source_map)))
+        f.write(NAME_LENGTH.pack(len(name)))
+        f.write(name)
+        for column in (source_map.lines, source_map.values):
+            f.write(to_big_endian(array(column.typecode, column)).tobytes())
+        for blob in (texts, symbols):
+            f.write(BLOB_LENGTH.pack(len(blob)))
+            f.write(blob)
+
+
+def load_source_map(file: str) -> SourceMap:
+    """
+    Load a source map written by `write_source_map` in either format
+
+    Args:
+        `file` (str): The filepath of the map
+
+    Returns:
+        `SourceMap`: The loaded map
+
+    Raises:
+        ValueError: If a binary map has an unsupported version
+    """
+
+    with open(file, "rb") as f:
+        data = f.read()
+
+    if not data.startswith(MAGIC):
+        return _load_jsonl(data.decode("UTF-8"))
+
+    _, version, count = HEADER.unpack_from(data)
+    if version != VERSION:
+        raise ValueError(f"Unsupported source map version {version} in {file}")
+    offset = HEADER.size
+
+    (name_length,) = NAME_LENGTH.unpack_from(data, offset)
+    offset += NAME_LENGTH.size
+    source_map = SourceMap(data[offset : offset + name_length].decode("UTF-8"))
+    offset += name_length
+
+    for column in (source_map.lines, source_map.values):
+        size = count * column.itemsize
+        column.frombytes(data[offset : offset + size])
+        to_big_endian(column)
+        offset += size
+
+    blobs = []
+    for _ in range(2):
+        (blob_length,) = BLOB_LENGTH.unpack_from(data, offset)
+        offset += BLOB_LENGTH.size
+        blobs.append(data[offset : offset + blob_length].decode("UTF-8"))
+        offset += blob_length
+
+    if count:
+        source_map.texts = blobs[0].split("\n")
+        source_map.symbols = blobs[1].split("\n")
+
+    return source_map
+
+
+def _load_jsonl(text: str) -> SourceMap:
+    """
+    Build a `SourceMap` from the JSON lines written by `write_source_map`
+
+    Args:
+        `text` (str): The contents of the map file
+    """
+
+    source_map = SourceMap("")
+
+    for line in text.splitlines():
+        entry = json.loads(line)
+        source_map.file = entry["file"]
+        source_map.lines.append(entry["line"])
+        source_map.texts.append(entry["text"])
+        source_map.symbols.append(entry["symbol"] or "")
+        source_map.values.append(
+            NO_SYMBOL if entry["value"] is None else entry["value"]
+        )
+
+    return source_map
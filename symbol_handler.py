@@ -2,34 +2,146 @@
 Module to handle symbols in the .asm files
 """
 
+from array import array
+from collections.abc import Iterable, MutableMapping
+
 from constants import PRE_DEFINED_SYMBOLS, LABEL_START, LABEL_END, VAR_START
 
+# Value in `symbol_values` of an interned symbol that is not yet in the symbol table
+UNRESOLVED = -1
+
 
 class SymbolHandler:
     """
     Class that maintains the Symbol table and labels for a .asm file.
 
     Attributes:
-        `symbol_table` (dict[str, int]): The symbol table that contains `PRE_DEFINED_SYMBOLS`
-            as well as any symbols encountered in the .asm file.
+        `symbol_table` (MutableMapping[str, int]): The symbol table that contains
+            `PRE_DEFINED_SYMBOLS` as well as any symbols encountered in the .asm file.
             Pre-defined symbols and @var symbols reference a memory address.
             (Labels) reference the next line number in the file.
         `next_address` int: Starting at 16, represents the memory address to be assigned to the next
             encountered variable.
+        `symbol_ids` (dict[str, int]): Small integer IDs of the symbols interned with `intern`
+        `symbol_names` (list[str]): The symbol of each ID
+        `symbol_values` (array[int]): The value of each ID, kept in step with `symbol_table`,
+            or `UNRESOLVED` if the symbol has not been added yet
+
+    An empty mapping can be passed in to hold the symbols instead of a dict, e.g. a
+    `symbol_store.DiskSymbolTable` for programs with enormous symbol counts. Such a handler
+    keeps no undo log, so it cannot `checkpoint` or `reset`.
     """
 
-    def __init__(self) -> None:
-        self.symbol_table: dict[str, int] = PRE_DEFINED_SYMBOLS.copy()
+    def __init__(self, symbol_table: MutableMapping[str, int] | None = None) -> None:
+        # (symbol, previous value) for every change since the last checkpoint, so `reset`
+        # only undoes what a program added instead of recopying the whole table
+        self._changes: list[tuple[str, int | None]] | None = []
+        if symbol_table is None:
+            self.symbol_table: MutableMapping[str, int] = PRE_DEFINED_SYMBOLS.copy()
+        else:
+            symbol_table.update(PRE_DEFINED_SYMBOLS)
+            self.symbol_table = symbol_table
+            self._changes = None
         self._next_address: int = 16
+        self._checkpoint_address: int = 16
+        self.symbol_ids: dict[str, int] = {}
+        self.symbol_names: list[str] = []
+        self.symbol_values = array("i")
+        self._checkpoint_ids: int = 0
+
+    def checkpoint(self) -> None:
+        """
+        Make the current symbol table the state restored by `reset`,
+            e.g. after seeding it with symbols shared by many programs
+
+        Raises:
+            ValueError: If the handler was given its own `symbol_table`
+        """
+
+        if self._changes is None:
+            raise ValueError(
+                "A handler with its own symbol table cannot be checkpointed"
+            )
+
+        self._changes.clear()
+        self._checkpoint_address = self._next_address
+        self._checkpoint_ids = len(self.symbol_names)
 
-    def handle_labels(self, instructions: list[str]) -> None:
+    def reset(self) -> None:
         """
-        Handle only labels from a supplied list of instructions. Done before any other symbol handling
+        Restore the symbol table to its state at the last `checkpoint`
+            (or construction) by undoing only the symbols added since
+
+        Raises:
+            ValueError: If the handler was given its own `symbol_table`
+        """
+
+        if self._changes is None:
+            raise ValueError("A handler with its own symbol table cannot be reset")
+
+        for symbol in self.symbol_names[self._checkpoint_ids :]:
+            del self.symbol_ids[symbol]
+        del self.symbol_names[self._checkpoint_ids :]
+        del self.symbol_values[self._checkpoint_ids :]
+
+        for symbol, previous in reversed(self._changes):
+            if previous is None:
+                del self.symbol_table[symbol]
+            else:
+                self.symbol_table[symbol] = previous
+
+            if (symbol_id := self.symbol_ids.get(symbol)) is not None:
+                self.symbol_values[symbol_id] = (
+                    UNRESOLVED if previous is None else previous
+                )
+
+        self._changes.clear()
+        self._next_address = self._checkpoint_address
+
+    def intern(self, symbol: str) -> int:
+        """
+        Get the small integer ID of `symbol`, assigning the next free ID on first use.
+            Resolving an ID with `resolve_id` is an array index instead of a string lookup
+
+        Args:
+            `symbol` (str): The symbol without any '@' or parentheses
+
+        Returns:
+            int: The ID of `symbol`
+        """
+
+        if (symbol_id := self.symbol_ids.get(symbol)) is None:
+            symbol_id = self.symbol_ids[symbol] = len(self.symbol_names)
+            self.symbol_names.append(symbol)
+            self.symbol_values.append(self.symbol_table.get(symbol, UNRESOLVED))
+
+        return symbol_id
+
+    def resolve_id(self, symbol_id: int) -> int:
+        """
+        Lookup the value of an interned symbol by its ID
+
+        Args:
+            `symbol_id` (int): The ID returned by `intern`
+
+        Returns:
+            int: The corresponding value from the `symbol_table`.
+        """
+
+        if (value := self.symbol_values[symbol_id]) != UNRESOLVED:
+            return value
+
+        return self.lookup_symbol(self.symbol_names[symbol_id])
+
+    def handle_labels(self, instructions: Iterable[str]) -> None:
+        """
+        Handle only labels from a supplied iterable of instructions. Done before any other symbol handling
         to avoid any label references that appear before
         the label declaration being incorrectly added as a variable instead
 
         Args:
-            `instructions` (list[str]): The list of assembly instructions
+            `instructions` (Iterable[str]): The assembly instructions. May be a generator
+                so labels can be collected in a single streaming pass
         """
 
         line_num = 0
@@ -85,8 +197,8 @@ class SymbolHandler:
 
         label = label.removeprefix(LABEL_START).removesuffix(LABEL_END)
 
-        if not self.symbol_table.get(label):
-            self.symbol_table[label] = line_num
+        if not (previous := self.symbol_table.get(label)):
+            self._set(label, line_num, previous)
 
     def _add_var(self, symbol: str) -> None:
         """
@@ -96,9 +208,27 @@ class SymbolHandler:
             `symbol`: The symbol to be added
         """
 
-        self.symbol_table[symbol] = self._next_address
+        self._set(symbol, self._next_address, self.symbol_table.get(symbol))
         self._next_address += 1
 
+    def _set(self, symbol: str, value: int, previous: int | None) -> None:
+        """
+        Set `symbol` to `value` in the `symbol_table` and `symbol_values`,
+            recording `previous` so `reset` can undo it
+
+        Args:
+            `symbol` (str): The symbol to be set
+            `value` (int): Its new value
+            `previous` (int | None): Its current value, or None if it is not in the table
+        """
+
+        if self._changes is not None:
+            self._changes.append((symbol, previous))
+        self.symbol_table[symbol] = value
+
+        if (symbol_id := self.symbol_ids.get(symbol)) is not None:
+            self.symbol_values[symbol_id] = value
+
     def lookup_symbol(self, symbol: str) -> int:
         """
         Lookup the symbol in the `symbol_table`.  If it exists, return the value.
@@ -0,0 +1,141 @@
+"""
+Disk-backed symbol table for programs with more symbols than comfortably fit in memory.
+
+`DiskSymbolTable` is a mapping from symbol to value kept in a temporary SQLite database, with an
+in-memory LRU cache of the most recently used symbols in front of it. It can replace the dict
+of a `SymbolHandler`, so `handle_symbol` and `lookup_symbol` work unchanged while the bulk of
+the symbols stay on disk.
+"""
+
+from collections import OrderedDict
+from collections.abc import Iterator, MutableMapping
+import os
+import sqlite3
+import tempfile
+
+DEFAULT_CACHE_SIZE = 1 << 16
+
+
+class DiskSymbolTable(MutableMapping):
+    """
+    Mapping of symbol to value spilled to a SQLite file behind an LRU cache
+
+    Attributes:
+        `path` (str): The database file, deleted by `close`
+        `cache_size` (int): The number of symbols kept in memory
+        `hits`, `misses` (int): Lookups answered by the cache and by the database
+    """
+
+    def __init__(
+        self, directory: str | None = None, cache_size: int = DEFAULT_CACHE_SIZE
+    ) -> None:
+        fd, self.path = tempfile.mkstemp(suffix=".sqlite", dir=directory)
+        os.close(fd)
+        self.cache_size = cache_size
+        self.hits = self.misses = 0
+        self._cache: OrderedDict[str, int] = OrderedDict()
+
+        # The database only lives as long as one assembly, so durability is not needed
+        self._connection = sqlite3.connect(self.path, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode = OFF")
+        self._connection.execute("PRAGMA synchronous = OFF")
+        self._connection.execute(
+            "CREATE TABLE symbols (name TEXT PRIMARY KEY, value INTEGER NOT NULL) WITHOUT ROWID"
+        )
+        self._connection.execute("BEGIN")
+
+    def __getitem__(self, symbol: str) -> int:
+        if (value := self.get(symbol)) is None:
+            raise KeyError(symbol)
+
+        return value
+
+    def get(self, symbol: str, default: int | None = None) -> int | None:
+        """
+        Get the value of `symbol`, from the cache if it was used recently
+
+        Args:
+            `symbol` (str): The symbol to look up
+            `default` (int | None): Returned if `symbol` is not in the table. Defaults to None
+        """
+
+        cache = self._cache
+        if (value := cache.get(symbol)) is not None:
+            cache.move_to_end(symbol)
+            self.hits += 1
+            return value
+
+        self.misses += 1
+        row = self._connection.execute(
+            "SELECT value FROM symbols WHERE name = ?", (symbol,)
+        ).fetchone()
+        if row is None:
+            return default
+
+        self._remember(symbol, row[0])
+        return row[0]
+
+    def __setitem__(self, symbol: str, value: int) -> None:
+        self._connection.execute(
+            "INSERT OR REPLACE INTO symbols (name, value) VALUES (?, ?)",
+            (symbol, value),
+        )
+        self._remember(symbol, value)
+
+    def __delitem__(self, symbol: str) -> None:
+        cursor = self._connection.execute(
+            "DELETE FROM symbols WHERE name = ?", (symbol,)
+        )
+        self._cache.pop(symbol, None)
+
+        if cursor.rowcount == 0:
+            raise KeyError(symbol)
+
+    def __contains__(self, symbol: object) -> bool:
+        return isinstance(symbol, str) and self.get(symbol) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        return (row[0] for row in self._connection.execute("SELECT name FROM symbols"))
+
+    def __len__(self) -> int:
+        return self._connection.execute("SELECT COUNT(*) FROM symbols").fetchone()[0]
+
+    @property
+    def hit_rate(self) -> float:
+        """
+        The fraction of lookups answered by the cache
+        """
+
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def close(self) -> None:
+        """
+        Close and delete the database
+        """
+
+        self._connection.close()
+        self._cache.clear()
+        os.remove(self.path)
+
+    def __enter__(self) -> "DiskSymbolTable":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def _remember(self, symbol: str, value: int) -> None:
+        """
+        Put `symbol` in the cache as the most recently used, evicting the least recently used
+
+        Args:
+            `symbol` (str): The symbol
+            `value` (int): Its value
+        """
+
+        cache = self._cache
+        cache[symbol] = value
+        cache.move_to_end(symbol)
+
+        if len(cache) > self.cache_size:
+            cache.popitem(last=False)
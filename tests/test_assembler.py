@@ -0,0 +1,45 @@
+"""
+Test methods for assembler module
+"""
+
+import io
+
+from assembler import Assembler
+from symbol_handler import SymbolHandler
+
+source = "@i\nM=1 // set\n(LOOP)\n@LOOP\n0;JMP\n"
+expected = [16, 0b1110111111001000, 2, 0b1110101010000111]
+
+
+def test_assemble_str() -> None:
+    assert list(Assembler().assemble(source)) == expected
+
+
+def test_assemble_bytes_and_files() -> None:
+    assembler = Assembler()
+    assert list(assembler.assemble(source.encode())) == expected
+    assert list(assembler.assemble(io.StringIO(source))) == expected
+    assert list(assembler.assemble(io.BytesIO(source.encode()))) == expected
+
+
+def test_assemble_lines() -> None:
+    assert Assembler().assemble_text(source.splitlines()) == [
+        f"{word:016b}" for word in expected
+    ]
+
+
+def test_assemble_resets_between_calls() -> None:
+    assembler = Assembler()
+    assembler.assemble("@a\n@b\n")
+
+    assert list(assembler.assemble("@b\n")) == [16]
+    assert "a" not in assembler.symbol_handler.symbol_table
+
+
+def test_assemble_keeps_seeded_symbols() -> None:
+    symbol_handler = SymbolHandler()
+    symbol_handler.handle_symbol("@shared", 0)
+    assembler = Assembler(symbol_handler)
+
+    assembler.assemble("@x\n")
+    assert list(assembler.assemble("@shared\n@y\n")) == [16, 17]
@@ -0,0 +1,47 @@
+"""
+Test methods for batch module
+"""
+
+import os
+import shutil
+
+from batch import assemble_batch, expand_sources
+from hack_assembler import assemble
+
+test_dir = os.path.dirname(__file__)
+
+
+def test_expand_sources_directory() -> None:
+    assert expand_sources([test_dir]) == sorted(
+        os.path.join(test_dir, name)
+        for name in os.listdir(test_dir)
+        if name.endswith(".asm")
+    )
+
+
+def test_expand_sources_glob() -> None:
+    assert expand_sources([f"{test_dir}/parser_test_file_*.asm"]) == [
+        f"{test_dir}/parser_test_file_comments.asm",
+        f"{test_dir}/parser_test_file_whitespace.asm",
+    ]
+
+
+def test_expand_sources_skips_non_asm() -> None:
+    assert expand_sources([f"{test_dir}/__init__.py", "missing.asm"]) == ["missing.asm"]
+
+
+def test_assemble_batch_reports_errors(tmp_path) -> None:
+    shutil.copy(f"{test_dir}/parser_test_file.asm", tmp_path / "good.asm")
+    (tmp_path / "bad.asm").write_text("D=Q\n")
+
+    results = assemble_batch(
+        [str(tmp_path / "bad.asm"), str(tmp_path / "good.asm")], assemble, jobs=2
+    )
+
+    assert [result.file for result in results] == [
+        str(tmp_path / "bad.asm"),
+        str(tmp_path / "good.asm"),
+    ]
+    assert "KeyError" in results[0].error
+    assert results[1].error is None
+    assert (tmp_path / "good.hack").exists()
@@ -0,0 +1,45 @@
+"""
+Test methods for benchmark module
+"""
+
+from assembler import Assembler
+from benchmark import benchmark_generated, generate_program
+from constants import MAX_A_VALUE
+
+
+def test_generate_program_reproducible() -> None:
+    assert generate_program(500, seed=1) == generate_program(500, seed=1)
+
+
+def test_generate_program_declares_labels() -> None:
+    source = generate_program(1000, label_density=0.1).split("\n")
+    referenced = {line[1:] for line in source if line.startswith("@L")}
+    declared = {line[1:-1] for line in source if line.startswith("(")}
+    assert referenced <= declared
+
+
+def test_generate_program_larger_than_rom_assembles() -> None:
+    source = generate_program(40000)
+    assembler = Assembler()
+
+    assert len(assembler.assemble(source)) > MAX_A_VALUE + 1
+    labels = {line[1:-1] for line in source.split("\n") if line.startswith("(")}
+    assert (
+        max(assembler.symbol_handler.symbol_table[label] for label in labels)
+        <= MAX_A_VALUE
+    )
+
+
+def test_benchmark_generated_stages() -> None:
+    results = benchmark_generated(200)
+    assert list(results["stages"]) == [
+        "parse_file",
+        "handle_labels",
+        "parse_compact",
+        "resolve_compact",
+        "write",
+        "total",
+    ]
+    assert results["parameters"]["lines"] == 200
+    assert list(results["symbol_stores"]) == ["memory", "disk"]
+    assert results["symbol_stores"]["disk"]["hit_rate"] < 1
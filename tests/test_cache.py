@@ -0,0 +1,125 @@
+"""
+Test methods for cache module
+"""
+
+import os
+
+from cache import (
+    AssemblyCache,
+    CacheEntry,
+    decode_entry,
+    default_cache_dir,
+    encode_entry,
+    parse_block,
+    split_blocks,
+)
+import cache
+from hasm_parser import parse_file
+from symbol_handler import SymbolHandler
+from translator import parse_compact, resolve_compact
+
+source = "@i\nM=1\n(LOOP)\n@i\nD=M\n@END\nD;JGT\n@j\n@LOOP\n0;JMP\n(END)\n@3\n"
+
+
+def expected_words(file: str) -> list[int]:
+    parsed_file = parse_file(file)
+    symbol_handler = SymbolHandler()
+    symbol_handler.handle_labels(parsed_file)
+    return list(
+        resolve_compact(parse_compact(parsed_file, symbol_handler), symbol_handler)
+    )
+
+
+def test_split_blocks_covers_all_lines() -> None:
+    lines = [f"@{i}" for i in range(10000)]
+    assert [line for block in split_blocks(lines) for line in block] == lines
+
+
+def test_parse_block_leaves_symbols_unresolved() -> None:
+    block = parse_block(["(LOOP)", "@x", "D=M", "@LOOP"])
+    assert list(block.words) == [0, 0b1111110000010000, 0]
+    assert block.ref_names == ["x", "LOOP"]
+    assert (list(block.label_offsets), block.label_names) == ([0], ["LOOP"])
+
+
+def test_assemble_matches_and_hits(tmp_path) -> None:
+    (tmp_path / "prog.asm").write_text(source)
+    assembly_cache = AssemblyCache(str(tmp_path / "cache"))
+
+    assert list(assembly_cache.assemble(str(tmp_path / "prog.asm"))) == expected_words(
+        str(tmp_path / "prog.asm")
+    )
+    assert assembly_cache.get(assembly_cache.key(source.encode())) is not None
+
+
+def test_assemble_reuses_unchanged_blocks(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(cache, "BLOCK_DIVISOR", 1)
+    (tmp_path / "prog.asm").write_text(source)
+    assembly_cache = AssemblyCache(str(tmp_path / "cache"))
+    assembly_cache.assemble(str(tmp_path / "prog.asm"))
+
+    parsed = []
+    monkeypatch.setattr(
+        cache, "parse_block", lambda lines: parsed.append(lines) or parse_block(lines)
+    )
+    (tmp_path / "prog.asm").write_text("@k\n" + source)
+
+    assert list(assembly_cache.assemble(str(tmp_path / "prog.asm"))) == expected_words(
+        str(tmp_path / "prog.asm")
+    )
+    assert parsed == [["@k"]]
+
+
+def test_entry_round_trip() -> None:
+    block = parse_block(["(LOOP)", "@x", "D=M", "@LOOP"])
+    entry = CacheEntry({"x": 16, "LOOP": 0}, block.words, {"digest": block})
+
+    assert decode_entry(encode_entry(entry)) == entry
+
+
+def test_get_ignores_pickles_and_truncated_entries(tmp_path) -> None:
+    assembly_cache = AssemblyCache(str(tmp_path))
+    entry = encode_entry(CacheEntry({}, parse_block(["@1"]).words, {}))
+    (tmp_path / "pickled.entry").write_bytes(b"\x80\x04\x95")
+    (tmp_path / "truncated.entry").write_bytes(entry[:-1])
+
+    assert assembly_cache.get("pickled") is None
+    assert assembly_cache.get("truncated") is None
+
+
+def test_evict_bounds_size(tmp_path) -> None:
+    assembly_cache = AssemblyCache(str(tmp_path / "cache"), max_bytes=0)
+    (tmp_path / "prog.asm").write_text(source)
+    assembly_cache.assemble(str(tmp_path / "prog.asm"))
+
+    assert assembly_cache.get(assembly_cache.key(source.encode())) is None
+    assert os.listdir(tmp_path / "cache") == []
+
+
+def test_size_is_tracked_across_writes(tmp_path, monkeypatch) -> None:
+    listings = []
+    listdir = os.listdir
+    monkeypatch.setattr(
+        cache.os, "listdir", lambda path: listings.append(path) or listdir(path)
+    )
+
+    assembly_cache = AssemblyCache(str(tmp_path / "cache"))
+    for i in range(3):
+        (tmp_path / f"prog{i}.asm").write_text(f"{source}@{i}\n")
+        assembly_cache.assemble(str(tmp_path / f"prog{i}.asm"))
+
+    assert len(listings) == 1
+    assert assembly_cache.size() == sum(
+        entry.stat().st_size for entry in (tmp_path / "cache").iterdir()
+    )
+
+
+def test_key_depends_on_format(monkeypatch) -> None:
+    key = AssemblyCache().key(source.encode())
+    monkeypatch.setattr(cache, "FORMAT_DIGEST", b"another format")
+    assert AssemblyCache().key(source.encode()) != key
+
+
+def test_default_cache_dir_is_per_user(tmp_path, monkeypatch) -> None:
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    assert default_cache_dir() == os.path.join(tmp_path, "hack_assembler")
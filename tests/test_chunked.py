@@ -0,0 +1,69 @@
+"""
+Test methods for chunked module
+"""
+
+from chunked import encode_chunk, encode_parallel, freeze_program, split_program
+from symbol_handler import SymbolHandler
+from translator import parse_compact, resolve_compact
+
+program = [
+    "@i",
+    "M=1",
+    "(LOOP)",
+    "@i",
+    "D=M",
+    "@END",
+    "D;JGT",
+    "@j",
+    "@LOOP",
+    "0;JMP",
+    "(END)",
+    "@3",
+]
+
+
+def expected_words() -> list[int]:
+    symbol_handler = SymbolHandler()
+    symbol_handler.handle_labels(program)
+    return list(resolve_compact(parse_compact(program, symbol_handler), symbol_handler))
+
+
+def test_freeze_program() -> None:
+    symbol_handler = SymbolHandler()
+    freeze_program(program, symbol_handler)
+    symbol_table = symbol_handler.symbol_table
+    assert (symbol_table["i"], symbol_table["j"]) == (16, 17)
+    assert (symbol_table["LOOP"], symbol_table["END"]) == (2, 9)
+
+
+def test_encode_chunk() -> None:
+    symbol_handler = SymbolHandler()
+    compact = freeze_program(program, symbol_handler)
+    words = encode_chunk(compact, symbol_handler.symbol_values)
+    assert list(words) == expected_words()
+
+
+def test_split_program_rebases_symbol_references() -> None:
+    symbol_handler = SymbolHandler()
+    chunks = list(split_program(freeze_program(program, symbol_handler), 3))
+
+    assert [len(chunk) for chunk in chunks] == [3, 3, 3, 1]
+    assert all(address < 3 for chunk in chunks for address in chunk.symbol_addresses)
+    words = [
+        word
+        for chunk in chunks
+        for word in encode_chunk(chunk, symbol_handler.symbol_values)
+    ]
+    assert words == expected_words()
+
+
+def test_encode_parallel_in_order() -> None:
+    chunks = encode_parallel(program, SymbolHandler(), jobs=2, chunk_size=3)
+    assert [word for chunk in chunks for word in chunk] == expected_words()
+
+
+def test_encode_parallel_text() -> None:
+    chunks = encode_parallel(
+        program, SymbolHandler(), jobs=2, chunk_size=3, as_text=True
+    )
+    assert "\n".join(chunks) == "\n".join(f"{word:016b}" for word in expected_words())
@@ -0,0 +1,101 @@
+"""
+Test methods for compression module
+"""
+
+import gzip
+import lzma
+
+import pytest
+
+from batch import expand_sources
+from compression import detect_compression, open_file, output_path, strip_compression
+from hack_assembler import assemble
+from rom_image import load_binary, write_binary, write_binary_stream
+
+SOURCE = "@2\nD=A\n@3\nD=D+A\n@0\nM=D\n"
+EXPECTED = "\n".join(
+    [
+        "0000000000000010",
+        "1110110000010000",
+        "0000000000000011",
+        "1110000010010000",
+        "0000000000000000",
+        "1110001100001000",
+    ]
+)
+
+
+@pytest.mark.parametrize(
+    "file, compression, stripped",
+    [
+        ("prog.asm", None, "prog.asm"),
+        ("prog.asm.gz", "gzip", "prog.asm"),
+        ("prog.asm.bz2", "bz2", "prog.asm"),
+        ("prog.asm.xz", "xz", "prog.asm"),
+    ],
+)
+def test_detect_and_strip_compression(file, compression, stripped) -> None:
+    assert detect_compression(file) == compression
+    assert strip_compression(file) == stripped
+
+
+def test_output_path() -> None:
+    assert output_path("dir/prog.asm", ".hack") == "dir/prog.hack"
+    assert output_path("dir/prog.asm.gz", ".hack", "gzip") == "dir/prog.hack.gz"
+    assert output_path("dir/prog.asm.gz", ".hack", "xz") == "dir/prog.hack.xz"
+    assert output_path("dir/prog.asm.bz2", ".hack") == "dir/prog.hack"
+
+
+@pytest.mark.parametrize("suffix", [".gz", ".bz2", ".xz"])
+def test_open_file_round_trip(tmp_path, suffix) -> None:
+    file = str(tmp_path / f"prog.asm{suffix}")
+
+    with open_file(file, "w") as f:
+        f.write(SOURCE)
+
+    with open_file(file) as f:
+        assert f.read() == SOURCE
+
+
+@pytest.mark.parametrize("options", [{}, {"stream": True}, {"one_pass": True}])
+def test_assemble_compressed_source(tmp_path, options) -> None:
+    with gzip.open(tmp_path / "prog.asm.gz", "wt") as f:
+        f.write(SOURCE)
+
+    assemble(str(tmp_path / "prog.asm.gz"), **options)
+
+    with gzip.open(tmp_path / "prog.hack.gz", "rt") as f:
+        assert f.read() == EXPECTED
+
+
+def test_assemble_compress_flag(tmp_path) -> None:
+    (tmp_path / "prog.asm").write_text(SOURCE)
+
+    assemble(str(tmp_path / "prog.asm"), compress="xz")
+
+    with lzma.open(tmp_path / "prog.hack.xz", "rt") as f:
+        assert f.read() == EXPECTED
+
+
+def test_expand_sources_finds_compressed(tmp_path) -> None:
+    (tmp_path / "a.asm").write_text(SOURCE)
+    (tmp_path / "b.asm.gz").write_bytes(gzip.compress(SOURCE.encode()))
+    (tmp_path / "c.hack.gz").write_bytes(b"")
+
+    assert expand_sources([str(tmp_path)]) == [
+        str(tmp_path / "a.asm"),
+        str(tmp_path / "b.asm.gz"),
+    ]
+
+
+def test_compressed_rom_image(tmp_path) -> None:
+    file = str(tmp_path / "prog.hack.bz2")
+
+    write_binary([1, 2, 3], file, "little", header=True)
+    assert list(load_binary(file)) == [1, 2, 3]
+
+    write_binary_stream(iter([4, 5]), file)
+    assert list(load_binary(file)) == [4, 5]
+
+    with pytest.raises(ValueError):
+        write_binary_stream(iter([4, 5]), file, header=True)
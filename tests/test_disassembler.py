@@ -0,0 +1,52 @@
+"""
+Test methods for disassembler module
+"""
+
+from pytest import raises
+
+from assembler import Assembler
+from disassembler import (
+    build_decode_table,
+    disassemble,
+    load_rom,
+    verify_round_trip,
+)
+from rom_image import write_binary
+from translator import C_INST_TABLE
+
+source = "@i\nM=1\n(LOOP)\n@LOOP\nAMD=D|M;JLE\n0;JMP\n"
+
+
+def test_decode_table_inverts_c_inst_table() -> None:
+    table = build_decode_table()
+    assert len(table) == 1 << 16
+    assert all(table[word] == text for text, word in C_INST_TABLE.items())
+    assert sum(text is not None for text in table) == (1 << 15) + len(C_INST_TABLE)
+
+
+def test_disassemble() -> None:
+    assert disassemble(Assembler().assemble(source)) == [
+        "@16",
+        "M=1",
+        "@2",
+        "AMD=D|M;JLE",
+        "0;JMP",
+    ]
+
+
+def test_disassemble_invalid_word() -> None:
+    with raises(ValueError):
+        disassemble([0b1000000000000000])
+
+
+def test_verify_round_trip() -> None:
+    assert verify_round_trip(Assembler().assemble(source)) is None
+
+
+def test_load_rom_text_and_binary(tmp_path) -> None:
+    words = Assembler().assemble(source)
+    (tmp_path / "text.hack").write_text("\n".join(Assembler().assemble_text(source)))
+    write_binary(words, str(tmp_path / "rom.hack"), header=True)
+
+    assert list(load_rom(str(tmp_path / "text.hack"))) == list(words)
+    assert list(load_rom(str(tmp_path / "rom.hack"))) == list(words)
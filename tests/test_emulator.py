@@ -0,0 +1,104 @@
+"""
+Test methods for emulator module
+"""
+
+import pytest
+
+from assembler import Assembler
+from emulator import KBD, SCREEN, Emulator
+
+MULTIPLY = """
+// R2 = R0 * R1
+    @R2
+    M=0
+(LOOP)
+    @R1
+    D=M
+    @END
+    D;JLE
+    @R0
+    D=M
+    @R2
+    M=D+M
+    @R1
+    M=M-1
+    @LOOP
+    0;JMP
+(END)
+    @END
+    0;JMP
+"""
+
+
+def load(source: str, profile: bool = False) -> Emulator:
+    return Emulator(Assembler().assemble(source), profile)
+
+
+def test_runs_until_idle_loop() -> None:
+    emulator = load(MULTIPLY)
+    emulator.ram[0], emulator.ram[1] = 6, 7
+
+    cycles = emulator.run()
+
+    assert emulator.halted
+    assert emulator.ram[2] == 42
+    assert cycles == emulator.cycles == 2 + 7 * 12 + 4 + 1
+
+
+def test_cycle_budget_resumes() -> None:
+    emulator = load(MULTIPLY)
+    emulator.ram[0], emulator.ram[1] = 3, 1000
+
+    assert emulator.run(100) == 100
+    assert not emulator.halted
+
+    emulator.run()
+    assert emulator.halted
+    assert emulator.ram[2] == 3000
+
+
+def test_runs_off_end_of_rom() -> None:
+    emulator = load("@5\nD=A\n@3\nM=D")
+
+    assert emulator.run() == 4
+    assert emulator.halted
+    assert emulator.ram[3] == 5
+
+
+def test_alu_wraps_to_16_bits() -> None:
+    emulator = load("@32767\nD=A\nD=D+1\n@0\nM=D\nD=!D\n@1\nM=D")
+    emulator.run()
+
+    assert (emulator.ram[0], emulator.ram[1]) == (-32768, 32767)
+
+
+def test_jump_uses_a_before_write() -> None:
+    # A=A+1 and the jump happen in the same cycle, so the jump goes to the old A (3), not 4
+    emulator = load("@3\nA=A+1;JMP\n@0\nD=1\n@7\nM=-1")
+    emulator.run()
+
+    assert emulator.d == 1
+
+
+def test_screen_and_keyboard() -> None:
+    emulator = load("@KBD\nD=M\n@SCREEN\nM=D")
+    emulator.keyboard = 65
+    emulator.run()
+
+    assert emulator.screen[0] == 65
+    assert len(emulator.screen) == KBD - SCREEN
+
+
+def test_profile_counts_each_address() -> None:
+    emulator = load(MULTIPLY, profile=True)
+    emulator.ram[0], emulator.ram[1] = 2, 5
+    emulator.run()
+
+    assert emulator.profile[2] == 6
+    assert emulator.hot_spots(1) == [(2, 6)]
+    assert sum(emulator.profile) == emulator.cycles
+
+
+def test_rejects_invalid_word() -> None:
+    with pytest.raises(ValueError):
+        Emulator([0b1000000000000000 + 1])
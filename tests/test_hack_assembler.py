@@ -2,25 +2,181 @@
 Test methods for main hack_assembler module
 """
 
-from pytest import MonkeyPatch, raises
-from hack_assembler import initialize_arguments, initialize_argparser, Namespace
+import os
+
+from pytest import MonkeyPatch, mark, param, raises
+from hack_assembler import (
+    assemble,
+    assemble_file,
+    assemble_file_streaming,
+    initialize_arguments,
+    initialize_argparser,
+    Namespace,
+)
+from numpy_backend import HAS_NUMPY
+from sourcemap import SourceEntry, load_source_map
 
 monkeypatch = MonkeyPatch()
 arg_parser = initialize_argparser()
+# Every option at its default, for mocking the parsed arguments
+DEFAULT_ARGS = vars(arg_parser.parse_args(["Path.asm"]))
+
+
+def mock_args(**kwargs) -> Namespace:
+    return Namespace(**{**DEFAULT_ARGS, **kwargs})
+
 
 def test_initialize_arguments():
     mock_filepath = "C:/File/Path.asm"
 
-    monkeypatch.setattr("argparse.ArgumentParser.parse_args", lambda _: Namespace(file=mock_filepath))
+    monkeypatch.setattr(
+        "argparse.ArgumentParser.parse_args", lambda _: mock_args(files=[mock_filepath])
+    )
 
     args = initialize_arguments(arg_parser)
 
-    assert args.file == mock_filepath
+    assert args.files == [mock_filepath]
 
 def test_initialize_arguments_invalid_file():
     mock_filepath = "C:/File/Path"
 
-    monkeypatch.setattr("argparse.ArgumentParser.parse_args", lambda _: Namespace(file=mock_filepath))
+    monkeypatch.setattr(
+        "argparse.ArgumentParser.parse_args", lambda _: mock_args(files=[mock_filepath])
+    )
+
+    with raises(SystemExit):
+        initialize_arguments(arg_parser)
+
+
+def test_initialize_arguments_rejects_optimize_with_stream():
+    monkeypatch.setattr(
+        "argparse.ArgumentParser.parse_args",
+        lambda _: mock_args(files=["C:/File/Path.asm"], optimize=True, stream=True),
+    )
+
+    with raises(SystemExit):
+        initialize_arguments(arg_parser)
+
+
+def test_initialize_arguments_source_map_with_stream():
+    monkeypatch.setattr(
+        "argparse.ArgumentParser.parse_args",
+        lambda _: mock_args(
+            files=["C:/File/Path.asm"], source_map="jsonl", stream=True
+        ),
+    )
+
+    assert initialize_arguments(arg_parser).source_map == "jsonl"
+
+
+def test_initialize_arguments_rejects_numpy_with_chunked():
+    monkeypatch.setattr(
+        "argparse.ArgumentParser.parse_args",
+        lambda _: mock_args(files=["C:/File/Path.asm"], backend="numpy", chunked=True),
+    )
 
     with raises(SystemExit):
         initialize_arguments(arg_parser)
+
+
+def test_initialize_arguments_rejects_chunked_with_one_pass():
+    monkeypatch.setattr(
+        "argparse.ArgumentParser.parse_args",
+        lambda _: mock_args(files=["C:/File/Path.asm"], chunked=True, one_pass=True),
+    )
+
+    with raises(SystemExit):
+        initialize_arguments(arg_parser)
+
+
+def test_initialize_arguments_symbol_store_requires_stream():
+    monkeypatch.setattr(
+        "argparse.ArgumentParser.parse_args",
+        lambda _: mock_args(files=["C:/File/Path.asm"], symbol_store="/tmp"),
+    )
+
+    with raises(SystemExit):
+        initialize_arguments(arg_parser)
+
+
+def test_initialize_arguments_mmap_requires_stream_or_one_pass():
+    monkeypatch.setattr(
+        "argparse.ArgumentParser.parse_args",
+        lambda _: mock_args(files=["C:/File/Path.asm"], mmap=True),
+    )
+
+    with raises(SystemExit):
+        initialize_arguments(arg_parser)
+
+
+def test_assemble_file_streaming_matches(tmp_path):
+    source = f"{os.path.dirname(__file__)}/parser_test_file_comments.asm"
+
+    assemble_file(source, str(tmp_path / "full.hack"))
+    assemble_file_streaming(source, str(tmp_path / "stream.hack"))
+
+    assert (tmp_path / "stream.hack").read_text() == (
+        tmp_path / "full.hack"
+    ).read_text()
+
+
+MAPPED_SOURCE = """// Count down
+@i  // the counter
+M=1
+(LOOP)
+@LOOP
+0;JMP
+"""
+
+
+@mark.parametrize(
+    "options",
+    [
+        {},
+        {"stream": True},
+        {"stream": True, "use_mmap": True},
+        {"one_pass": True},
+        {"chunked_jobs": 2},
+        param(
+            {"backend": "numpy"},
+            marks=mark.skipif(not HAS_NUMPY, reason="NumPy is not installed"),
+        ),
+        {"output_format": "binary"},
+    ],
+)
+def test_assemble_records_source_map(tmp_path, options):
+    source = tmp_path / "prog.asm"
+    source.write_text(MAPPED_SOURCE)
+
+    assemble(str(source), source_map="jsonl", **options)
+
+    assert list(load_source_map(str(tmp_path / "prog.map.jsonl"))) == [
+        SourceEntry(0, str(source), 2, "@i  // the counter", "i", 16),
+        SourceEntry(1, str(source), 3, "M=1", None, None),
+        SourceEntry(2, str(source), 5, "@LOOP", "LOOP", 2),
+        SourceEntry(3, str(source), 6, "0;JMP", None, None),
+    ]
+
+
+def test_assemble_records_source_map_from_cache(tmp_path):
+    source = tmp_path / "prog.asm"
+    source.write_text(MAPPED_SOURCE)
+    cache_dir = str(tmp_path / "cache")
+
+    assemble(str(source), cache_dir=cache_dir, source_map="binary")
+    first = list(load_source_map(str(tmp_path / "prog.map")))
+    os.remove(tmp_path / "prog.map")
+    assemble(str(source), cache_dir=cache_dir, source_map="binary")
+
+    assert len(first) == 4
+    assert list(load_source_map(str(tmp_path / "prog.map"))) == first
+
+
+def test_assemble_optimized_source_map_follows_kept_instructions(tmp_path):
+    source = tmp_path / "prog.asm"
+    source.write_text("@1\n@2\nD=A\n")
+
+    assemble(str(source), optimize=True, source_map="jsonl")
+
+    source_map = load_source_map(str(tmp_path / "prog.map.jsonl"))
+    assert [(entry.line, entry.text) for entry in source_map] == [(2, "@2"), (3, "D=A")]
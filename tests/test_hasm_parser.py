@@ -4,7 +4,13 @@ Test methods for hasm_parser module
 
 import os
 
-from hasm_parser import parse_file, parse_instructions, CInstruction
+from hasm_parser import (
+    clean_lines,
+    clean_lines_mmap,
+    parse_file,
+    parse_instructions,
+    CInstruction,
+)
 from symbol_handler import SymbolHandler
 
 expected_c_instruction = CInstruction("D=M+1")
@@ -36,6 +42,25 @@ def test_parse_file_comments():
     assert parsed_file == ["@1", "D=M+1", "@2", "0;JMP"]
 
 
+def test_clean_lines_whitespace_only() -> None:
+    assert list(clean_lines(["  \t", "@1 // one", "", "   D=M"])) == ["@1", "D=M"]
+
+
+def test_clean_lines_mmap_matches_parse_file() -> None:
+    for name in (
+        "parser_test_file",
+        "parser_test_file_whitespace",
+        "parser_test_file_comments",
+    ):
+        file = f"{os.path.dirname(__file__)}/{name}.asm"
+        assert list(clean_lines_mmap(file)) == parse_file(file)
+
+
+def test_clean_lines_mmap_empty_file(tmp_path) -> None:
+    (tmp_path / "empty.asm").write_text("")
+    assert list(clean_lines_mmap(str(tmp_path / "empty.asm"))) == []
+
+
 def test_full_c_instruction():
     assert CInstruction("MD=A-1;JGE") == expected_full_c_instruction
 
@@ -52,4 +77,4 @@ def test_parse_instructions():
 
 def test_parse_instructions_with_labels():
     # TODO
-    assert False
\ No newline at end of file
+    assert False
@@ -0,0 +1,34 @@
+"""
+Test methods for lexer module
+"""
+
+import os
+
+from hasm_parser import parse_file
+from lexer import A_NUMERIC, A_SYMBOL, C, LABEL, tokenize, tokenize_file
+
+
+def test_tokenize_kinds_and_lines() -> None:
+    source = "// header\n@12\n  @var // comment\n\n(LOOP)\nD=M+1   \n \t\n0;JMP"
+    assert list(tokenize(source)) == [
+        (A_NUMERIC, "12", 2),
+        (A_SYMBOL, "var", 3),
+        (LABEL, "LOOP", 5),
+        (C, "D=M+1", 6),
+        (C, "0;JMP", 8),
+    ]
+
+
+def test_tokenize_crlf() -> None:
+    assert list(tokenize("@1\r\nD=M\r\n")) == [(A_NUMERIC, "1", 1), (C, "D=M", 2)]
+
+
+def test_tokenize_lines() -> None:
+    lines = iter(["// comment\n", "@x\n", "(LOOP)\n"])
+    assert list(tokenize(lines)) == [(A_SYMBOL, "x", 2), (LABEL, "LOOP", 3)]
+
+
+def test_tokenize_file_matches_parse_file() -> None:
+    file = f"{os.path.dirname(__file__)}/parser_test_file_comments.asm"
+    values = [value for _, value, _ in tokenize_file(file)]
+    assert values == [line.lstrip("@") for line in parse_file(file)]
@@ -0,0 +1,74 @@
+"""
+Test methods for linker module
+"""
+
+import os
+
+import pytest
+
+from benchmark import generate_program
+from hasm_parser import clean_lines
+from linker import build_object, compile_object, link, load_object, write_object
+from symbol_handler import SymbolHandler
+from translator import parse_compact, resolve_compact
+
+
+def assemble_whole(instructions: list[str]) -> list[int]:
+    symbol_handler = SymbolHandler()
+    symbol_handler.handle_labels(instructions)
+    return list(
+        resolve_compact(parse_compact(instructions, symbol_handler), symbol_handler)
+    )
+
+
+def test_compile_object_tables() -> None:
+    obj = compile_object(["@x", "(LOOP)", "@LOOP", "@SCREEN", "@OTHER", "@x", "0;JMP"])
+
+    assert list(obj.words) == [0, 1, 16384, 0, 0, 0b1110101010000111]
+    assert list(obj.relocations) == [1]
+    assert obj.exports == {"LOOP": 1}
+    assert {
+        symbol: list(addresses) for symbol, addresses in obj.references.items()
+    } == {
+        "x": [0, 4],
+        "OTHER": [3],
+    }
+
+
+def test_link_matches_concatenated_assembly() -> None:
+    instructions = list(clean_lines(generate_program(3000, seed=5).splitlines()))
+    modules = [instructions[:700], instructions[700:1900], instructions[1900:]]
+
+    assert list(link(map(compile_object, modules))) == assemble_whole(instructions)
+
+
+def test_link_rejects_duplicate_labels() -> None:
+    with pytest.raises(ValueError):
+        link([compile_object(["(A)", "0"]), compile_object(["(A)", "0"])])
+
+
+def test_object_round_trip(tmp_path) -> None:
+    obj = compile_object(["@x", "(LOOP)", "@LOOP", "@OTHER", "0;JMP"])
+    write_object(obj, str(tmp_path / "mod.hobj"))
+
+    loaded = load_object(str(tmp_path / "mod.hobj"))
+
+    assert loaded.words == obj.words
+    assert loaded.relocations == obj.relocations
+    assert loaded.exports == obj.exports
+    assert loaded.references == obj.references
+
+
+def test_build_object_only_recompiles_changed_modules(tmp_path) -> None:
+    source = tmp_path / "mod.asm"
+    source.write_text("@1\n")
+    assert list(build_object(str(source)).words) == [1]
+
+    # A stale object is reused while it is newer than the source...
+    write_object(compile_object(["@7"]), str(tmp_path / "mod.hobj"))
+    assert list(build_object(str(source)).words) == [7]
+
+    # ...and rebuilt once the source changes
+    source.write_text("@2\n")
+    os.utime(tmp_path / "mod.hobj", ns=(0, 0))
+    assert list(build_object(str(source)).words) == [2]
@@ -0,0 +1,40 @@
+"""
+Test methods for numpy_backend module
+"""
+
+from pytest import importorskip, raises
+
+from symbol_handler import SymbolHandler
+from translator import parse_compact, resolve_compact, word_to_bin
+
+importorskip("numpy")
+
+from numpy_backend import render_text, resolve_words
+
+instructions = ["@var", "(LOOP)", "D=M", "@LOOP", "@5", "0;JMP"]
+
+
+def test_resolve_words_matches_python() -> None:
+    symbol_handler = SymbolHandler()
+    symbol_handler.handle_labels(instructions)
+    program = parse_compact(instructions, symbol_handler)
+
+    assert resolve_words(program, symbol_handler).tolist() == list(
+        resolve_compact(program, symbol_handler)
+    )
+
+
+def test_resolve_words_unresolved() -> None:
+    symbol_handler = SymbolHandler()
+    program = parse_compact(["@x"], symbol_handler)
+    symbol_handler.symbol_values[program.symbol_ids[0]] = -1
+    del symbol_handler.symbol_table["x"]
+
+    with raises(KeyError):
+        resolve_words(program, symbol_handler)
+
+
+def test_render_text() -> None:
+    words = [0, 42, 0b1110101010000111]
+    assert render_text(words).decode() == "\n".join(map(word_to_bin, words))
+    assert render_text([]) == b""
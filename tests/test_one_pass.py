@@ -0,0 +1,43 @@
+"""
+Test methods for one_pass module
+"""
+
+from benchmark import generate_program
+from hasm_parser import clean_lines
+from one_pass import assemble_one_pass
+from symbol_handler import SymbolHandler
+from translator import parse_compact, resolve_compact
+
+
+def two_pass(instructions: list[str]) -> list[int]:
+    symbol_handler = SymbolHandler()
+    symbol_handler.handle_labels(instructions)
+    return list(
+        resolve_compact(parse_compact(instructions, symbol_handler), symbol_handler)
+    )
+
+
+def test_forward_label_not_allocated_as_variable() -> None:
+    symbol_handler = SymbolHandler()
+    words = assemble_one_pass(
+        ["@x", "@END", "0;JMP", "@y", "(END)", "@x"], symbol_handler
+    )
+
+    assert list(words) == [16, 4, 0b1110101010000111, 17, 16]
+    assert symbol_handler.symbol_table["END"] == 4
+
+
+def test_backward_label() -> None:
+    assert list(assemble_one_pass(["(LOOP)", "@LOOP", "0;JMP"], SymbolHandler())) == [
+        0,
+        0b1110101010000111,
+    ]
+
+
+def test_matches_two_pass_on_generated_program() -> None:
+    instructions = list(
+        clean_lines(generate_program(5000, label_density=0.1, symbols=50).split("\n"))
+    )
+    assert list(assemble_one_pass(iter(instructions), SymbolHandler())) == two_pass(
+        instructions
+    )
@@ -0,0 +1,74 @@
+"""
+Test methods for peephole module
+"""
+
+from peephole import OptimizationReport, optimize_instructions
+
+
+def test_removes_dead_load() -> None:
+    assert optimize_instructions(["@1", "@2", "D=A"]) == (
+        ["@2", "D=A"],
+        OptimizationReport(dead_loads=1),
+    )
+
+
+def test_keeps_first_reference_to_variable() -> None:
+    instructions = ["@a", "@b", "M=1", "@a", "M=0"]
+
+    assert optimize_instructions(instructions) == (instructions, OptimizationReport())
+
+
+def test_removes_repeated_reference_to_variable() -> None:
+    optimized, report = optimize_instructions(["@a", "M=0", "@a", "@b", "M=1"])
+
+    assert optimized == ["@a", "M=0", "@b", "M=1"]
+    assert report == OptimizationReport(dead_loads=1)
+
+
+def test_keeps_load_before_label() -> None:
+    instructions = ["@1", "(LOOP)", "@2", "D=A"]
+
+    assert optimize_instructions(instructions) == (instructions, OptimizationReport())
+
+
+def test_removes_jump_to_next_instruction() -> None:
+    optimized, report = optimize_instructions(
+        ["D=M", "@END", "D;JGT", "(END)", "@0", "M=D"]
+    )
+
+    assert optimized == ["D=M", "(END)", "@0", "M=D"]
+    assert report == OptimizationReport(jumps_to_next=1)
+    assert (report.words_saved, report.cycles_saved) == (2, 2)
+
+
+def test_keeps_jump_to_next_when_a_is_read() -> None:
+    instructions = ["@END", "0;JMP", "(END)", "D=A"]
+
+    assert optimize_instructions(instructions)[0] == instructions
+
+
+def test_removes_unreachable_code_until_label() -> None:
+    optimized, report = optimize_instructions(
+        ["@LOOP", "0;JMP", "@1", "D=A", "(LOOP)", "D=D-1", "@LOOP", "D;JGT"]
+    )
+
+    assert optimized == ["@LOOP", "0;JMP", "(LOOP)", "D=D-1", "@LOOP", "D;JGT"]
+    assert report == OptimizationReport(unreachable=2)
+    assert report.cycles_saved == 0
+
+
+def test_keeps_unreachable_first_reference_to_variable() -> None:
+    optimized, report = optimize_instructions(
+        ["@END", "0;JMP", "@x", "M=0", "(END)", "@y"]
+    )
+
+    assert optimized == ["@END", "0;JMP", "@x", "(END)", "@y"]
+    assert report == OptimizationReport(unreachable=1)
+
+
+def test_repeats_until_no_rewrite_applies() -> None:
+    # Removing the unreachable load exposes a jump to the next instruction
+    optimized, report = optimize_instructions(["@A", "0;JMP", "@1", "(A)", "@C", "D=A"])
+
+    assert optimized == ["(A)", "@C", "D=A"]
+    assert report == OptimizationReport(jumps_to_next=1, unreachable=1)
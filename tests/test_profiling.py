@@ -0,0 +1,90 @@
+"""
+Test methods for profiling module
+"""
+
+from pytest import raises
+
+import profiling
+from profiling import Profiler, instruction_kind, set_profiler
+
+
+def test_instruction_kind() -> None:
+    assert [instruction_kind(line) for line in ["(L)", "@1", "@x", "D=M"]] == [
+        "label",
+        "a_numeric",
+        "a_symbol",
+        "c",
+    ]
+
+
+def test_hooks_are_no_ops_without_profiler() -> None:
+    lines = ["@1"]
+    assert profiling.iterate("read", lines) is lines
+    assert profiling.track_kinds(lines) is lines
+
+
+def test_stage_nesting() -> None:
+    profiler = Profiler()
+
+    with profiler.stage("outer"):
+        with profiler.stage("inner"):
+            pass
+        assert list(profiler.iterate("items", range(3))) == [0, 1, 2]
+
+    outer = profiler.root.children["outer"]
+    assert outer.calls == 1
+    assert outer.children["inner"].calls == 1
+    assert outer.children["items"].calls == 3
+
+
+def test_track_kinds_counts() -> None:
+    profiler = Profiler()
+    list(profiler.track_kinds(["(L)", "@1", "@x", "D=M", "0;JMP"]))
+    assert {kind: stats.calls for kind, stats in profiler.kinds.items()} == {
+        "label": 1,
+        "a_numeric": 1,
+        "a_symbol": 1,
+        "c": 2,
+    }
+
+
+def test_allocations_recorded_for_lazy_stages_and_kinds() -> None:
+    profiler = Profiler(trace_allocations=True)
+    profiler.start()
+    try:
+        # Keep the lists alive so the allocations are not freed before they are measured
+        built = list(profiler.iterate("build", ([0] * 1000 for _ in range(3))))
+        built += [[0] * 1000 for _ in profiler.track_kinds(["@1"])]
+    finally:
+        profiler.stop()
+
+    assert profiler.root.children["build"].allocated_bytes >= 3 * 8000
+    assert profiler.kinds["a_numeric"].allocated_bytes >= 8000
+
+
+def test_collapsed_stacks_paths() -> None:
+    profiler = Profiler()
+    with profiler.stage("a"):
+        with profiler.stage("b"):
+            pass
+
+    assert [line.split(" ")[0] for line in profiler.collapsed_stacks()] == ["a", "a;b"]
+
+
+def test_installed_profiler_records_pipeline(tmp_path) -> None:
+    from hasm_parser import parse_file
+
+    (tmp_path / "prog.asm").write_text("@1\n// comment\nD=M\n")
+    profiler = Profiler()
+    set_profiler(profiler)
+    try:
+        parse_file(str(tmp_path / "prog.asm"))
+    finally:
+        set_profiler(None)
+
+    assert profiler.root.children["strip"].children["read"].calls == 3
+
+
+def test_dump_pstats_requires_cprofile(tmp_path) -> None:
+    with raises(ValueError):
+        Profiler().dump_pstats(str(tmp_path / "out.pstats"))
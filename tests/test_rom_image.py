@@ -0,0 +1,50 @@
+"""
+Test methods for rom_image module
+"""
+
+from array import array
+
+from pytest import raises
+
+from rom_image import HEADER, load_binary, write_binary, write_binary_stream
+
+words = array("H", [1, 0b1111110000010000, 2, 0b1110101010000111])
+
+
+def test_write_binary_big_endian(tmp_path) -> None:
+    write_binary(words, str(tmp_path / "rom.hack"))
+    assert (tmp_path / "rom.hack").read_bytes()[:4] == b"\x00\x01\xfc\x10"
+
+
+def test_write_binary_little_endian(tmp_path) -> None:
+    write_binary(words, str(tmp_path / "rom.hack"), byteorder="little")
+    assert (tmp_path / "rom.hack").read_bytes()[:4] == b"\x01\x00\x10\xfc"
+
+
+def test_load_binary_round_trip(tmp_path) -> None:
+    write_binary(words, str(tmp_path / "rom.hack"), byteorder="little")
+    assert load_binary(str(tmp_path / "rom.hack"), byteorder="little") == words
+
+
+def test_load_binary_header(tmp_path) -> None:
+    write_binary(words, str(tmp_path / "rom.hack"), byteorder="little", header=True)
+    assert (tmp_path / "rom.hack").stat().st_size == HEADER.size + 2 * len(words)
+    assert load_binary(str(tmp_path / "rom.hack")) == words
+
+
+def test_write_binary_stream_matches(tmp_path) -> None:
+    write_binary(words, str(tmp_path / "rom.hack"), header=True)
+    write_binary_stream(iter(words), str(tmp_path / "stream.hack"), header=True)
+    assert (tmp_path / "stream.hack").read_bytes() == (
+        tmp_path / "rom.hack"
+    ).read_bytes()
+
+
+def test_write_binary_empty(tmp_path) -> None:
+    write_binary([], str(tmp_path / "rom.hack"))
+    assert load_binary(str(tmp_path / "rom.hack")) == array("H")
+
+
+def test_write_binary_invalid_byteorder(tmp_path) -> None:
+    with raises(ValueError):
+        write_binary(words, str(tmp_path / "rom.hack"), byteorder="middle")
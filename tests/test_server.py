@@ -0,0 +1,105 @@
+"""
+Test methods for server module
+"""
+
+import asyncio
+import os
+import socket
+import threading
+import time
+
+from pytest import fixture, raises
+
+from assembler import Assembler
+from server import (
+    FORMAT_BINARY,
+    LENGTH,
+    MAX_MESSAGE_BYTES,
+    STATUS_ERROR,
+    STATUS_OK,
+    AssemblerClient,
+    handle_request,
+    serve,
+)
+
+source = "@i\nM=1\n(LOOP)\n@LOOP\n0;JMP\n"
+expected = [16, 0b1110111111001000, 2, 0b1110101010000111]
+
+
+def test_handle_request_binary() -> None:
+    response = handle_request(Assembler(), bytes([FORMAT_BINARY]) + source.encode())
+    assert response[0] == STATUS_OK
+    assert response[1:3] == b"\x00\x10"
+
+
+def test_handle_request_error() -> None:
+    assert handle_request(Assembler(), b"\x00D=Q")[0] == STATUS_ERROR
+
+
+@fixture
+def socket_path(tmp_path):
+    path = str(tmp_path / "hack.sock")
+    loop = asyncio.new_event_loop()
+    task = loop.create_task(serve(path))
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+
+    while not os.path.exists(path):
+        time.sleep(0.01)
+
+    yield path
+
+    async def shutdown() -> None:
+        tasks = asyncio.all_tasks() - {asyncio.current_task()}
+        for pending in tasks:
+            pending.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    asyncio.run_coroutine_threadsafe(shutdown(), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    loop.close()
+    assert task.done()
+
+
+def test_client_round_trip(socket_path) -> None:
+    with AssemblerClient(socket_path) as client:
+        assert list(client.assemble(source)) == expected
+        assert client.request(source.encode()).decode().split("\n") == [
+            f"{word:016b}" for word in expected
+        ]
+
+
+def test_client_error(socket_path) -> None:
+    with AssemblerClient(socket_path) as client:
+        with raises(ValueError):
+            client.assemble("D=Q")
+        assert list(client.assemble(source)) == expected
+
+
+def test_concurrent_clients(socket_path) -> None:
+    first, second = AssemblerClient(socket_path), AssemblerClient(socket_path)
+    try:
+        assert list(first.assemble(source)) == list(second.assemble(source)) == expected
+    finally:
+        first.close()
+        second.close()
+
+
+def test_oversized_request_is_refused(socket_path) -> None:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(socket_path)
+        client.sendall(LENGTH.pack(MAX_MESSAGE_BYTES + 1))
+        response = client.makefile("rb").read()
+
+    assert response[LENGTH.size] == STATUS_ERROR
+    assert b"exceeds" in response
+
+
+def test_serve_refuses_to_replace_a_file(tmp_path) -> None:
+    path = tmp_path / "hack.sock"
+    path.write_text("not a socket")
+
+    with raises(FileExistsError):
+        asyncio.run(serve(str(path)))
+    assert path.read_text() == "not a socket"
@@ -0,0 +1,60 @@
+"""
+Test methods for sourcemap module
+"""
+
+import pytest
+
+from hasm_parser import clean_lines
+from sourcemap import SourceEntry, SourceMap, load_source_map, write_source_map
+
+SOURCE = """// Count down
+@i  // the counter
+M=1
+(LOOP)
+@LOOP
+0;JMP
+"""
+WORDS = [16, 0b1110111111001000, 2, 0b1110101010000111]
+
+
+def recorded_map() -> SourceMap:
+    source_map = SourceMap("prog.asm")
+    instructions = list(source_map.record_lines(SOURCE.splitlines()))
+    assert instructions == list(clean_lines(SOURCE.splitlines()))
+    return source_map
+
+
+def test_record_lines_records_source() -> None:
+    source_map = recorded_map()
+    source_map.resolve_values(WORDS)
+
+    assert list(source_map) == [
+        SourceEntry(0, "prog.asm", 2, "@i  // the counter", "i", 16),
+        SourceEntry(1, "prog.asm", 3, "M=1", None, None),
+        SourceEntry(2, "prog.asm", 5, "@LOOP", "LOOP", 2),
+        SourceEntry(3, "prog.asm", 6, "0;JMP", None, None),
+    ]
+
+
+def test_record_values_while_streaming() -> None:
+    source_map = recorded_map()
+
+    assert list(source_map.record_values(iter(WORDS))) == WORDS
+    assert [entry.value for entry in source_map] == [16, None, 2, None]
+
+
+def test_keep_renumbers_addresses() -> None:
+    source_map = recorded_map()
+    source_map.keep([1, 3])
+
+    assert [(entry.address, entry.line) for entry in source_map] == [(0, 3), (1, 6)]
+
+
+@pytest.mark.parametrize("map_format", ["jsonl", "binary"])
+def test_source_map_round_trip(tmp_path, map_format) -> None:
+    source_map = recorded_map()
+    source_map.resolve_values(WORDS)
+
+    write_source_map(source_map, str(tmp_path / "prog.map"), map_format)
+
+    assert list(load_source_map(str(tmp_path / "prog.map"))) == list(source_map)
@@ -43,3 +43,41 @@ def test_lookup_symbol() -> None:
 def test_lookup_symbol_error() -> None:
     with raises(KeyError):
         expected_handler.lookup_symbol("missing_symbol")
+
+
+def test_reset_restores_overwritten_symbol() -> None:
+    symbol_handler = SymbolHandler()
+    symbol_handler.handle_symbol("(R0)", 5)
+    symbol_handler.handle_symbol("@var", 6)
+    symbol_handler.reset()
+
+    assert symbol_handler.symbol_table == PRE_DEFINED_SYMBOLS
+    assert symbol_handler._next_address == 16
+
+
+def test_intern_tracks_symbol_table() -> None:
+    symbol_handler = SymbolHandler()
+    symbol_id = symbol_handler.intern("later")
+
+    assert symbol_handler.intern("later") == symbol_id
+    assert symbol_handler.symbol_values[symbol_id] == -1
+
+    symbol_handler.handle_symbol("@later", 0)
+    assert symbol_handler.resolve_id(symbol_id) == 16
+
+
+def test_resolve_id_error() -> None:
+    symbol_handler = SymbolHandler()
+    with raises(KeyError):
+        symbol_handler.resolve_id(symbol_handler.intern("missing_symbol"))
+
+
+def test_reset_drops_interned_symbols() -> None:
+    symbol_handler = SymbolHandler()
+    seeded = symbol_handler.intern("SCREEN")
+    symbol_handler.checkpoint()
+    symbol_handler.intern(symbol_handler.handle_symbol("@var", 0))
+    symbol_handler.reset()
+
+    assert symbol_handler.symbol_names == ["SCREEN"]
+    assert symbol_handler.resolve_id(seeded) == 16384
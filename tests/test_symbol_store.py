@@ -0,0 +1,73 @@
+"""
+Test methods for symbol_store module
+"""
+
+import os
+
+import pytest
+
+from hack_assembler import assemble
+from symbol_handler import SymbolHandler
+from symbol_store import DiskSymbolTable
+
+test_dir = os.path.dirname(__file__)
+
+
+def test_mapping_behaviour(tmp_path) -> None:
+    with DiskSymbolTable(str(tmp_path)) as table:
+        table["a"] = 1
+        table["b"] = 2
+        table["a"] = 3
+
+        assert table["a"] == 3
+        assert table.get("missing") is None
+        assert "b" in table and "missing" not in table
+        assert sorted(table) == ["a", "b"]
+        assert len(table) == 2
+
+        del table["b"]
+        with pytest.raises(KeyError):
+            del table["b"]
+        with pytest.raises(KeyError):
+            table["b"]
+
+    assert os.listdir(tmp_path) == []
+
+
+def test_evicted_symbols_are_read_from_disk(tmp_path) -> None:
+    with DiskSymbolTable(str(tmp_path), cache_size=2) as table:
+        for value, symbol in enumerate("abcde"):
+            table[symbol] = value
+
+        assert list(table._cache) == ["d", "e"]
+        assert [table[symbol] for symbol in "abcde"] == [0, 1, 2, 3, 4]
+        assert list(table._cache) == ["d", "e"]
+        assert (table.hits, table.misses) == (0, 5)
+        assert table["e"] == 4
+        assert table.hit_rate == 1 / 6
+
+
+def test_symbol_handler_with_disk_store(tmp_path) -> None:
+    with DiskSymbolTable(str(tmp_path), cache_size=1) as table:
+        symbol_handler = SymbolHandler(table)
+        symbol_handler.handle_labels(["@x", "(LOOP)", "@LOOP"])
+
+        assert symbol_handler.handle_symbol("@x", 0) == "x"
+        assert symbol_handler.lookup_symbol("x") == 16
+        assert symbol_handler.lookup_symbol("LOOP") == 1
+        assert symbol_handler.lookup_symbol("SCREEN") == 16384
+
+        with pytest.raises(ValueError):
+            symbol_handler.reset()
+
+
+def test_streaming_with_symbol_store(tmp_path) -> None:
+    for name in ("a", "b"):
+        with open(f"{test_dir}/parser_test_file_comments.asm", encoding="UTF-8") as f:
+            (tmp_path / f"{name}.asm").write_text(f.read())
+
+    assemble(str(tmp_path / "a.asm"), stream=True)
+    assemble(str(tmp_path / "b.asm"), stream=True, symbol_store=str(tmp_path))
+
+    assert (tmp_path / "b.hack").read_text() == (tmp_path / "a.hack").read_text()
+    assert not list(tmp_path.glob("*.sqlite"))
@@ -2,14 +2,27 @@
 Test methods for translator module
 """
 
-from hasm_parser import CInstruction
+import os
+
+from hasm_parser import CInstruction, parse_file, parse_instructions
+from symbol_handler import SymbolHandler
 from translator import (
     comp_to_bin,
     dest_to_bin,
     jump_to_bin,
     c_inst_to_bin,
     a_inst_to_bin,
+    c_inst_to_int,
+    comp_to_int,
+    dest_to_int,
+    jump_to_int,
+    word_to_bin,
+    C_INST_TABLE,
+    c_text_to_int,
+    parse_compact,
+    translate_instructions,
 )
+from pytest import raises
 
 
 def test_comp_to_bin_0() -> None:
@@ -68,3 +81,81 @@ def test_a_inst_to_bin() -> None:
 
 def test_a_inst_to_bin2() -> None:
     assert a_inst_to_bin(2) == "0000000000000010"
+
+
+def test_comp_to_int_D_plus_M() -> None:
+    assert comp_to_int(comp="D+M") == 0b1000010 << 6
+
+
+def test_dest_to_int_None() -> None:
+    assert dest_to_int(dest=None) == 0
+
+
+def test_jump_to_int_JLE() -> None:
+    assert jump_to_int(jump="JLE") == 0b110
+
+
+def test_c_inst_to_int_with_jump() -> None:
+    assert c_inst_to_int(CInstruction("MD=A-1;JGE")) == 0b1110110010011011
+
+
+def test_word_to_bin() -> None:
+    assert word_to_bin(0b1110110010011011) == "1110110010011011"
+
+
+def test_c_inst_table_size() -> None:
+    assert len(C_INST_TABLE) == 28 * 8 * 8
+
+
+def test_c_inst_table_matches_parse() -> None:
+    for text, word in C_INST_TABLE.items():
+        assert c_inst_to_int(CInstruction(text)) == word
+
+
+def test_c_text_to_int() -> None:
+    assert c_text_to_int("MD=A-1;JGE") == 0b1110110010011011
+
+
+def test_c_text_to_int_invalid() -> None:
+    with raises(KeyError):
+        c_text_to_int("D=Q")
+
+
+def test_parse_compact() -> None:
+    symbol_handler = SymbolHandler()
+    program = parse_compact(["@var", "(LOOP)", "D=M", "@LOOP", "@5"], symbol_handler)
+
+    assert list(program.words) == [0, 0b1111110000010000, 0, 5]
+    assert list(program.symbol_addresses) == [0, 2]
+    assert [
+        symbol_handler.symbol_names[symbol_id] for symbol_id in program.symbol_ids
+    ] == ["var", "LOOP"]
+
+
+def test_translate_instructions_compact() -> None:
+    parsed_file = parse_file(f"{os.path.dirname(__file__)}/parser_test_file.asm")
+    expected = translate_instructions(
+        parse_instructions(parsed_file, SymbolHandler()), SymbolHandler()
+    )
+
+    assert (
+        translate_instructions(
+            parse_compact(parsed_file, SymbolHandler()), SymbolHandler()
+        )
+        == expected
+    )
+
+
+def test_translate_instructions_compact_wide_label() -> None:
+    instructions = ["@END"] + ["D=M"] * 40000 + ["(END)"]
+    symbol_handler = SymbolHandler()
+    symbol_handler.handle_labels(instructions)
+
+    program = parse_compact(instructions, symbol_handler)
+    with raises(ValueError, match="40001"):
+        translate_instructions(program, symbol_handler)
+
+
+def test_parse_compact_wide_value() -> None:
+    with raises(ValueError, match="32768"):
+        parse_compact(["@32768"], SymbolHandler())
@@ -0,0 +1,55 @@
+"""
+Test methods for watch module
+"""
+
+import os
+import shutil
+
+from hack_assembler import assemble
+from watch import Watcher
+
+test_dir = os.path.dirname(__file__)
+
+
+def test_changed_files_only_reports_modified(tmp_path) -> None:
+    shutil.copy(f"{test_dir}/parser_test_file.asm", tmp_path / "a.asm")
+    shutil.copy(f"{test_dir}/parser_test_file.asm", tmp_path / "b.asm")
+    watcher = Watcher([str(tmp_path)], assemble)
+
+    assert watcher.changed_files() == [str(tmp_path / "a.asm"), str(tmp_path / "b.asm")]
+    assert watcher.changed_files() == []
+
+    os.utime(tmp_path / "b.asm", ns=(0, 0))
+    (tmp_path / "c.asm").write_text("@0\n")
+
+    assert watcher.changed_files() == [str(tmp_path / "b.asm"), str(tmp_path / "c.asm")]
+
+
+def test_poll_reassembles_changed_files(tmp_path) -> None:
+    source = tmp_path / "prog.asm"
+    source.write_text("@1\nD=A\n")
+    watcher = Watcher([str(source)], assemble)
+
+    assert [result.error for result in watcher.poll()] == [None]
+    assert (tmp_path / "prog.hack").read_text() == "0000000000000001\n1110110000010000"
+
+    source.write_text("@2\nD=A\n")
+    os.utime(source, ns=(1, 1))
+    results = watcher.poll()
+
+    assert [result.file for result in results] == [str(source)]
+    assert (tmp_path / "prog.hack").read_text() == "0000000000000010\n1110110000010000"
+    assert watcher.poll() == []
+
+
+def test_run_reports_rebuilds(tmp_path) -> None:
+    source = tmp_path / "prog.asm"
+    source.write_text("@1\n")
+    reports = []
+
+    Watcher([str(source)], assemble, interval=0).run(
+        lambda results, seconds: reports.append((len(results), seconds)), polls=3
+    )
+
+    assert len(reports) == 1
+    assert reports[0][0] == 1 and reports[0][1] >= 0
@@ -1,9 +1,32 @@
 """
 Translator module to translate instructions from decimal and symbolic representations
-into binary machine code
+into binary machine code.
+
+Instructions are encoded as 16-bit integer words internally and only formatted
+as "0"/"1" strings at the output boundary by `word_to_bin`.
 """
 
-from constants import BIN_START, COMP_TABLE, DEST_TABLE, JUMP_TABLE, NO_DEST, NO_JUMP
+from array import array
+from collections.abc import Iterable, Iterator
+
+from constants import (
+    C_INST_START,
+    COMP_CODES,
+    COMP_TABLE,
+    DEST_CODES,
+    DEST_TABLE,
+    JUMP_CODES,
+    JUMP_TABLE,
+    NO_DEST,
+    NO_DEST_CODE,
+    NO_JUMP,
+    NO_JUMP_CODE,
+    LABEL_START,
+    MAX_A_VALUE,
+    VAR_START,
+    WORD_FORMAT,
+    WORD_TYPECODE,
+)
 from hasm_parser import CInstruction
 from symbol_handler import SymbolHandler
 
@@ -60,6 +83,157 @@ def jump_to_bin(jump: str | None) -> str:
     return JUMP_TABLE[jump]
 
 
+def comp_to_int(comp: str) -> int:
+    """
+    Translate comp part of instruction to its pre-shifted integer code
+
+    Args:
+        `comp` (str): String representation of the comp part of a CInstruction
+
+    Returns:
+        int: The comp bits (a c1-c6) shifted into place within a 16-bit word
+    """
+
+    return COMP_CODES[comp]
+
+
+def dest_to_int(dest: str | None) -> int:
+    """
+    Translate dest part of instruction to its pre-shifted integer code
+
+    Args:
+        `dest` (str | None): String representation of the dest part of a CInstruction
+            or None if no dest part
+
+    Returns:
+        int: The dest bits shifted into place within a 16-bit word. 0 if `dest=None`
+    """
+
+    if not dest:
+        return NO_DEST_CODE
+
+    return DEST_CODES[dest]
+
+
+def jump_to_int(jump: str | None) -> int:
+    """
+    Translate jump part of instruction to its integer code
+
+    Args:
+        `jump` (str | None): String representation of the jump part of a CInstruction
+            or None if no jump part
+
+    Returns:
+        int: The jump bits of a 16-bit word. 0 if `jump=None`
+    """
+
+    if not jump:
+        return NO_JUMP_CODE
+
+    return JUMP_CODES[jump]
+
+
+def c_inst_to_int(c_inst: CInstruction) -> int:
+    """
+    Translate full C-Instruction into its 16-bit word
+
+    Args:
+        `c_inst` (`CInstruction`): The `CInstruction` to be translated.
+            E.g.: "D=M+1"
+
+    Returns:
+        int: The C-Instruction encoded as a 16-bit integer word
+    """
+
+    return (
+        C_INST_START
+        | comp_to_int(c_inst.comp)
+        | dest_to_int(c_inst.dest)
+        | jump_to_int(c_inst.jump)
+    )
+
+
+def build_c_inst_table() -> dict[str, int]:
+    """
+    Build a table mapping the canonical text of every valid C-Instruction to its 16-bit word.
+        Canonical text is "dest=comp;jump" with the "dest=" and ";jump" parts optional
+
+    Returns:
+        dict[str, int]: The encoded word for every comp, dest and jump combination
+    """
+
+    dests = {
+        "": NO_DEST_CODE,
+        **{f"{dest}=": code for dest, code in DEST_CODES.items()},
+    }
+    jumps = {
+        "": NO_JUMP_CODE,
+        **{f";{jump}": code for jump, code in JUMP_CODES.items()},
+    }
+
+    return {
+        f"{dest}{comp}{jump}": C_INST_START | comp_code | dest_code | jump_code
+        for comp, comp_code in COMP_CODES.items()
+        for dest, dest_code in dests.items()
+        for jump, jump_code in jumps.items()
+    }
+
+
+C_INST_TABLE = build_c_inst_table()
+
+
+def a_inst_to_int(value: int) -> int:
+    """
+    Check that `value` fits in the 15 bits of an A-Instruction, whose word is the value itself
+
+    Args:
+        `value` (int): The number or resolved symbol loaded by the A-Instruction
+
+    Returns:
+        int: The encoded A-Instruction
+
+    Raises:
+        ValueError: If `value` is larger than `MAX_A_VALUE`
+    """
+
+    if value > MAX_A_VALUE:
+        raise ValueError(f"A-Instruction value {value} does not fit in 15 bits")
+
+    return value
+
+
+def c_text_to_int(instruction: str) -> int:
+    """
+    Translate the text of a C-Instruction straight into its 16-bit word with one table lookup.
+        Falls back to parsing the instruction so invalid parts raise a KeyError naming them
+
+    Args:
+        `instruction` (str): The C-Instruction text. E.g.: "D=M+1"
+
+    Returns:
+        int: The C-Instruction encoded as a 16-bit integer word
+    """
+
+    if (word := C_INST_TABLE.get(instruction)) is not None:
+        return word
+
+    return c_inst_to_int(CInstruction(instruction))
+
+
+def word_to_bin(word: int) -> str:
+    """
+    Format an encoded word as its 16-character binary string
+
+    Args:
+        `word` (int): The encoded instruction
+
+    Returns:
+        str: The binary representation of `word` output as a string
+    """
+
+    return format(word, WORD_FORMAT)
+
+
 def c_inst_to_bin(c_inst: CInstruction) -> str:
     """
     Translate full C-Instruction into its binary representation
@@ -71,14 +245,8 @@ def c_inst_to_bin(c_inst: CInstruction) -> str:
     Returns:
         str: The binary representation of the C-Instruction output as a string.
     """
-    return "".join(
-        [
-            BIN_START,
-            comp_to_bin(c_inst.comp),
-            dest_to_bin(c_inst.dest),
-            jump_to_bin(c_inst.jump),
-        ]
-    )
+
+    return word_to_bin(c_inst_to_int(c_inst))
 
 
 def a_inst_to_bin(a_inst: int) -> str:
@@ -92,30 +260,176 @@ def a_inst_to_bin(a_inst: int) -> str:
         str: The 16-bit representation of the A-Instruction output as a string.
     """
 
-    return bin(a_inst)[2:].zfill(16)
+    return word_to_bin(a_inst)
 
 
-def translate_instructions(
-    instructions: dict[int, str | CInstruction], symbol_handler: SymbolHandler
-) -> list[str]:
+class CompactProgram:
+    """
+    Columnar intermediate representation of a parsed program
+
+    Attributes:
+        `words` (array[int]): One word per ROM address. C-Instructions and numeric
+            A-Instructions are fully encoded; symbolic A-Instructions hold 0 until resolved
+        `symbol_addresses` (array[int]): ROM addresses of the symbolic A-Instructions
+        `symbol_ids` (array[int]): The interned ID (see `SymbolHandler.intern`)
+            of the symbol referenced at each of `symbol_addresses`
+    """
+
+    __slots__ = ("words", "symbol_addresses", "symbol_ids")
+
+    def __init__(self) -> None:
+        self.words = array(WORD_TYPECODE)
+        self.symbol_addresses = array("I")
+        self.symbol_ids = array("I")
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+
+def parse_compact(
+    instructions: Iterable[str], symbol_handler: SymbolHandler
+) -> CompactProgram:
     """
-    Translate a dictionary of Assembly instructions into a list of binary instructions
+    Parse cleaned `instructions` straight into a `CompactProgram`.
+        Labels must already have been collected with `SymbolHandler.handle_labels`
 
     Args:
-        `instructions` (dict[int, str | CInstruction]): The dictionary of assembly instructions
+        `instructions` (Iterable[str]): the cleaned instructions
+        `symbol_handler` (`SymbolHandler`): A symbol handler for adding any @vars to the symbol table
 
     Returns:
-        `list[str]`: The list of instructions in binary (as strings)
+        `CompactProgram`: The program with every word encoded except symbol references
+
+    Raises:
+        ValueError: If a numeric A-Instruction does not fit in 15 bits
+    """
+
+    program = CompactProgram()
+    words = program.words
+    symbol_ids = symbol_handler.symbol_ids
+    symbol_values = symbol_handler.symbol_values
+
+    for instruction in instructions:
+        if instruction[0] not in (VAR_START, LABEL_START):
+            words.append(c_text_to_int(instruction))
+        elif instruction.startswith(VAR_START) and instruction[1:].isdigit():
+            words.append(a_inst_to_int(int(instruction[1:])))
+        elif instruction[0] == LABEL_START:
+            symbol_handler.handle_symbol(instruction, len(words))
+        else:
+            # Symbols seen before are already resolved, so skip the symbol handler
+            symbol_id = symbol_ids.get(instruction[1:])
+            if symbol_id is None or symbol_values[symbol_id] < 0:
+                symbol_id = symbol_handler.intern(
+                    symbol_handler.handle_symbol(instruction, 0)
+                )
+
+            program.symbol_addresses.append(len(words))
+            program.symbol_ids.append(symbol_id)
+            words.append(0)
+
+    return program
+
+
+def resolve_compact(program: CompactProgram, symbol_handler: SymbolHandler) -> array:
+    """
+    Resolve the symbol references of `program` into a finished array of words
+
+    Args:
+        `program` (`CompactProgram`): The parsed program
+        `symbol_handler` (`SymbolHandler`): The symbol handler used to resolve any symbols
+
+    Returns:
+        array[int]: One encoded word per ROM address
+
+    Raises:
+        ValueError: If a symbol resolves to a value that does not fit in an A-Instruction
     """
 
-    binary_instructions = []
+    words = array(WORD_TYPECODE, program.words)
+    resolve_id = symbol_handler.resolve_id
+
+    for address, symbol_id in zip(program.symbol_addresses, program.symbol_ids):
+        words[address] = a_inst_to_int(resolve_id(symbol_id))
+
+    return words
 
-    for _, instruction in instructions.items():
+
+def iter_encode(
+    instructions: Iterable[str | CInstruction], symbol_handler: SymbolHandler
+) -> Iterator[int]:
+    """
+    Lazily encode Assembly instructions into 16-bit integer words
+
+    Args:
+        `instructions` (Iterable[str | CInstruction]): The assembly instructions in ROM order
+        `symbol_handler` (`SymbolHandler`): The symbol handler used to resolve any symbols
+
+    Yields:
+        int: Each instruction encoded as a 16-bit word
+    """
+
+    for instruction in instructions:
         if isinstance(instruction, CInstruction):
-            binary_instructions.append(c_inst_to_bin(instruction))
+            if (word := C_INST_TABLE.get(instruction.instruction)) is None:
+                word = c_inst_to_int(instruction)
+            yield word
+        elif instruction.isdigit():
+            yield a_inst_to_int(int(instruction))
         else:
-            if not instruction.isdigit():
-                instruction = symbol_handler.lookup_symbol(instruction)
-            binary_instructions.append(a_inst_to_bin(int(instruction)))
+            yield a_inst_to_int(symbol_handler.lookup_symbol(instruction))
+
+
+def iter_translate(
+    instructions: Iterable[str | CInstruction], symbol_handler: SymbolHandler
+) -> Iterator[str]:
+    """
+    Lazily translate Assembly instructions into binary instructions
+
+    Args:
+        `instructions` (Iterable[str | CInstruction]): The assembly instructions in ROM order
+        `symbol_handler` (`SymbolHandler`): The symbol handler used to resolve any symbols
+
+    Returns:
+        Iterator[str]: Each instruction in binary (as a string)
+    """
+
+    return map(word_to_bin, iter_encode(instructions, symbol_handler))
+
+
+def encode_instructions(
+    instructions: dict[int, str | CInstruction], symbol_handler: SymbolHandler
+) -> list[int]:
+    """
+    Encode a dictionary of Assembly instructions into a list of 16-bit words
+
+    Args:
+        `instructions` (dict[int, str | CInstruction]): The dictionary of assembly instructions
+        `symbol_handler` (`SymbolHandler`): The symbol handler used to resolve any symbols
+
+    Returns:
+        `list[int]`: The list of instructions as integer words
+    """
+
+    return list(iter_encode(instructions.values(), symbol_handler))
+
+
+def translate_instructions(
+    instructions: dict[int, str | CInstruction] | CompactProgram,
+    symbol_handler: SymbolHandler,
+) -> list[str]:
+    """
+    Translate a dictionary of Assembly instructions or a `CompactProgram`
+        into a list of binary instructions
+
+    Args:
+        `instructions` (dict[int, str | CInstruction] | `CompactProgram`): The assembly instructions
+
+    Returns:
+        `list[str]`: The list of instructions in binary (as strings)
+    """
+
+    if isinstance(instructions, CompactProgram):
+        return list(map(word_to_bin, resolve_compact(instructions, symbol_handler)))
 
-    return binary_instructions
+    return list(map(word_to_bin, encode_instructions(instructions, symbol_handler)))
@@ -0,0 +1,93 @@
+"""
+Watch mode that keeps the assembler resident and reassembles .asm files when they change.
+
+Files are polled by modification time, so it works on any platform. Only new or changed
+files are reassembled; with the assembly cache enabled, unchanged regions of a changed file
+reuse their cached parse results.
+"""
+
+from collections.abc import Callable, Iterable
+import os
+import time
+
+from batch import AssemblyResult, assemble_batch, expand_sources
+
+DEFAULT_INTERVAL = 0.5
+
+
+class Watcher:
+    """
+    Polls a set of files, directories or glob patterns and reassembles what changed
+
+    Attributes:
+        `paths` (list[str]): The files, directories or glob patterns being watched
+        `task` (Callable[[str], object]): The function that assembles a single file
+        `interval` (float): Seconds between polls
+    """
+
+    def __init__(
+        self,
+        paths: Iterable[str],
+        task: Callable[[str], object],
+        interval: float = DEFAULT_INTERVAL,
+    ) -> None:
+        self.paths = list(paths)
+        self.task = task
+        self.interval = interval
+        self._mtimes: dict[str, int] = {}
+
+    def changed_files(self) -> list[str]:
+        """
+        Find the watched files that are new or modified since the last call
+
+        Returns:
+            list[str]: The changed files, in the order `expand_sources` finds them
+        """
+
+        changed = []
+        mtimes = {}
+
+        for file in expand_sources(self.paths):
+            try:
+                mtimes[file] = os.stat(file).st_mtime_ns
+            except FileNotFoundError:
+                continue
+            if self._mtimes.get(file) != mtimes[file]:
+                changed.append(file)
+
+        self._mtimes = mtimes
+
+        return changed
+
+    def poll(self) -> list[AssemblyResult]:
+        """
+        Reassemble every file changed since the last poll
+
+        Returns:
+            list[`AssemblyResult`]: The timing and outcome of each rebuilt file
+        """
+
+        return assemble_batch(self.changed_files(), self.task)
+
+    def run(
+        self,
+        report: Callable[[list[AssemblyResult], float], object],
+        polls: int | None = None,
+    ) -> None:
+        """
+        Poll until interrupted (or for `polls` polls), reporting each rebuild
+
+        Args:
+            `report` (Callable[[list[AssemblyResult], float], object]): Called with the results
+                and the total latency in seconds of every poll that rebuilt something
+            `polls` (int | None): The number of polls to run. Defaults to None (forever)
+        """
+
+        while polls is None or polls > 0:
+            start = time.perf_counter()
+            if results := self.poll():
+                report(results, time.perf_counter() - start)
+
+            if polls is not None:
+                polls -= 1
+            time.sleep(self.interval)